@@ -0,0 +1,42 @@
+from django.contrib import admin
+from .models import ImportAPI, EndpointDiscovery, MissingRecord, PayloadBlob, SyncCursor, SyncJob, SyncRun
+
+@admin.register(ImportAPI)
+class ImportAPIAdmin(admin.ModelAdmin):
+    list_display = ['source', 'remote_id', 'local_id', 'cible_type', 'dernier_sync']
+    list_filter = ['source', 'cible_type', 'dernier_sync']
+    search_fields = ['remote_id', 'local_id', 'payload_hash']
+    readonly_fields = ['dernier_sync', 'payload']
+
+@admin.register(PayloadBlob)
+class PayloadBlobAdmin(admin.ModelAdmin):
+    list_display = ['empreinte', 'taille', 'cree_le', 'vu_le']
+    search_fields = ['empreinte']
+    readonly_fields = ['empreinte', 'taille', 'cree_le', 'vu_le', 'contenu']
+
+@admin.register(EndpointDiscovery)
+class EndpointDiscoveryAdmin(admin.ModelAdmin):
+    list_display = ['cible_type', 'portee', 'chemin', 'verifie_le']
+    list_filter = ['cible_type', 'portee']
+
+@admin.register(SyncCursor)
+class SyncCursorAdmin(admin.ModelAdmin):
+    list_display = ['cible_type', 'dernier_succes', 'dernier_complet', 'max_maj_distante', 'filtre', 'filtre_verifie_le']
+
+@admin.register(SyncRun)
+class SyncRunAdmin(admin.ModelAdmin):
+    list_display = ['entite', 'debut', 'ok', 'duree_http', 'duree_parse', 'duree_db', 'nb_requetes_http', 'nb_requetes_sql', 'lignes_par_sec']
+    list_filter = ['entite', 'ok', 'debut']
+    search_fields = ['lot']
+
+@admin.register(MissingRecord)
+class MissingRecordAdmin(admin.ModelAdmin):
+    list_display = ['cible_type', 'local_id', 'statut', 'detecte_le', 'vu_le']
+    list_filter = ['cible_type', 'statut']
+    search_fields = ['local_id']
+
+@admin.register(SyncJob)
+class SyncJobAdmin(admin.ModelAdmin):
+    list_display = ['type', 'statut', 'priorite', 'tentatives', 'max_tentatives', 'disponible_le', 'worker', 'fin']
+    list_filter = ['type', 'statut']
+    search_fields = ['lot', 'cle', 'worker']
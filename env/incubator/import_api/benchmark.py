@@ -0,0 +1,234 @@
+import json
+import os
+import random
+import sys
+import tempfile
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import partial
+from typing import Optional
+
+from django.apps import apps
+from django.core.management.color import no_style
+from django.db import connection
+from django.test.utils import override_settings
+
+from . import services
+from .models import EndpointDiscovery, ImportAPI, PayloadBlob, SyncCursor, SyncRun
+from .specs import SPECS
+from .standin import Catalog, StandinServer
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+# cold: base vide; warm: mêmes données (304 / empreintes); update: une part des items modifiée
+PHASES = ("cold", "warm", "update")
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "benchmark_baseline.json")
+
+# tolérance relative avant de signaler une régression: budgets serrés sur les
+# volumes (déterministes), larges sur les durées et la mémoire (bruitées)
+DEFAULT_TOLERANCES = {
+    "queries_per_item": 0.10,
+    "requests_per_item": 0.10,
+    "rows_per_sec": 0.50,
+    "peak_rss_mb": 0.30,
+}
+# métriques pour lesquelles une valeur plus haute est meilleure
+HIGHER_IS_BETTER = {"rows_per_sec"}
+# marge absolue: évite de signaler 0.011 contre 0.010 requête par item
+ABSOLUTE_SLACK = {"queries_per_item": 0.02, "requests_per_item": 0.005, "rows_per_sec": 0.0, "peak_rss_mb": 5.0}
+
+# hachage rapide pendant la mesure, comme pour les tests Django: le coût de
+# PBKDF2 sur les mots de passe importés masquerait tout le reste
+FAST_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Pic de mémoire résidente du processus (Mo), None si indisponible."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # octets sur macOS, kilo-octets ailleurs
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def prepare_database():
+    """Crée les tables des modèles non gérés (users, news, events) absentes de la base de test."""
+    existing = set(connection.introspection.table_names())
+    with connection.schema_editor() as editor:
+        for model in apps.get_models():
+            if not model._meta.managed and model._meta.db_table not in existing:
+                editor.create_model(model)
+                existing.add(model._meta.db_table)
+
+
+@contextmanager
+def unmanaged_tables():
+    """Modèles non gérés traités comme gérés: create_test_db crée aussi leurs tables (FK vers users sous Postgres)."""
+    models = [model for model in apps.get_models() if not model._meta.managed]
+    for model in models:
+        model._meta.managed = True
+    try:
+        yield
+    finally:
+        for model in models:
+            model._meta.managed = False
+
+
+def reset_tables():
+    """Vide les tables alimentées par la sync (entre deux tailles de jeu de données)."""
+    models = [spec.get_model() for spec in SPECS]
+    models += [apps.get_model("startups", "Founder"), ImportAPI, PayloadBlob, EndpointDiscovery, SyncCursor, SyncRun]
+    tables = [m._meta.db_table for m in models]
+    # sqlite: DELETE dans l'ordre de la liste, sans égard aux clés étrangères
+    # (Postgres passe par TRUNCATE ... CASCADE)
+    with connection.constraint_checks_disabled(), connection.cursor() as cur:
+        for sql in connection.ops.sql_flush(no_style(), tables, reset_sequences=False, allow_cascade=True):
+            cur.execute(sql)
+
+
+@contextmanager
+def _environ(name: str, value: str):
+    old = os.environ.get(name)
+    os.environ[name] = value
+    try:
+        yield
+    finally:
+        if old is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = old
+
+
+def _mutate(catalog: Catalog, churn: float, rng: random.Random):
+    """Modifie une part `churn` des items de chaque ressource (liste et détail), date de modification comprise."""
+    stamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    for resource_name, items in catalog.lists.items():
+        details = catalog.details.get(resource_name, {})
+        for item in items:
+            if rng.random() >= churn:
+                continue
+            key = "name" if "name" in item else "title"
+            targets = {id(item): item}
+            detail = details.get(str(item.get("id")))
+            if detail is not None:
+                targets[id(detail)] = detail
+            for target in targets.values():
+                target[key] = f"{target[key]} (maj)"
+                target["updated_at"] = stamp
+
+
+def run_benchmark(sizes=DEFAULT_SIZES, labels=None, latency: float = 0.0, page_size: int = 100,
+                  partial_ratio: float = 0.3, churn: float = 0.1, seed: int = 0, full: bool = False, bulk: bool = False,
+                  log=None) -> dict:
+    """Exécute chaque sync contre un faux serveur JEB, pour chaque taille et phase.
+
+    La base doit être une base jetable (cf. commande jeb_benchmark): les
+    tables synchronisées sont vidées avant chaque taille. Le pic RSS est le
+    maximum du processus: les tailles étant croissantes, celui d'une taille
+    reflète essentiellement ce qu'elle a consommé. Les phases warm et update
+    sont incrémentales (le faux serveur filtre par date de modification),
+    sauf avec full=True; les métriques par item et le débit sont donc
+    rapportés à la taille du catalogue, pas au nombre d'items traités.
+    bulk=True mesure le réimport complet (COPY sous Postgres) à chaque phase.
+    Chaque variante a sa baseline.
+    """
+    specs = [spec for spec in SPECS if labels is None or spec.label in labels]
+    report = {"vendor": connection.vendor, "results": {}}
+    if full:
+        report["vendor"] += "-full"
+    if bulk:
+        report["vendor"] += "-bulk"
+    for size in sorted(sizes):
+        catalog = Catalog.synthesize({spec.label: size for spec in specs}, partial=partial_ratio, seed=seed)
+        server = StandinServer(catalog, latency=latency, page_size=page_size, seed=seed)
+        server.start()
+        per_size = report["results"][str(size)] = {}
+        try:
+            with tempfile.TemporaryDirectory(prefix="jeb-bench-cache-") as cache_dir, \
+                    override_settings(JEB_HTTP_CACHE_DIR=cache_dir, PASSWORD_HASHERS=FAST_HASHERS), \
+                    _environ("JEB_API_BASE", server.base_url):
+                reset_tables()
+                run_id = uuid.uuid4()
+                for phase in PHASES:
+                    if phase == "update":
+                        _mutate(catalog, churn, random.Random(seed + size))
+                    per_phase = per_size[phase] = {}
+                    for spec in specs:
+                        before = server.requests
+                        sync = partial(services.sync_entity, spec, full=full, bulk=bulk)
+                        result = services._run_sync_task(spec.label, sync, run_id, profile=True, worker=False)
+                        profile = result.get("profile", {})
+                        # rapporté à la taille du catalogue, pas aux items traités: une
+                        # sync incrémentale qui n'en lit que 10 reste comparable à une complète
+                        seconds = profile.get("seconds") or 0
+                        per_phase[spec.label] = {
+                            "ok": bool(result.get("ok")),
+                            "mode": result.get("mode"),
+                            "items": result.get("total") or 0,
+                            "seconds": profile.get("seconds"),
+                            "rows_per_sec": round(size / seconds, 1) if seconds else profile.get("rows_per_sec"),
+                            "queries_per_item": round(profile.get("db_queries", 0) / size, 3),
+                            "requests_per_item": round((server.requests - before) / size, 4),
+                            "peak_rss_mb": peak_rss_mb(),
+                        }
+                        if log:
+                            log(size, phase, spec.label, per_phase[spec.label])
+        finally:
+            server.shutdown()
+            server.server_close()
+    return report
+
+
+def load_baseline(path: str = BASELINE_PATH) -> dict:
+    try:
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(report: dict, path: str = BASELINE_PATH):
+    """Remplace, pour le moteur de base courant, les tailles mesurées dans la baseline."""
+    baseline = load_baseline(path)
+    vendor = baseline.setdefault(report["vendor"], {})
+    vendor.update(report["results"])
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(baseline, fh, indent=2, sort_keys=True)
+        fh.write("\n")
+
+
+def compare(report: dict, baseline: dict, tolerances: Optional[dict] = None) -> list:
+    """Régressions de `report` par rapport à la baseline du même moteur de base.
+
+    Retourne des messages "taille/phase/entité: métrique valeur vs baseline";
+    une sync en échec est toujours une régression.
+    """
+    tolerances = {**DEFAULT_TOLERANCES, **(tolerances or {})}
+    reference = baseline.get(report["vendor"], {})
+    regressions = []
+    for size, phases in report["results"].items():
+        for phase, entities in phases.items():
+            for label, current in entities.items():
+                where = f"{size}/{phase}/{label}"
+                if not current.get("ok"):
+                    regressions.append(f"{where}: sync en échec")
+                base = reference.get(size, {}).get(phase, {}).get(label)
+                if not base:
+                    continue
+                for metric, tolerance in tolerances.items():
+                    value, expected = current.get(metric), base.get(metric)
+                    if value is None or expected is None:
+                        continue
+                    slack = ABSOLUTE_SLACK.get(metric, 0.0)
+                    if metric in HIGHER_IS_BETTER:
+                        worse = value < expected * (1 - tolerance) - slack
+                    else:
+                        worse = value > expected * (1 + tolerance) + slack
+                    if worse:
+                        regressions.append(f"{where}: {metric} {value} vs baseline {expected} (tolérance {tolerance:.0%})")
+    return regressions
@@ -0,0 +1,68 @@
+import datetime
+import io
+from typing import Iterable, Sequence
+
+from django.conf import settings
+from django.db import connection
+
+
+def batch_size() -> int:
+    """Taille des lots d'écriture et de lecture (JEB_SYNC_BATCH_SIZE, défaut 200)."""
+    return max(1, getattr(settings, "JEB_SYNC_BATCH_SIZE", 200))
+
+
+def _copy_text(value) -> str:
+    """Valeur au format texte de COPY (\\N pour NULL, séparateurs échappés)."""
+    if value is None:
+        return r"\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        text = value.isoformat()
+    else:
+        text = str(value)
+    return text.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def create_staging(name: str, source_table: str, columns: Sequence[str]):
+    """Table temporaire `name` avec les colonnes (et types) de `source_table`, propre à la session.
+
+    Une colonne _ord (ordre d'arrivée) permet de garder la dernière version
+    d'un id copié plusieurs fois. Peut être remplie hors transaction
+    (autocommit); à supprimer par drop_staging.
+    """
+    qn = connection.ops.quote_name
+    with connection.cursor() as cur:
+        cur.execute(
+            f"CREATE TEMPORARY TABLE {qn(name)} AS "
+            f"SELECT {', '.join(qn(c) for c in columns)} FROM {qn(source_table)} WITH NO DATA"
+        )
+        cur.execute(f"ALTER TABLE {qn(name)} ADD COLUMN _ord bigserial")
+
+
+def drop_staging(*names: str):
+    qn = connection.ops.quote_name
+    with connection.cursor() as cur:
+        for name in names:
+            cur.execute(f"DROP TABLE IF EXISTS {qn(name)}")
+
+
+def copy_rows(table: str, columns: Sequence[str], rows: Iterable[Sequence]) -> int:
+    """COPY ... FROM STDIN des `rows` dans `table` (Postgres, psycopg 3 ou psycopg2).
+
+    Les valeurs doivent être prêtes pour la base (get_db_prep_save, JSON
+    sérialisé). Retourne le nombre de lignes copiées.
+    """
+    qn = connection.ops.quote_name
+    sql = f"COPY {qn(table)} ({', '.join(qn(c) for c in columns)}) FROM STDIN"
+    lines = ["\t".join(_copy_text(v) for v in row) + "\n" for row in rows]
+    if not lines:
+        return 0
+    with connection.cursor() as cur:
+        raw = cur.cursor
+        if hasattr(raw, "copy"):  # psycopg 3
+            with raw.copy(sql) as copy:
+                copy.write("".join(lines))
+        else:  # psycopg2
+            raw.copy_expert(sql, io.StringIO("".join(lines)))
+    return len(lines)
@@ -0,0 +1,242 @@
+import logging
+import os
+import threading
+import time
+from typing import Iterator, Optional
+
+import certifi
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from .governor import Governor, backoff_delay, get_governor, retry_after
+from .http_cache import DiskResponseCache
+from .metrics import SyncMetrics
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+_DEFAULT = object()
+
+# statuts transitoires repris par JEBClient._send
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def _default_cache() -> Optional[DiskResponseCache]:
+    directory = _setting("JEB_HTTP_CACHE_DIR", os.path.join(str(_setting("BASE_DIR", ".")), ".jeb_http_cache"))
+    if not directory:
+        return None
+    try:
+        return DiskResponseCache(directory, _setting("JEB_HTTP_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+    except OSError:
+        logger.warning("Cache HTTP JEB indisponible (%s), requêtes non conditionnelles", directory)
+        return None
+
+
+class JEBClient:
+    """Client HTTP vers l'API JEB reposant sur une session poolée (keep-alive).
+
+    Une seule session est réutilisée pour toutes les requêtes: la connexion TLS
+    est établie une fois par hôte puis recyclée par le pool urllib3. Chaque
+    tentative passe par le gouverneur partagé (governor.py), qui borne les
+    requêtes en vol et s'adapte à la latence et aux 429 / 5xx observés.
+
+    Réglages (settings.py, tous optionnels):
+      - JEB_API_POOL_SIZE: nb de connexions conservées par hôte (défaut 10)
+      - JEB_API_TIMEOUT: (connect, read) en secondes (défaut (5, 30))
+      - JEB_API_MAX_RETRIES: reprises sur 429 / 5xx / erreur réseau (défaut 3)
+      - JEB_API_BACKOFF: base du backoff exponentiel à gigue (défaut 0.5 s)
+      - JEB_API_BACKOFF_MAX: attente maximale entre deux tentatives, y
+        compris sur Retry-After (défaut 30 s)
+      - JEB_HTTP_CACHE_DIR: répertoire du cache des requêtes conditionnelles
+        (défaut <BASE_DIR>/.jeb_http_cache, None pour désactiver)
+      - JEB_HTTP_CACHE_MAX_BYTES: taille maximale du cache (défaut 64 Mo)
+    """
+
+    def __init__(self, base: Optional[str] = None, token: Optional[str] = None,
+                 pool_size: Optional[int] = None, timeout=None, max_retries: Optional[int] = None,
+                 cache: Optional[DiskResponseCache] = _DEFAULT, governor: Optional[Governor] = None):
+        # la variable d'environnement JEB_API_BASE l'emporte sur settings (ex: faux serveur jeb_standin)
+        self.base = base if base is not None else (os.environ.get("JEB_API_BASE") or _setting("JEB_API_BASE", ""))
+        self.timeout = timeout if timeout is not None else _setting("JEB_API_TIMEOUT", (5, 30))
+        pool_size = pool_size or _setting("JEB_API_POOL_SIZE", 10)
+        if max_retries is None:
+            max_retries = _setting("JEB_API_MAX_RETRIES", 3)
+
+        self.max_retries = max_retries
+        self.governor = governor or get_governor()
+        # les reprises (429 / 5xx / timeouts) sont gérées par _send, pour que
+        # le gouverneur voie chaque tentative: pas de Retry urllib3 ici
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.verify = certifi.where()
+        self.session.headers.update({
+            "X-Group-Authorization": token if token is not None else _setting("JEB_API_TOKEN", ""),
+            "Accept": "application/json",
+        })
+        self.cache = _default_cache() if cache is _DEFAULT else cache
+        # compteurs HTTP de la sync en cours (posés par le planificateur de sync_all)
+        self.metrics: Optional[SyncMetrics] = None
+
+    def url(self, path: str) -> str:
+        """Construit l'URL absolue (les URLs déjà absolues sont conservées)."""
+        if path.startswith(("http://", "https://")):
+            return path
+        return f"{self.base}{path}"
+
+    def _send(self, url: str, **kwargs) -> requests.Response:
+        """GET avec reprises: backoff exponentiel à gigue, Retry-After respecté.
+
+        Une réponse 429 / 5xx encore présente après la dernière tentative est
+        renvoyée telle quelle à l'appelant.
+        """
+        cap = _setting("JEB_API_BACKOFF_MAX", 30)
+        attempt = 0
+        while True:
+            self.governor.acquire()
+            start = time.perf_counter()
+            try:
+                resp = self.session.get(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                elapsed = time.perf_counter() - start
+                self.governor.release(elapsed, overloaded=True)
+                if self.metrics is not None:
+                    self.metrics.add_http(elapsed, requests=1)
+                if attempt >= self.max_retries:
+                    raise
+                delay = backoff_delay(attempt, cap=cap)
+                logger.info("Erreur réseau sur %s, nouvelle tentative dans %.1fs", url, delay)
+            else:
+                elapsed = time.perf_counter() - start
+                transient = resp.status_code in RETRY_STATUSES
+                self.governor.release(elapsed, overloaded=transient)
+                if self.metrics is not None:
+                    # hors stream, le corps est déjà téléchargé par session.get
+                    nbytes = 0 if kwargs.get("stream") else len(resp.content or b"")
+                    self.metrics.add_http(elapsed, nbytes, requests=1)
+                if not transient or attempt >= self.max_retries:
+                    return resp
+                delay = backoff_delay(attempt, cap=cap)
+                wait_hint = retry_after(resp.headers.get("Retry-After"))
+                if wait_hint is not None:
+                    delay = min(cap, max(delay, wait_hint))
+                    # l'API demande d'attendre: vaut pour toutes les requêtes en cours
+                    self.governor.pause(delay)
+                resp.close()
+                logger.info("Réponse %s sur %s, nouvelle tentative dans %.1fs", resp.status_code, url, delay)
+            time.sleep(delay)
+            attempt += 1
+
+    def get(self, path: str, timeout=None, conditional: bool = False, **kwargs) -> requests.Response:
+        """GET sur l'API JEB.
+
+        Avec conditional=True, les validateurs mémorisés (ETag / Last-Modified)
+        sont envoyés. Une réponse 304 est renvoyée telle quelle (status 304)
+        mais avec le corps en cache, lisible via .json() ou iter_bytes(); une
+        réponse 200 porteuse de validateurs est mise en cache (au fil de la
+        lecture avec stream=True).
+        """
+        url = self.url(path)
+        timeout = timeout or self.timeout
+        if not conditional or self.cache is None:
+            return self._send(url, timeout=timeout, **kwargs)
+
+        stream = kwargs.get("stream", False)
+        headers = dict(kwargs.pop("headers", None) or {})
+        validators = self.cache.validators(url)
+        resp = self._send(url, timeout=timeout, headers={**headers, **validators}, **kwargs)
+        if resp.status_code == 304:
+            if stream:
+                cached = self.cache.open_body(url) if validators else None
+            else:
+                cached = self.cache.body(url) if validators else None
+            if cached is None:
+                # corps évincé entre la lecture des validateurs et la réponse
+                resp.close()
+                return self._send(url, timeout=timeout, headers=headers, **kwargs)
+            if stream:
+                resp._jeb_cached_file = cached
+            else:
+                resp._content = cached
+            return resp
+        if resp.status_code == 200:
+            etag, last_modified = resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+            if stream:
+                resp._jeb_cache_writer = self.cache.writer(url, etag, last_modified)
+            else:
+                self.cache.store(url, etag, last_modified, resp.content)
+        return resp
+
+    def iter_bytes(self, resp: requests.Response, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """Corps d'une réponse par fragments, sans le charger en mémoire.
+
+        Sert le fichier en cache pour un 304 obtenu en stream, et n'enregistre
+        un corps 200 dans le cache que s'il a été lu jusqu'au bout.
+        """
+        cached = getattr(resp, "_jeb_cached_file", None)
+        if cached is not None:
+            # la réponse 304 est fermée aussi: sa connexion retourne au pool
+            try:
+                with cached:
+                    yield from iter(lambda: cached.read(chunk_size), b"")
+            finally:
+                resp.close()
+            return
+        writer = getattr(resp, "_jeb_cache_writer", None)
+        try:
+            chunks = resp.iter_content(chunk_size)
+            while True:
+                start = time.perf_counter()
+                chunk = next(chunks, None)
+                if self.metrics is not None:
+                    self.metrics.add_http(time.perf_counter() - start, len(chunk or b""))
+                if chunk is None:
+                    break
+                if writer is not None:
+                    writer.write(chunk)
+                yield chunk
+            if writer is not None:
+                writer.commit()
+                writer = None
+        finally:
+            if writer is not None:
+                writer.discard()
+            resp.close()
+
+    def forget(self, path: str):
+        """Retire `path` du cache des requêtes conditionnelles (si actif)."""
+        if self.cache is not None:
+            self.cache.forget(self.url(path))
+
+    def close(self):
+        self.session.close()
+
+
+_client: Optional[JEBClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> JEBClient:
+    """Retourne le client partagé par le processus (créé à la demande)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = JEBClient()
+    return _client
+
+
+def reset_client():
+    """Ferme et oublie le client partagé (ex: après changement de settings)."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
@@ -0,0 +1,131 @@
+import email.utils
+import random
+import threading
+import time
+from typing import Optional
+
+from django.conf import settings
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+class Governor:
+    """Limite adaptative (AIMD) du nombre de requêtes JEB en vol.
+
+    - un succès dont la latence reste sous `latency_tolerance` x la latence
+      de référence (plus basse latence observée, lissée) augmente la limite
+      de 1/limite: environ +1 par aller-retour complet
+    - un 429 / 5xx / timeout divise la limite par 2, et une latence anormale
+      la réduit de 10%; au plus une réduction par fenêtre de latence, pour
+      qu'une rafale d'échecs simultanés ne la fasse pas s'effondrer
+    - pause(): plus aucune requête ne part avant l'échéance (Retry-After),
+      quel que soit le thread
+
+    Partagé par tout le processus (get_governor()): les syncs parallèles et
+    les requêtes détail se partagent le même budget vis-à-vis de l'API.
+    """
+
+    def __init__(self, initial: float = 4, minimum: float = 1, maximum: float = 16,
+                 latency_tolerance: float = 2.0, decrease: float = 0.5):
+        self.minimum = max(1.0, float(minimum))
+        self.maximum = max(self.minimum, float(maximum))
+        self.limit = min(self.maximum, max(self.minimum, float(initial)))
+        self.latency_tolerance = latency_tolerance
+        self.decrease = decrease
+        self.in_flight = 0
+        self._cond = threading.Condition()
+        self._paused_until = 0.0
+        self._baseline: Optional[float] = None
+        self._last_decrease = 0.0
+
+    def acquire(self):
+        """Attend une place libre (et la fin d'une éventuelle pause)."""
+        with self._cond:
+            while True:
+                wait_for = self._paused_until - time.monotonic()
+                if wait_for > 0:
+                    self._cond.wait(wait_for)
+                    continue
+                if self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                self._cond.wait()
+
+    def release(self, latency: float, overloaded: bool = False):
+        """Libère la place et ajuste la limite d'après l'issue de la requête."""
+        with self._cond:
+            self.in_flight -= 1
+            if overloaded:
+                self._reduce(self.decrease, latency)
+            else:
+                if self._baseline is None or latency < self._baseline:
+                    self._baseline = latency
+                else:
+                    # la référence remonte lentement si l'API ralentit durablement
+                    self._baseline += 0.05 * (latency - self._baseline)
+                if latency > self._baseline * self.latency_tolerance:
+                    self._reduce(0.9, latency)
+                else:
+                    self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+    def _reduce(self, factor: float, latency: float):
+        now = time.monotonic()
+        if now - self._last_decrease < max(self._baseline or 0.0, latency):
+            return
+        self.limit = max(self.minimum, self.limit * factor)
+        self._last_decrease = now
+
+    def pause(self, seconds: float):
+        """Suspend l'émission de nouvelles requêtes pendant `seconds`."""
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._cond.notify_all()
+
+
+def backoff_delay(attempt: int, base: Optional[float] = None, cap: Optional[float] = None) -> float:
+    """Attente avant la tentative `attempt` + 1: backoff exponentiel à gigue complète."""
+    base = _setting("JEB_API_BACKOFF", 0.5) if base is None else base
+    cap = _setting("JEB_API_BACKOFF_MAX", 30) if cap is None else cap
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def retry_after(value: Optional[str]) -> Optional[float]:
+    """Délai en secondes d'un en-tête Retry-After (nombre ou date HTTP), None si absent ou illisible."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+_governor: Optional[Governor] = None
+_governor_lock = threading.Lock()
+
+
+def get_governor() -> Governor:
+    """Retourne le gouverneur partagé par le processus (créé à la demande).
+
+    Réglages (settings.py, tous optionnels):
+      - JEB_API_CONCURRENCY_INITIAL: limite de départ (défaut 4)
+      - JEB_API_CONCURRENCY_MAX: limite maximale (défaut 16)
+      - JEB_API_LATENCY_TOLERANCE: latence tolérée en multiple de la
+        référence avant réduction (défaut 2.0)
+    """
+    global _governor
+    if _governor is None:
+        with _governor_lock:
+            if _governor is None:
+                _governor = Governor(
+                    initial=_setting("JEB_API_CONCURRENCY_INITIAL", 4),
+                    maximum=_setting("JEB_API_CONCURRENCY_MAX", 16),
+                    latency_tolerance=_setting("JEB_API_LATENCY_TOLERANCE", 2.0),
+                )
+    return _governor
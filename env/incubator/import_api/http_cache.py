@@ -0,0 +1,226 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return 0
+
+
+class DiskResponseCache:
+    """Cache disque des réponses JEB pour les requêtes conditionnelles.
+
+    Pour chaque URL on conserve deux fichiers nommés par sha256(url):
+      - <clé>.json : validateurs (ETag, Last-Modified) et taille du corps
+      - <clé>.body : corps brut de la dernière réponse 200
+
+    La taille totale des corps est bornée par `max_bytes`: au-delà, les entrées
+    les moins récemment utilisées (mtime, rafraîchi à chaque hit) sont
+    supprimées jusqu'à 90 % de la limite.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 64 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # taille des corps, relevée au premier passage de _evict puis tenue à jour
+        self._total: Optional[int] = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, url: str):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.directory, key)
+        return base + ".json", base + ".body"
+
+    def validators(self, url: str) -> dict:
+        """En-têtes conditionnels à envoyer pour `url` (vide si rien en cache)."""
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, encoding="utf-8") as fh:
+                meta = json.load(fh)
+        except (OSError, ValueError):
+            return {}
+        if not os.path.exists(body_path):
+            return {}
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def body(self, url: str) -> Optional[bytes]:
+        """Corps en cache pour `url` (None si évincé entre-temps)."""
+        _, body_path = self._paths(url)
+        try:
+            with open(body_path, "rb") as fh:
+                data = fh.read()
+        except OSError:
+            return None
+        try:
+            os.utime(body_path)
+        except OSError:
+            pass
+        return data
+
+    def open_body(self, url: str):
+        """Fichier (binaire) du corps en cache pour `url`, ou None.
+
+        Le descripteur reste lisible même si l'entrée est évincée ensuite.
+        """
+        _, body_path = self._paths(url)
+        try:
+            fh = open(body_path, "rb")
+        except OSError:
+            return None
+        try:
+            os.utime(body_path)
+        except OSError:
+            pass
+        return fh
+
+    def writer(self, url: str, etag: Optional[str], last_modified: Optional[str]) -> Optional["_BodyWriter"]:
+        """Écrivain incrémental pour mettre un corps en cache au fil de sa lecture."""
+        if not etag and not last_modified:
+            return None
+        return _BodyWriter(self, url, etag, last_modified)
+
+    def store(self, url: str, etag: Optional[str], last_modified: Optional[str], body: bytes):
+        if not etag and not last_modified:
+            return
+        if len(body) > self.max_bytes:
+            return
+        _, body_path = self._paths(url)
+        previous = _file_size(body_path)
+        try:
+            self._atomic_write(body_path, body)
+        except OSError:
+            logger.warning("Écriture du cache HTTP impossible pour %s", url, exc_info=True)
+            return
+        self._commit_meta(url, etag, last_modified, len(body), previous)
+
+    def forget(self, url: str):
+        """Oublie l'entrée de `url`: la prochaine requête repartira sans validateurs."""
+        for path in self._paths(url):
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    def _commit_meta(self, url: str, etag: Optional[str], last_modified: Optional[str], size: int, previous: int = 0):
+        meta_path, _ = self._paths(url)
+        meta = {"url": url, "etag": etag, "last_modified": last_modified, "size": size}
+        try:
+            self._atomic_write(meta_path, json.dumps(meta).encode("utf-8"))
+        except OSError:
+            logger.warning("Écriture du cache HTTP impossible pour %s", url, exc_info=True)
+            return
+        self._evict(size - previous)
+
+    def _atomic_write(self, path: str, data: bytes):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    def _evict(self, added: int = 0):
+        with self._lock:
+            # le répertoire n'est relu que si le total estimé dépasse la limite
+            if self._total is not None:
+                self._total += added
+                if self._total <= self.max_bytes:
+                    return
+            entries = []
+            total = 0
+            try:
+                names = os.listdir(self.directory)
+            except OSError:
+                return
+            for name in names:
+                if not name.endswith(".body"):
+                    continue
+                path = os.path.join(self.directory, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+            self._total = total
+            if total <= self.max_bytes:
+                return
+            # marge de 10 %: un cache plein n'est pas relu à chaque nouvelle entrée
+            target = self.max_bytes * 0.9
+            for _, size, path in sorted(entries):
+                for victim in (path, path[:-len(".body")] + ".json"):
+                    try:
+                        os.unlink(victim)
+                    except OSError:
+                        pass
+                total -= size
+                if total <= target:
+                    break
+            self._total = total
+
+
+class _BodyWriter:
+    """Corps mis en cache au fil de l'eau (fichier temporaire puis renommage)."""
+
+    def __init__(self, cache: DiskResponseCache, url: str, etag: Optional[str], last_modified: Optional[str]):
+        self.cache = cache
+        self.url = url
+        self.etag = etag
+        self.last_modified = last_modified
+        self.size = 0
+        fd, self._tmp = tempfile.mkstemp(dir=cache.directory, suffix=".tmp")
+        self._fh = os.fdopen(fd, "wb")
+
+    def write(self, data: bytes):
+        if self._fh is None:
+            return
+        self.size += len(data)
+        if self.size > self.cache.max_bytes:
+            # trop gros pour le cache: abandon silencieux
+            self.discard()
+            return
+        self._fh.write(data)
+
+    def commit(self):
+        if self._fh is None:
+            return
+        self._fh.close()
+        self._fh = None
+        _, body_path = self.cache._paths(self.url)
+        previous = _file_size(body_path)
+        try:
+            os.replace(self._tmp, body_path)
+        except OSError:
+            logger.warning("Écriture du cache HTTP impossible pour %s", self.url, exc_info=True)
+            return
+        self.cache._commit_meta(self.url, self.etag, self.last_modified, self.size, previous)
+
+    def discard(self):
+        if self._fh is None:
+            return
+        self._fh.close()
+        self._fh = None
+        try:
+            os.unlink(self._tmp)
+        except OSError:
+            pass
@@ -0,0 +1,346 @@
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import timedelta
+from functools import partial
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, connection, models, transaction
+from django.utils import timezone
+
+from . import payloads, services
+from .governor import backoff_delay
+from .models import SyncJob
+from .specs import SPECS
+
+logger = logging.getLogger(__name__)
+
+EN_ATTENTE, EN_COURS, TERMINE, ECHEC = "en_attente", "en_cours", "termine", "echec"
+ACTIFS = (EN_ATTENTE, EN_COURS)
+# sync d'un seul enregistrement (notification webhook), cf. enqueue_record
+RECORD = "record"
+# rétention de l'archive des payloads (payloads.prune), cf. schedule_due
+PAYLOADS = "payloads"
+
+# lots planifiés: identifiant déterministe par créneau, commun à tous les nœuds
+_SCHEDULE_NAMESPACE = uuid.UUID("6f1c5a52-0b7e-4d38-9a43-5f4a1f2e8c11")
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+def _visibility_timeout() -> float:
+    return float(_setting("JEB_JOB_VISIBILITY_TIMEOUT", 600))
+
+
+def worker_name(suffix: str = "") -> str:
+    """Identifiant d'un worker: machine, pid (et thread)."""
+    name = f"{socket.gethostname()}:{os.getpid()}"
+    return f"{name}:{suffix}" if suffix else name
+
+
+def enqueue(type: str, parametres: Optional[dict] = None, priorite: int = 0, cle: Optional[str] = None,
+            lot: Optional[uuid.UUID] = None, delai: float = 0) -> Optional[SyncJob]:
+    """Ajoute une tâche; None si une tâche active porte déjà la même `cle` (défaut "sync:<type>")."""
+    now = timezone.now()
+    job = SyncJob(
+        type=type,
+        cle=cle or f"sync:{type}",
+        parametres=json.dumps(parametres, ensure_ascii=False) if parametres else None,
+        priorite=priorite,
+        lot=lot or uuid.uuid4(),
+        max_tentatives=_setting("JEB_JOB_MAX_ATTEMPTS", 3),
+        disponible_le=now + timedelta(seconds=delai),
+        cree_le=now,
+    )
+    try:
+        with transaction.atomic():
+            job.save()
+    except IntegrityError:
+        return None
+    return job
+
+
+def enqueue_sync(labels: Optional[Iterable[str]] = None, priorite: int = 0, bulk: bool = False,
+                 lot: Optional[uuid.UUID] = None, full: bool = False) -> list:
+    """Met en file la sync des entités `labels` (défaut: toutes) dans un même lot; retourne les tâches créées."""
+    wanted = None if labels is None else set(labels)
+    lot = lot or uuid.uuid4()
+    params = {name: True for name, value in (("bulk", bulk), ("full", full)) if value} or None
+    jobs = [enqueue(spec.label, params, priorite, lot=lot)
+            for spec in SPECS if wanted is None or spec.label in wanted]
+    return [job for job in jobs if job is not None]
+
+
+def _record_key(label: str, remote_id) -> str:
+    return f"{RECORD}:{label}:{remote_id}"
+
+
+def enqueue_record(label: str, remote_id, event: str, payload: Optional[dict] = None, notifications: int = 1) -> tuple:
+    """Met en file la sync d'un enregistrement notifié; retourne (tâche, fusionnée)."""
+    key = _record_key(label, remote_id)
+    params = {"entity": label, "id": str(remote_id), "event": event, "payload": payload, "rafale": notifications}
+    for _ in range(3):
+        job = enqueue(RECORD, params, _setting("JEB_WEBHOOK_PRIORITY", 10), cle=key,
+                      delai=_setting("JEB_WEBHOOK_DEBOUNCE", 2))
+        if job is not None:
+            return job, False
+        # rafale: la tâche encore en attente (JEB_WEBHOOK_DEBOUNCE) prend le dernier évènement
+        with transaction.atomic():
+            pending = SyncJob.objects.select_for_update().filter(cle=key, statut=EN_ATTENTE).first()
+            if pending is not None:
+                params["rafale"] = pending.params.get("rafale", 1) + notifications
+                pending.parametres = json.dumps(params, ensure_ascii=False)
+                pending.save(update_fields=["parametres"])
+                return pending, True
+        # la tâche en attente vient d'être prise: nouvel essai
+    return None, False
+
+
+def _slot_lot(interval: float, name: str = "") -> uuid.UUID:
+    slot = int(timezone.now().timestamp() // interval)
+    return uuid.uuid5(_SCHEDULE_NAMESPACE, f"{name}{int(interval)}:{slot}")
+
+
+def schedule_due(interval: Optional[float] = None) -> list:
+    """Met en file les tâches planifiées du créneau courant (syncs, rétention des payloads) pas encore créées."""
+    interval = _setting("JEB_SYNC_INTERVAL", 7200) if interval is None else interval
+    jobs = []
+    if interval:
+        lot = _slot_lot(interval)
+        if not SyncJob.objects.filter(lot=lot).exists():
+            jobs = enqueue_sync(lot=lot)
+            if jobs:
+                logger.info("Lot planifié %s: %s", lot, ", ".join(job.type for job in jobs))
+    prune_interval = _setting("JEB_PAYLOAD_PRUNE_INTERVAL", 24 * 3600)
+    if prune_interval:
+        lot = _slot_lot(prune_interval, f"{PAYLOADS}:")
+        if not SyncJob.objects.filter(lot=lot).exists():
+            job = enqueue(PAYLOADS, lot=lot)
+            if job is not None:
+                jobs.append(job)
+    return jobs
+
+
+def purge(days: Optional[float] = None) -> int:
+    """Supprime les tâches terminées ou en échec depuis plus de JEB_JOB_RETENTION_DAYS (défaut 7)."""
+    days = _setting("JEB_JOB_RETENTION_DAYS", 7) if days is None else days
+    limit = timezone.now() - timedelta(days=days)
+    deleted, _ = SyncJob.objects.filter(statut__in=(TERMINE, ECHEC), fin__lt=limit).delete()
+    return deleted
+
+
+def _claimable(now, lot: Optional[uuid.UUID] = None):
+    ready = models.Q(statut=EN_ATTENTE, disponible_le__lte=now)
+    expired = models.Q(statut=EN_COURS, visible_le__lt=now)
+    qs = SyncJob.objects.filter(ready | expired)
+    if lot is not None:
+        qs = qs.filter(lot=lot)
+    # une tâche attend que ses prérequis (SYNC_DEPENDENCIES) du même lot ne soient plus actifs
+    for label, deps in services.SYNC_DEPENDENCIES.items():
+        pending = SyncJob.objects.filter(lot=models.OuterRef("lot"), type__in=deps, statut__in=ACTIFS)
+        qs = qs.exclude(models.Q(type=label) & models.Exists(pending))
+    return qs.order_by("-priorite", "disponible_le", "id")
+
+
+def claim(worker: str, timeout: Optional[float] = None, lot: Optional[uuid.UUID] = None) -> Optional[SyncJob]:
+    """Réserve la prochaine tâche disponible pour `worker` (du lot `lot` si donné), None si la file est vide."""
+    timeout = _visibility_timeout() if timeout is None else timeout
+    while True:
+        now = timezone.now()
+        with transaction.atomic():
+            # SKIP LOCKED (Postgres): les workers réservent en parallèle sans s'attendre
+            job = _claimable(now, lot).select_for_update(skip_locked=True).first()
+            if job is None:
+                return None
+            # l'UPDATE conditionnel protège aussi les bases sans FOR UPDATE (SQLite)
+            current = SyncJob.objects.filter(pk=job.pk, statut=job.statut, tentatives=job.tentatives)
+            if job.statut == EN_COURS and job.tentatives >= job.max_tentatives:
+                current.update(statut=ECHEC, fin=now, visible_le=None,
+                               erreur=f"réservation de {job.worker} expirée, tentatives épuisées")
+                logger.error("Tâche %s (%s) abandonnée: réservation expirée", job.pk, job.type)
+                continue
+            if job.statut == EN_COURS:
+                logger.warning("Tâche %s (%s) reprise: réservation de %s expirée", job.pk, job.type, job.worker)
+            values = {"statut": EN_COURS, "worker": worker, "tentatives": job.tentatives + 1,
+                      "visible_le": now + timedelta(seconds=timeout), "debut": now}
+            if job.type == RECORD:
+                # la clé ne dédoublonne que l'attente: une notification arrivée
+                # pendant l'exécution doit relancer la sync de l'enregistrement
+                values["cle"] = None
+            if not current.update(**values):
+                continue
+        for name, value in values.items():
+            setattr(job, name, value)
+        return job
+
+
+def _extend(job: SyncJob, timeout: float, stop: threading.Event):
+    """Prolonge la réservation de `job` toutes les timeout/3 secondes jusqu'à `stop`."""
+    try:
+        while not stop.wait(timeout / 3):
+            try:
+                extended = SyncJob.objects.filter(pk=job.pk, worker=job.worker, statut=EN_COURS).update(
+                    visible_le=timezone.now() + timedelta(seconds=timeout))
+            except DatabaseError:
+                # base occupée (SQLite verrouillée par la sync): on réessaie au prochain tour
+                logger.warning("Tâche %s: réservation non prolongée", job.pk, exc_info=True)
+                continue
+            if not extended:
+                logger.warning("Tâche %s: réservation perdue par %s", job.pk, job.worker)
+                return
+    finally:
+        connection.close()
+
+
+def _handler(job: SyncJob) -> tuple:
+    """(libellé du journal SyncRun, fonction de sync) de la tâche; fonction None si le type est inconnu."""
+    params = job.params
+    specs = {spec.label: spec for spec in SPECS}
+    if job.type == RECORD and params.get("entity") in specs:
+        spec = specs[params["entity"]]
+        fn = partial(services.sync_record, spec, params.get("id"), payload=params.get("payload"),
+                     deleted=params.get("event") == "deleted")
+        return f"{spec.label}:{RECORD}", fn
+    if job.type in specs:
+        return job.type, partial(services.sync_entity, specs[job.type], bulk=bool(params.get("bulk")),
+                                 full=bool(params.get("full")))
+    if job.type == PAYLOADS:
+        return PAYLOADS, _prune_payloads
+    return job.type, None
+
+
+def _prune_payloads(client=None) -> dict:
+    deleted = payloads.prune()
+    logger.info("Archive des payloads: %d blob(s) non référencé(s) supprimé(s)", deleted)
+    return {"ok": True, "deleted": deleted}
+
+
+def run(job: SyncJob, timeout: Optional[float] = None, profile: bool = False) -> dict:
+    """Exécute une tâche réservée et enregistre son issue (SyncRun, nouvelle tentative en cas d'échec)."""
+    timeout = _visibility_timeout() if timeout is None else timeout
+    label, fn = _handler(job)
+    if fn is None:
+        result = {"ok": False, "error": f"type de tâche inconnu: {job.type}"}
+        logger.error("Tâche %s: type inconnu %r", job.pk, job.type)
+        _finish(job, result, retry=False)
+        return result
+    stop = threading.Event()
+    heartbeat = threading.Thread(target=_extend, args=(job, timeout, stop), daemon=True, name=f"jeb-job-{job.pk}")
+    heartbeat.start()
+    try:
+        result = services._run_sync_task(label, fn, job.lot, profile=profile, worker=False)
+    finally:
+        stop.set()
+        heartbeat.join()
+    _finish(job, result)
+    return result
+
+
+def _finish(job: SyncJob, result: dict, retry: bool = True):
+    now = timezone.now()
+    values = {"fin": now, "visible_le": None, "resultat": json.dumps(result, ensure_ascii=False, default=str)}
+    if result.get("ok"):
+        values.update(statut=TERMINE, erreur=None)
+    elif retry and not result.get("permanent") and job.tentatives < job.max_tentatives:
+        delay = backoff_delay(job.tentatives - 1, base=_setting("JEB_JOB_RETRY_DELAY", 60),
+                              cap=_setting("JEB_JOB_RETRY_MAX", 3600))
+        values.update(statut=EN_ATTENTE, erreur=result.get("error"), disponible_le=now + timedelta(seconds=delay))
+        if job.type == RECORD:
+            # clé libérée par claim: de nouveau en attente, la tâche dédoublonne les notifications
+            values["cle"] = _record_key(job.params.get("entity"), job.params.get("id"))
+        logger.warning("Tâche %s (%s) en échec, nouvelle tentative dans %.0f s", job.pk, job.type, delay)
+    else:
+        values.update(statut=ECHEC, erreur=result.get("error"))
+        if result.get("permanent"):
+            logger.error("Tâche %s (%s) en échec définitif: %s", job.pk, job.type, result.get("error"))
+        elif retry:
+            logger.error("Tâche %s (%s) en échec après %d tentative(s)", job.pk, job.type, job.tentatives)
+    current = SyncJob.objects.filter(pk=job.pk, worker=job.worker, statut=EN_COURS)
+    try:
+        with transaction.atomic():
+            updated = current.update(**values)
+    except IntegrityError:
+        # une notification reçue pendant l'exécution attend déjà sous cette clé: elle relancera la sync
+        values.update(statut=ECHEC, cle=None)
+        updated = current.update(**values)
+        logger.info("Tâche %s (%s) non remise en file: tâche plus récente en attente", job.pk, job.type)
+    # une tâche reprise entre-temps par un autre worker ne lui appartient plus
+    if not updated:
+        logger.warning("Tâche %s: issue ignorée, réservation perdue par %s", job.pk, job.worker)
+
+
+def work(worker: str, stop: threading.Event, poll: Optional[float] = None, max_jobs: Optional[int] = None,
+         schedule: bool = True) -> int:
+    """Boucle d'un worker: réserve et exécute les tâches jusqu'à `stop` (ou `max_jobs`); retourne leur nombre."""
+    poll = _setting("JEB_JOB_POLL", 5) if poll is None else poll
+    done = 0
+    try:
+        while not stop.is_set() and (max_jobs is None or done < max_jobs):
+            job = claim(worker)
+            if job is not None:
+                logger.info("%s: tâche %s (%s), tentative %d", worker, job.pk, job.type, job.tentatives)
+                run(job)
+                done += 1
+                continue
+            # file vide: lot planifié s'il est dû, purge, puis attente de JEB_JOB_POLL secondes
+            if schedule and schedule_due():
+                continue
+            purge()
+            stop.wait(poll)
+    finally:
+        connection.close()
+    return done
+
+
+def run_lot(lot: uuid.UUID, concurrency: int = 1, poll: float = 1, profile: bool = False) -> dict:
+    """Exécute sur place les tâches du lot `lot` (commande sync_all); retourne {type: résultat}."""
+    if connection.vendor == "sqlite":
+        concurrency = 1
+
+    def _work(name):
+        while True:
+            job = claim(name, lot=lot)
+            if job is not None:
+                run(job, profile=profile)
+            # tâches prises par un jeb_worker: attendues
+            elif SyncJob.objects.filter(lot=lot, statut=EN_COURS).exists():
+                time.sleep(poll)
+            else:
+                return
+
+    def _thread(name):
+        try:
+            _work(name)
+        finally:
+            connection.close()
+
+    if concurrency <= 1:
+        _work(worker_name())
+    else:
+        threads = [threading.Thread(target=_thread, args=(worker_name(str(i)),), name=f"jeb-lot-{i}")
+                   for i in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    results = {}
+    for job in SyncJob.objects.filter(lot=lot).order_by("id"):
+        try:
+            result = json.loads(job.resultat) if job.resultat else {}
+        except ValueError:
+            result = {}
+        if job.statut != TERMINE:
+            result.update(ok=False, error=job.erreur or result.get("error"))
+        # remise en file après un échec: laissée aux workers
+        if job.statut in ACTIFS:
+            result["queued"] = True
+        results[job.type] = result
+    return results
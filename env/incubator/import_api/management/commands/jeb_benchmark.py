@@ -0,0 +1,91 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from import_api import benchmark
+from import_api.specs import SPECS
+
+class Command(BaseCommand):
+    help = ("Mesure chaque sync contre un faux serveur JEB, sur une base de test jetable, à 1k / 10k / 100k "
+            "items, et compare à la baseline (requêtes SQL et HTTP par item, débit, pic RSS).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default=','.join(str(s) for s in benchmark.DEFAULT_SIZES),
+                            help="Tailles de jeu de données, séparées par des virgules")
+        parser.add_argument('--entity', action='append', choices=[s.label for s in SPECS], dest='entities',
+                            help="Entité à mesurer (répétable; défaut: toutes)")
+        parser.add_argument('--latency', type=float, default=0.0, help="Latence simulée du serveur, en ms")
+        parser.add_argument('--page-size', type=int, default=100)
+        parser.add_argument('--partial', type=float, default=0.3, help="Part des startups partielles en liste")
+        parser.add_argument('--churn', type=float, default=0.1, help="Part des items modifiés en phase update")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--full', action='store_true',
+                            help="Phases warm / update en listes complètes plutôt qu'incrémentales (baseline distincte)")
+        parser.add_argument('--bulk', action='store_true',
+                            help="Toutes les phases en réimport complet (sync_all --bulk; baseline distincte)")
+        parser.add_argument('--baseline', default=benchmark.BASELINE_PATH)
+        parser.add_argument('--update-baseline', action='store_true',
+                            help="Enregistre les mesures comme nouvelle baseline au lieu de comparer")
+        parser.add_argument('--tolerance', action='append', default=[], metavar='METRIQUE=RATIO',
+                            help="Surcharge une tolérance, ex: rows_per_sec=0.3")
+        parser.add_argument('--output', help="Écrit aussi le rapport JSON dans ce fichier")
+        parser.add_argument('--keepdb', action='store_true', help="Conserve la base de test entre deux exécutions")
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(s) for s in options['sizes'].split(',') if s.strip()]
+            tolerances = {k: float(v) for k, v in (t.split('=', 1) for t in options['tolerance'])}
+        except ValueError as e:
+            raise CommandError(f"Option invalide: {e}")
+        unknown = set(tolerances) - set(benchmark.DEFAULT_TOLERANCES)
+        if unknown:
+            raise CommandError(f"Métriques inconnues: {', '.join(sorted(unknown))}")
+
+        old_name = connection.settings_dict['NAME']
+        # schéma construit depuis les modèles plutôt que rejoué depuis les
+        # migrations (celles de startups ne suivent plus le modèle)
+        connection.settings_dict.setdefault('TEST', {})['MIGRATE'] = False
+        with benchmark.unmanaged_tables():
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'],
+                                               serialize=False)
+        try:
+            benchmark.prepare_database()
+            self.stdout.write(f"{'taille':>7} {'phase':<7} {'entité':<10} {'items':>7} {'s':>8} {'lignes/s':>9} "
+                              f"{'sql/item':>9} {'http/item':>9} {'rss Mo':>7}")
+            report = benchmark.run_benchmark(
+                sizes=sizes,
+                labels=options['entities'],
+                latency=options['latency'] / 1000.0,
+                page_size=options['page_size'],
+                partial_ratio=options['partial'],
+                churn=options['churn'],
+                seed=options['seed'],
+                full=options['full'],
+                bulk=options['bulk'],
+                log=self._log,
+            )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as fh:
+                json.dump(report, fh, indent=2)
+        if options['update_baseline']:
+            benchmark.save_baseline(report, options['baseline'])
+            self.stdout.write(self.style.SUCCESS(f"Baseline {report['vendor']} mise à jour: {options['baseline']}"))
+            return
+
+        baseline = benchmark.load_baseline(options['baseline'])
+        if report['vendor'] not in baseline:
+            self.stdout.write(self.style.WARNING(
+                f"Pas de baseline {report['vendor']} dans {options['baseline']} (--update-baseline pour en créer une)"))
+        regressions = benchmark.compare(report, baseline, tolerances)
+        if regressions:
+            for line in regressions:
+                self.stderr.write(self.style.ERROR(f"RÉGRESSION {line}"))
+            raise CommandError(f"{len(regressions)} régression(s) par rapport à la baseline")
+        self.stdout.write(self.style.SUCCESS("Aucune régression par rapport à la baseline."))
+
+    def _log(self, size, phase, label, m):
+        self.stdout.write(f"{size:>7} {phase:<7} {label:<10} {m['items']:>7} {m['seconds'] or 0:>8.2f} "
+                          f"{m['rows_per_sec'] or 0:>9.1f} {m['queries_per_item']:>9.3f} "
+                          f"{m['requests_per_item']:>9.4f} {m['peak_rss_mb'] or 0:>7.1f}")
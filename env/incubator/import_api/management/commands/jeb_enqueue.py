@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from import_api import jobs
+from import_api.specs import SPECS
+
+class Command(BaseCommand):
+    help = ("Met en file la sync des entités (toutes par défaut) pour les workers jeb_worker. "
+            "Une entité déjà en attente ou en cours n'est pas ajoutée une seconde fois.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--entity', action='append', choices=[s.label for s in SPECS], dest='entities',
+                            help="Entité à synchroniser (répétable; défaut: toutes)")
+        parser.add_argument('--priority', type=int, default=0, help="Priorité (la plus haute passe d'abord)")
+        parser.add_argument('--bulk', action='store_true', help="Réimport complet par COPY (cf. sync_all --bulk)")
+        parser.add_argument('--full', action='store_true', help="Listes complètes, sans filtre incrémental (cf. sync_all --full)")
+
+    def handle(self, *args, **options):
+        created = jobs.enqueue_sync(options['entities'], priorite=options['priority'], bulk=options['bulk'],
+                                      full=options['full'])
+        for job in created:
+            self.stdout.write(f"{job.type}: tâche {job.pk} (lot {job.lot})")
+        skipped = len(set(options['entities'] or [s.label for s in SPECS])) - len(created)
+        if skipped:
+            self.stdout.write(f"{skipped} entité(s) déjà en file.")
+        self.stdout.write(self.style.SUCCESS(f"{len(created)} tâche(s) ajoutée(s)."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from import_api import payloads
+
+class Command(BaseCommand):
+    help = ("Supprime de l'archive des payloads (import_api_payloads) les blobs qu'aucune trace ImportAPI "
+            "ne référence plus. Les workers jeb_worker le font une fois par JEB_PAYLOAD_PRUNE_INTERVAL.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace', type=float,
+                            help="Garde les blobs écrits depuis moins de N secondes (défaut JEB_PAYLOAD_GRACE, 3600)")
+
+    def handle(self, *args, **options):
+        deleted = payloads.prune(grace=options['grace'])
+        self.stdout.write(self.style.SUCCESS(f"{deleted} blob(s) supprimé(s)."))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from import_api.standin import RESOURCES, record
+
+class Command(BaseCommand):
+    help = "Enregistre les réponses de l'API JEB (JEB_API_BASE) comme fixtures pour jeb_standin --fixtures."
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', help="Répertoire de sortie")
+        parser.add_argument('--resource', action='append', choices=RESOURCES, dest='resources',
+                            help="Ressource à enregistrer (répétable; défaut: toutes)")
+        parser.add_argument('--details', choices=['partial', 'all', 'none'], default='partial',
+                            help="Ressources détail à enregistrer (défaut: items de liste partiels)")
+
+    def handle(self, *args, **options):
+        counts = record(options['directory'], resources=options['resources'], details=options['details'])
+        for resource, count in counts.items():
+            self.stdout.write(f"{resource}: {count} items")
+        self.stdout.write(self.style.SUCCESS(f"Fixtures enregistrées dans {options['directory']}"))
@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand, CommandError
+from import_api.standin import RESOURCES, Catalog, StandinServer
+
+class Command(BaseCommand):
+    help = ("Lance un faux serveur JEB local (données synthétiques ou enregistrées) "
+            "pour mesurer la sync sans l'API réelle: JEB_API_BASE=<url affichée> python manage.py sync_all")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--fixtures', help="Répertoire enregistré par jeb_record (sinon données synthétiques)")
+        parser.add_argument('--count', type=int, default=100, help="Nombre d'items synthétiques par ressource")
+        for resource in RESOURCES:
+            parser.add_argument(f'--{resource}', type=int, help=f"Nombre de {resource} (défaut: --count)")
+        parser.add_argument('--partial', type=float, default=0.3,
+                            help="Part des startups servies partielles en liste (force la requête détail)")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--latency', type=float, default=0.0, help="Latence fixe par requête, en ms")
+        parser.add_argument('--jitter', type=float, default=0.0, help="Latence aléatoire ajoutée (0..jitter ms)")
+        parser.add_argument('--page-size', type=int, default=0, help="Pagination DRF (0: liste brute)")
+        parser.add_argument('--prefix', default='', help="Préfixe des routes, ex: /api")
+        parser.add_argument('--max-inflight', type=int, default=0, help="Au-delà, réponses 429 + Retry-After")
+        parser.add_argument('--no-etag', action='store_true', help="Désactive ETag / 304")
+        parser.add_argument('--delta-param', default='updated_since',
+                            help="Paramètre de liste 'modifié depuis' accepté ('' : filtre non supporté)")
+
+    def handle(self, *args, **options):
+        if options['fixtures']:
+            catalog = Catalog.load(options['fixtures'])
+            if not catalog.lists:
+                raise CommandError(f"Aucune fixture trouvée dans {options['fixtures']}")
+        else:
+            counts = {r: options[r] if options[r] is not None else options['count'] for r in RESOURCES}
+            catalog = Catalog.synthesize(counts, partial=options['partial'], seed=options['seed'])
+        server = StandinServer(
+            catalog,
+            host=options['host'],
+            port=options['port'],
+            latency=options['latency'] / 1000.0,
+            jitter=options['jitter'] / 1000.0,
+            page_size=options['page_size'],
+            prefix=options['prefix'],
+            etags=not options['no_etag'],
+            max_inflight=options['max_inflight'],
+            seed=options['seed'],
+            delta_param=options['delta_param'] or None,
+        )
+        sizes = ", ".join(f"{r}={len(items)}" for r, items in catalog.lists.items())
+        self.stdout.write(f"Faux serveur JEB sur {server.base_url} ({sizes})")
+        self.stdout.write(f"  JEB_API_BASE={server.base_url} python manage.py sync_all --profile")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f"Arrêt après {server.requests} requêtes.")
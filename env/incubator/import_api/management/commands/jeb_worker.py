@@ -0,0 +1,50 @@
+import signal
+import threading
+from django.core.management.base import BaseCommand
+from django.db import connection
+from import_api import jobs
+
+class Command(BaseCommand):
+    help = ("Worker de la file de sync: réserve et exécute les tâches (SELECT ... FOR UPDATE SKIP LOCKED), "
+            "et met en file le lot planifié toutes les JEB_SYNC_INTERVAL secondes. Remplace le cron sync_all.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=1,
+                            help="Nombre de tâches exécutées en parallèle par ce processus (1 sur SQLite)")
+        parser.add_argument('--max-jobs', type=int, help="S'arrête après ce nombre de tâches (par thread)")
+        parser.add_argument('--poll', type=float, help="Attente quand la file est vide, en secondes (JEB_JOB_POLL)")
+        parser.add_argument('--no-schedule', action='store_true',
+                            help="N'ajoute pas le lot planifié (tâches ajoutées seulement par jeb_enqueue)")
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+
+        def _stop(signum, frame):
+            # la tâche en cours se termine, puis le worker s'arrête
+            self.stderr.write("Arrêt demandé, fin de la tâche en cours...")
+            stop.set()
+
+        signal.signal(signal.SIGTERM, _stop)
+        signal.signal(signal.SIGINT, _stop)
+
+        concurrency = max(1, options['concurrency'])
+        if connection.vendor == 'sqlite':
+            concurrency = 1
+        kwargs = {'poll': options['poll'], 'max_jobs': options['max_jobs'], 'schedule': not options['no_schedule']}
+        if concurrency == 1:
+            done = jobs.work(jobs.worker_name(), stop, **kwargs)
+        else:
+            counts = [0] * concurrency
+
+            def _work(index):
+                counts[index] = jobs.work(jobs.worker_name(str(index)), stop, **kwargs)
+
+            threads = [threading.Thread(target=_work, args=(i,), name=f"jeb-worker-{i}") for i in range(concurrency)]
+            for thread in threads:
+                thread.start()
+            # join par tranches: le thread principal reste réactif aux signaux
+            while any(thread.is_alive() for thread in threads):
+                for thread in threads:
+                    thread.join(0.5)
+            done = sum(counts)
+        self.stdout.write(self.style.SUCCESS(f"{done} tâche(s) exécutée(s)."))
@@ -0,0 +1,54 @@
+import json
+import uuid
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from import_api import jobs
+from import_api.specs import SPECS
+
+class Command(BaseCommand):
+    help = ("Lance la synchronisation de toutes les entités externes (startups, users, investors, partners, news, events). "
+            "Les syncs passent par la file (comme jeb_enqueue) puis sont exécutées sur place: une entité déjà en "
+            "attente ou en cours chez un worker n'est pas synchronisée deux fois.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pretty', action='store_true', help='Affiche le JSON formaté')
+        parser.add_argument('--profile', action='store_true',
+                            help='Ajoute les durées par phase (HTTP / parse / DB) et le débit de chaque entité')
+        parser.add_argument('--bulk', action='store_true',
+                            help="Réimport complet: COPY vers des tables de staging puis fusion en une requête "
+                                 "par table (Postgres; upserts par lots ailleurs)")
+        parser.add_argument('--full', action='store_true',
+                            help="Listes complètes (avec réconciliation) même si une sync incrémentale est possible")
+
+    def handle(self, *args, **options):
+        lot = uuid.uuid4()
+        queued = {job.type for job in jobs.enqueue_sync(lot=lot, bulk=options.get('bulk', False),
+                                                        full=options.get('full', False))}
+        done = jobs.run_lot(lot, concurrency=getattr(settings, 'JEB_SYNC_PARALLELISM', 4),
+                            profile=options.get('profile', False))
+        # entité déjà en file ou en cours chez un worker: pas de seconde sync concurrente
+        results = {spec.label: done.get(spec.label) if spec.label in queued else {'ok': True, 'skipped': 'déjà en file'}
+                   for spec in SPECS}
+        if options.get('pretty'):
+            self.stdout.write(json.dumps(results, indent=2, ensure_ascii=False))
+        else:
+            self.stdout.write(json.dumps(results, ensure_ascii=False))
+        if options.get('profile'):
+            self._write_profile(results)
+        # Code de retour non-zero si au moins un échec
+        if any(not (r.get('ok')) for r in results.values()):
+            self.stderr.write(self.style.ERROR('Une ou plusieurs synchronisations ont échoué.'))
+            raise SystemExit(1)
+        self.stdout.write(self.style.SUCCESS('Synchronisation complète terminée.'))
+
+    def _write_profile(self, results):
+        header = f"{'entité':<10} {'total s':>8} {'http s':>8} {'parse s':>8} {'db s':>8} {'req':>6} {'sql':>6} {'Ko':>9} {'lignes/s':>9}"
+        self.stdout.write(header)
+        for label, result in results.items():
+            p = result.get('profile') or {}
+            self.stdout.write(
+                f"{label:<10} {p.get('seconds', 0):>8.2f} {p.get('http_seconds', 0):>8.2f} "
+                f"{p.get('parse_seconds', 0):>8.2f} {p.get('db_seconds', 0):>8.2f} "
+                f"{p.get('http_requests', 0):>6} {p.get('db_queries', 0):>6} "
+                f"{p.get('bytes_received', 0) / 1024:>9.1f} {p.get('rows_per_sec', 0):>9.1f}"
+            )
@@ -0,0 +1,73 @@
+import threading
+import time
+from typing import Iterable, Iterator
+
+
+class SyncMetrics:
+    """Compteurs d'une sync d'entité, par phase.
+
+    Alimentés par le client HTTP (client.metrics), la lecture des listes
+    (temps de décodage JSON) et un execute_wrapper posé sur la connexion base
+    du thread de la sync. Les requêtes détail partant de plusieurs threads,
+    http_seconds est un temps cumulé qui peut dépasser la durée réelle.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.http_seconds = 0.0
+        self.parse_seconds = 0.0
+        self.db_seconds = 0.0
+        self.http_requests = 0
+        self.db_queries = 0
+        self.bytes_received = 0
+
+    def add_http(self, seconds: float, nbytes: int = 0, requests: int = 0):
+        with self._lock:
+            self.http_seconds += seconds
+            self.bytes_received += nbytes
+            self.http_requests += requests
+
+    def add_parse(self, seconds: float):
+        with self._lock:
+            self.parse_seconds += max(0.0, seconds)
+
+    def db_wrapper(self, execute, sql, params, many, context):
+        """À poser avec connection.execute_wrapper(): chronomètre chaque requête SQL."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.db_seconds += elapsed
+                self.db_queries += 1
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "http_seconds": round(self.http_seconds, 3),
+                "parse_seconds": round(self.parse_seconds, 3),
+                "db_seconds": round(self.db_seconds, 3),
+                "http_requests": self.http_requests,
+                "db_queries": self.db_queries,
+                "bytes_received": self.bytes_received,
+            }
+
+
+class Stopwatch:
+    """Temps cumulé passé à attendre les éléments des itérables enveloppés par wrap()."""
+
+    def __init__(self):
+        self.seconds = 0.0
+
+    def wrap(self, iterable: Iterable) -> Iterator:
+        it = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+            finally:
+                self.seconds += time.perf_counter() - start
+            yield item
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-17 17:55
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('import_api', '0002_alter_importapi_payload_brut'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EndpointDiscovery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cible_type', models.CharField(max_length=100)),
+                ('portee', models.CharField(choices=[('list', 'Liste'), ('detail', 'Détail')], default='list', max_length=20)),
+                ('chemin', models.CharField(max_length=255)),
+                ('verifie_le', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'import_api_endpoints',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='endpointdiscovery',
+            constraint=models.UniqueConstraint(fields=('cible_type', 'portee'), name='uix_import_api_endpoint_type_portee'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations, models
+
+
+def dedupe_traces(apps, schema_editor):
+    """Supprime les doublons (source, cible_type, remote_id) en gardant le plus récent."""
+    ImportAPI = apps.get_model('import_api', 'ImportAPI')
+    seen = set()
+    doublons = []
+    rows = (
+        ImportAPI.objects.order_by('source', 'cible_type', 'remote_id', '-dernier_sync', '-id')
+        .values_list('id', 'source', 'cible_type', 'remote_id')
+        .iterator()
+    )
+    for pk, source, cible_type, remote_id in rows:
+        key = (source, cible_type, remote_id)
+        if key in seen:
+            doublons.append(pk)
+        else:
+            seen.add(key)
+    for i in range(0, len(doublons), 500):
+        ImportAPI.objects.filter(id__in=doublons[i:i + 500]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('import_api', '0003_endpointdiscovery'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_traces, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='importapi',
+            constraint=models.UniqueConstraint(fields=('source', 'cible_type', 'remote_id'), name='uix_import_api_source_type_remote'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-17 17:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('import_api', '0004_importapi_uix_import_api_source_type_remote'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importapi',
+            name='payload_hash',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+    ]
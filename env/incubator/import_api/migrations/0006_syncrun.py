@@ -0,0 +1,42 @@
+# Generated by Django 5.2.5 on 2026-10-17 18:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('import_api', '0005_importapi_payload_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('lot', models.UUIDField(db_index=True)),
+                ('entite', models.CharField(max_length=100)),
+                ('debut', models.DateTimeField()),
+                ('fin', models.DateTimeField()),
+                ('ok', models.BooleanField(default=True)),
+                ('duree_http', models.FloatField(default=0)),
+                ('duree_parse', models.FloatField(default=0)),
+                ('duree_db', models.FloatField(default=0)),
+                ('nb_requetes_http', models.IntegerField(default=0)),
+                ('nb_requetes_sql', models.IntegerField(default=0)),
+                ('octets_recus', models.BigIntegerField(default=0)),
+                ('lignes_par_sec', models.FloatField(default=0)),
+                ('nb_lignes', models.IntegerField(default=0)),
+                ('nb_crees', models.IntegerField(default=0)),
+                ('nb_maj', models.IntegerField(default=0)),
+                ('nb_inchanges', models.IntegerField(default=0)),
+                ('nb_erreurs', models.IntegerField(default=0)),
+                ('resultat', models.TextField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'import_api_sync_runs',
+                'ordering': ['-debut'],
+                'indexes': [models.Index(fields=['entite', '-debut'], name='ix_import_api_sync_run_ent')],
+            },
+        ),
+    ]
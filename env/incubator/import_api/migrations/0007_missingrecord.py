@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-17 18:28
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('import_api', '0006_syncrun'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MissingRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cible_type', models.CharField(max_length=100)),
+                ('local_id', models.BigIntegerField()),
+                ('statut', models.CharField(choices=[('signale', 'Signalé'), ('supprime', 'Supprimé (logique)'), ('archive', 'Archivé')], default='signale', max_length=20)),
+                ('detecte_le', models.DateTimeField(default=django.utils.timezone.now)),
+                ('vu_le', models.DateTimeField(default=django.utils.timezone.now)),
+                ('donnees', models.TextField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'import_api_missing',
+                'ordering': ['cible_type', 'local_id'],
+                'constraints': [models.UniqueConstraint(fields=('cible_type', 'local_id'), name='uix_import_api_missing_type_id')],
+            },
+        ),
+    ]
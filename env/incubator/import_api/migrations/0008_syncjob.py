@@ -0,0 +1,43 @@
+# Generated by Django 5.2.5 on 2026-10-17 18:48
+
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('import_api', '0007_missingrecord'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type', models.CharField(max_length=100)),
+                ('cle', models.CharField(blank=True, max_length=255, null=True)),
+                ('parametres', models.TextField(blank=True, null=True)),
+                ('priorite', models.IntegerField(default=0)),
+                ('statut', models.CharField(choices=[('en_attente', 'En attente'), ('en_cours', 'En cours'), ('termine', 'Terminé'), ('echec', 'Échec')], default='en_attente', max_length=20)),
+                ('lot', models.UUIDField(db_index=True, default=uuid.uuid4)),
+                ('tentatives', models.IntegerField(default=0)),
+                ('max_tentatives', models.IntegerField(default=3)),
+                ('disponible_le', models.DateTimeField(default=django.utils.timezone.now)),
+                ('visible_le', models.DateTimeField(blank=True, null=True)),
+                ('worker', models.CharField(blank=True, max_length=255, null=True)),
+                ('cree_le', models.DateTimeField(default=django.utils.timezone.now)),
+                ('debut', models.DateTimeField(blank=True, null=True)),
+                ('fin', models.DateTimeField(blank=True, null=True)),
+                ('erreur', models.TextField(blank=True, null=True)),
+                ('resultat', models.TextField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'import_api_jobs',
+                'ordering': ['-cree_le'],
+                'indexes': [models.Index(fields=['statut', '-priorite', 'disponible_le'], name='ix_import_api_job_file')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('statut__in', ['en_attente', 'en_cours'])), fields=('cle',), name='uix_import_api_job_cle_active')],
+            },
+        ),
+    ]
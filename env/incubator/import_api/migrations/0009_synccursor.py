@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-17 18:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('import_api', '0008_syncjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cible_type', models.CharField(max_length=100)),
+                ('dernier_succes', models.DateTimeField(blank=True, null=True)),
+                ('dernier_complet', models.DateTimeField(blank=True, null=True)),
+                ('max_maj_distante', models.DateTimeField(blank=True, null=True)),
+                ('filtre', models.CharField(blank=True, max_length=100, null=True)),
+                ('filtre_chemin', models.CharField(blank=True, max_length=255, null=True)),
+                ('filtre_verifie_le', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'import_api_cursors',
+                'constraints': [models.UniqueConstraint(fields=('cible_type',), name='uix_import_api_cursor_type')],
+            },
+        ),
+    ]
@@ -0,0 +1,90 @@
+import hashlib
+import json
+import zlib
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def archive_payloads(apps, schema_editor):
+    """Déplace les payload_brut existants dans l'archive compressée et vide la colonne.
+
+    L'empreinte est recalculée sur le JSON canonisé (comme payloads.digest);
+    un payload_brut illisible est laissé en place.
+    """
+    ImportAPI = apps.get_model('import_api', 'ImportAPI')
+    PayloadBlob = apps.get_model('import_api', 'PayloadBlob')
+    now = django.utils.timezone.now()
+    last = 0
+    while True:
+        rows = list(
+            ImportAPI.objects.filter(id__gt=last, payload_brut__isnull=False)
+            .order_by('id').values_list('id', 'payload_brut')[:500]
+        )
+        if not rows:
+            return
+        last = rows[-1][0]
+        blobs, traces = {}, []
+        for pk, text in rows:
+            try:
+                payload = json.loads(text)
+            except ValueError:
+                continue
+            data = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+            key = hashlib.sha256(data).hexdigest()
+            blobs[key] = PayloadBlob(empreinte=key, donnees=zlib.compress(data, 6), taille=len(data),
+                                     cree_le=now, vu_le=now)
+            traces.append(ImportAPI(id=pk, payload_hash=key, payload_brut=None))
+        PayloadBlob.objects.bulk_create(blobs.values(), ignore_conflicts=True)
+        ImportAPI.objects.bulk_update(traces, ['payload_hash', 'payload_brut'])
+
+
+def restore_payloads(apps, schema_editor):
+    """Inverse: remet le payload archivé dans payload_brut."""
+    ImportAPI = apps.get_model('import_api', 'ImportAPI')
+    PayloadBlob = apps.get_model('import_api', 'PayloadBlob')
+    last = 0
+    while True:
+        rows = list(
+            ImportAPI.objects.filter(id__gt=last, payload_brut__isnull=True, payload_hash__isnull=False)
+            .order_by('id').values_list('id', 'payload_hash')[:500]
+        )
+        if not rows:
+            return
+        last = rows[-1][0]
+        blobs = dict(PayloadBlob.objects.filter(empreinte__in={key for _, key in rows})
+                     .values_list('empreinte', 'donnees'))
+        traces = [
+            ImportAPI(id=pk, payload_brut=json.dumps(json.loads(zlib.decompress(bytes(blobs[key]))),
+                                                     ensure_ascii=False))
+            for pk, key in rows if key in blobs
+        ]
+        ImportAPI.objects.bulk_update(traces, ['payload_brut'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('import_api', '0009_synccursor'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PayloadBlob',
+            fields=[
+                ('empreinte', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('donnees', models.BinaryField()),
+                ('taille', models.IntegerField(default=0)),
+                ('cree_le', models.DateTimeField(default=django.utils.timezone.now)),
+                ('vu_le', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'import_api_payloads',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='importapi',
+            index=models.Index(fields=['payload_hash'], name='ix_import_api_payload_hash'),
+        ),
+        migrations.RunPython(archive_payloads, restore_payloads),
+    ]
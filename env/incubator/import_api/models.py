@@ -0,0 +1,272 @@
+from django.db import models
+from django.utils import timezone
+import json
+import uuid
+import zlib
+
+class ImportAPI(models.Model):
+    source = models.CharField(max_length=255, default='API JEB')
+    remote_id = models.CharField(max_length=255)
+    local_id = models.IntegerField()
+    cible_type = models.CharField(max_length=100)
+    dernier_sync = models.DateTimeField(default=timezone.now)
+    # Ancien stockage du payload en texte JSON; vidé par la migration 0010,
+    # le payload est désormais archivé compressé dans PayloadBlob.
+    payload_brut = models.TextField(blank=True, null=True)
+    # Empreinte sha256 du payload canonisé: permet de sauter les items inchangés
+    # et référence le payload archivé (PayloadBlob.empreinte)
+    payload_hash = models.CharField(max_length=64, blank=True, null=True)
+
+    class Meta:
+        db_table = 'import_api'
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'cible_type', 'remote_id'], name='uix_import_api_source_type_remote')
+        ]
+        indexes = [
+            # anti-jointure de payloads.prune
+            models.Index(fields=['payload_hash'], name='ix_import_api_payload_hash'),
+        ]
+
+    def __str__(self):
+        return f"Import {self.source} {self.remote_id} -> {self.local_id} ({self.cible_type})"
+
+    @property
+    def payload(self):
+        """Payload brut décodé (archive, ou payload_brut pour une trace non migrée); None si perdu.
+
+        Mis en cache sur l'instance; payloads.attach le précharge pour une liste de traces.
+        """
+        if not hasattr(self, '_payload'):
+            blob = PayloadBlob.objects.filter(pk=self.payload_hash).first() if self.payload_hash else None
+            if blob is not None:
+                self._payload = blob.contenu
+            else:
+                try:
+                    self._payload = json.loads(self.payload_brut) if self.payload_brut else None
+                except ValueError:
+                    self._payload = None
+        return self._payload
+
+    def set_payload(self, data):
+        """Archive `data` et y fait pointer la trace (à sauvegarder ensuite)."""
+        from .payloads import store_one
+        self.payload_hash = store_one(data)
+        self.payload_brut = None
+        self._payload = data
+
+
+class PayloadBlob(models.Model):
+    """Payload brut JEB archivé: JSON canonisé compressé (zlib), adressé par son sha256.
+
+    Un même contenu n'est stocké qu'une fois, quel que soit le nombre de
+    traces ou de runs qui le référencent (ImportAPI.payload_hash). `vu_le`
+    est rafraîchi à chaque écriture; payloads.prune supprime les blobs qui
+    ne sont plus référencés.
+    """
+    empreinte = models.CharField(max_length=64, primary_key=True)
+    donnees = models.BinaryField()
+    # taille du JSON non compressé, en octets
+    taille = models.IntegerField(default=0)
+    cree_le = models.DateTimeField(default=timezone.now)
+    vu_le = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'import_api_payloads'
+
+    def __str__(self):
+        return f"Payload {self.empreinte[:12]} ({self.taille} o, {len(self.donnees or b'')} compressés)"
+
+    @classmethod
+    def pack(cls, empreinte: str, data: bytes, level: int = 6, now=None) -> 'PayloadBlob':
+        """Blob de `data` (JSON canonisé, en octets), compressé au niveau zlib `level`."""
+        now = now or timezone.now()
+        return cls(empreinte=empreinte, donnees=zlib.compress(data, level), taille=len(data), cree_le=now, vu_le=now)
+
+    @property
+    def contenu(self):
+        return json.loads(zlib.decompress(bytes(self.donnees)))
+
+
+class EndpointDiscovery(models.Model):
+    """Chemin d'API JEB ayant répondu pour une entité (cache de découverte).
+
+    `chemin` est un suffixe relatif à JEB_API_BASE; pour la portée 'detail'
+    il contient le marqueur {id} (ex: "/startups/{id}").
+    """
+    PORTEE_CHOICES = [
+        ('list', 'Liste'),
+        ('detail', 'Détail'),
+    ]
+
+    cible_type = models.CharField(max_length=100)
+    portee = models.CharField(max_length=20, choices=PORTEE_CHOICES, default='list')
+    chemin = models.CharField(max_length=255)
+    verifie_le = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'import_api_endpoints'
+        constraints = [
+            models.UniqueConstraint(fields=['cible_type', 'portee'], name='uix_import_api_endpoint_type_portee')
+        ]
+
+    def __str__(self):
+        return f"{self.cible_type} ({self.portee}) -> {self.chemin}"
+
+
+class SyncCursor(models.Model):
+    """Point de reprise de la sync incrémentale d'une entité (cf. services.sync_entity).
+
+    `max_maj_distante` est la plus grande date de modification distante vue
+    (horloge de l'API, pas la nôtre). `filtre` est le paramètre de liste
+    "modifié depuis" accepté par l'API sur `filtre_chemin` ('' si aucun,
+    None tant que ce n'est pas détecté), revérifié après
+    JEB_ENDPOINT_CACHE_TTL comme les chemins découverts.
+    """
+    cible_type = models.CharField(max_length=100)
+    dernier_succes = models.DateTimeField(blank=True, null=True)
+    dernier_complet = models.DateTimeField(blank=True, null=True)
+    max_maj_distante = models.DateTimeField(blank=True, null=True)
+    filtre = models.CharField(max_length=100, blank=True, null=True)
+    filtre_chemin = models.CharField(max_length=255, blank=True, null=True)
+    filtre_verifie_le = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        db_table = 'import_api_cursors'
+        constraints = [
+            models.UniqueConstraint(fields=['cible_type'], name='uix_import_api_cursor_type')
+        ]
+
+    def __str__(self):
+        return f"{self.cible_type} depuis {self.max_maj_distante} (filtre {self.filtre or '-'})"
+
+
+class SyncRun(models.Model):
+    """Journal d'une sync d'entité: un enregistrement par entité et par run de sync_all.
+
+    Les durées sont en secondes. `duree_http` cumule les requêtes de tous
+    les threads (détails en parallèle) et peut donc dépasser `fin - debut`.
+    """
+    lot = models.UUIDField(db_index=True)
+    entite = models.CharField(max_length=100)
+    debut = models.DateTimeField()
+    fin = models.DateTimeField()
+    ok = models.BooleanField(default=True)
+    duree_http = models.FloatField(default=0)
+    duree_parse = models.FloatField(default=0)
+    duree_db = models.FloatField(default=0)
+    nb_requetes_http = models.IntegerField(default=0)
+    nb_requetes_sql = models.IntegerField(default=0)
+    octets_recus = models.BigIntegerField(default=0)
+    lignes_par_sec = models.FloatField(default=0)
+    nb_lignes = models.IntegerField(default=0)
+    nb_crees = models.IntegerField(default=0)
+    nb_maj = models.IntegerField(default=0)
+    nb_inchanges = models.IntegerField(default=0)
+    nb_erreurs = models.IntegerField(default=0)
+    # résultat complet de la sync (JSON texte, comme ImportAPI.payload_brut)
+    resultat = models.TextField(blank=True, null=True)
+
+    class Meta:
+        db_table = 'import_api_sync_runs'
+        ordering = ['-debut']
+        indexes = [
+            models.Index(fields=['entite', '-debut'], name='ix_import_api_sync_run_ent'),
+        ]
+
+    def __str__(self):
+        return f"Sync {self.entite} {self.debut:%Y-%m-%d %H:%M} ({'ok' if self.ok else 'échec'})"
+
+    @property
+    def duree(self) -> float:
+        return (self.fin - self.debut).total_seconds()
+
+
+class MissingRecord(models.Model):
+    """Ligne locale absente de la dernière liste complète reçue de l'API JEB.
+
+    Alimentée par la réconciliation de fin de sync (cf. reconcile.py) selon
+    JEB_MISSING_POLICY; supprimée dès que l'id revient côté distant. Pour la
+    politique 'archive', `donnees` garde la ligne supprimée (JSON texte).
+    """
+    STATUT_CHOICES = [
+        ('signale', 'Signalé'),
+        ('supprime', 'Supprimé (logique)'),
+        ('archive', 'Archivé'),
+    ]
+
+    cible_type = models.CharField(max_length=100)
+    # pk locale, égale à l'id distant
+    local_id = models.BigIntegerField()
+    statut = models.CharField(max_length=20, choices=STATUT_CHOICES, default='signale')
+    detecte_le = models.DateTimeField(default=timezone.now)
+    vu_le = models.DateTimeField(default=timezone.now)
+    donnees = models.TextField(blank=True, null=True)
+
+    class Meta:
+        db_table = 'import_api_missing'
+        ordering = ['cible_type', 'local_id']
+        constraints = [
+            models.UniqueConstraint(fields=['cible_type', 'local_id'], name='uix_import_api_missing_type_id')
+        ]
+
+    def __str__(self):
+        return f"{self.cible_type} {self.local_id} absent ({self.statut})"
+
+
+class SyncJob(models.Model):
+    """Tâche de la file de sync, exécutée par un worker (commande jeb_worker).
+
+    `type` est le label d'une spec (startups, users, ...), ou "record" pour
+    la sync d'un seul enregistrement notifié par webhook. Un worker réserve
+    la tâche jusqu'à `visible_le` et prolonge cette réservation tant qu'il
+    y travaille; passé ce délai (worker arrêté net), la tâche redevient
+    disponible pour un autre worker. `cle` dédoublonne les tâches actives:
+    une seule tâche en attente ou en cours par clé. Les tâches d'un même
+    `lot` respectent SYNC_DEPENDENCIES (news attend users, ...).
+    """
+    STATUT_CHOICES = [
+        ('en_attente', 'En attente'),
+        ('en_cours', 'En cours'),
+        ('termine', 'Terminé'),
+        ('echec', 'Échec'),
+    ]
+
+    type = models.CharField(max_length=100)
+    cle = models.CharField(max_length=255, blank=True, null=True)
+    # paramètres de la tâche (JSON texte, comme ImportAPI.payload_brut)
+    parametres = models.TextField(blank=True, null=True)
+    # la plus haute d'abord
+    priorite = models.IntegerField(default=0)
+    statut = models.CharField(max_length=20, choices=STATUT_CHOICES, default='en_attente')
+    lot = models.UUIDField(default=uuid.uuid4, db_index=True)
+    tentatives = models.IntegerField(default=0)
+    max_tentatives = models.IntegerField(default=3)
+    disponible_le = models.DateTimeField(default=timezone.now)
+    visible_le = models.DateTimeField(blank=True, null=True)
+    worker = models.CharField(max_length=255, blank=True, null=True)
+    cree_le = models.DateTimeField(default=timezone.now)
+    debut = models.DateTimeField(blank=True, null=True)
+    fin = models.DateTimeField(blank=True, null=True)
+    erreur = models.TextField(blank=True, null=True)
+    resultat = models.TextField(blank=True, null=True)
+
+    class Meta:
+        db_table = 'import_api_jobs'
+        ordering = ['-cree_le']
+        indexes = [
+            models.Index(fields=['statut', '-priorite', 'disponible_le'], name='ix_import_api_job_file'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['cle'], condition=models.Q(statut__in=['en_attente', 'en_cours']),
+                                    name='uix_import_api_job_cle_active'),
+        ]
+
+    def __str__(self):
+        return f"Tâche {self.type} ({self.statut}, tentative {self.tentatives}/{self.max_tentatives})"
+
+    @property
+    def params(self) -> dict:
+        try:
+            return json.loads(self.parametres) if self.parametres else {}
+        except ValueError:
+            return {}
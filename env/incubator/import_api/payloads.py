@@ -0,0 +1,102 @@
+"""Archive des payloads bruts JEB, adressée par contenu.
+
+Une trace ImportAPI ne garde que l'empreinte (payload_hash) du payload;
+le JSON canonisé est stocké compressé dans PayloadBlob, une seule fois par
+contenu. Un item inchangé d'un run à l'autre ne réécrit donc rien, et un
+item modifié n'écrit qu'un petit blob. prune() supprime les blobs qu'aucune
+trace ne référence plus (traces oubliées par la réconciliation, anciennes
+versions d'un item).
+"""
+import hashlib
+import json
+from datetime import timedelta
+from typing import Any, Iterable, Optional
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+from .bulk import batch_size
+from .models import ImportAPI, PayloadBlob
+
+
+def canonical(payload: Any) -> bytes:
+    """JSON canonisé (clés triées, sans espaces), tel qu'il est haché et archivé."""
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+
+
+def digest(payload: Any) -> str:
+    """Empreinte sha256 du payload canonisé."""
+    return hashlib.sha256(canonical(payload)).hexdigest()
+
+
+def _level() -> int:
+    return getattr(settings, "JEB_PAYLOAD_ZLIB_LEVEL", 6)
+
+
+def store(payloads: dict) -> int:
+    """Archive {empreinte: payload}; retourne le nombre de blobs écrits.
+
+    L'empreinte doit être celle de digest(payload). Un blob déjà archivé
+    n'est pas réécrit, seul son `vu_le` est rafraîchi: un prune() concurrent
+    ne le supprime alors pas sous la trace qui le référence de nouveau.
+    """
+    if not payloads:
+        return 0
+    now = timezone.now()
+    level = _level()
+    blobs = [PayloadBlob.pack(key, canonical(payload), level, now) for key, payload in payloads.items()]
+    PayloadBlob.objects.bulk_create(blobs, batch_size=batch_size(), update_conflicts=True,
+                                    unique_fields=["empreinte"], update_fields=["vu_le"])
+    return len(blobs)
+
+
+def store_one(payload: Any) -> str:
+    """Archive un payload et retourne son empreinte."""
+    key = digest(payload)
+    store({key: payload})
+    return key
+
+
+def load(empreinte: str) -> Any:
+    """Payload archivé sous `empreinte`, None s'il n'existe pas."""
+    blob = PayloadBlob.objects.filter(pk=empreinte).first()
+    return None if blob is None else blob.contenu
+
+
+def attach(traces: Iterable[ImportAPI]) -> list:
+    """Précharge `payload` sur des traces, une requête par paquet d'empreintes (listes d'API, admin)."""
+    traces = list(traces)
+    keys = sorted({t.payload_hash for t in traces if t.payload_hash})
+    blobs = {}
+    size = batch_size()
+    for i in range(0, len(keys), size):
+        blobs.update((b.pk, b) for b in PayloadBlob.objects.filter(pk__in=keys[i:i + size]))
+    for trace in traces:
+        blob = blobs.get(trace.payload_hash)
+        if blob is not None:
+            trace._payload = blob.contenu
+    return traces
+
+
+def prune(grace: Optional[float] = None) -> int:
+    """Supprime, par paquets, les blobs qu'aucune trace ne référence; retourne leur nombre.
+
+    Un blob écrit ou revu depuis moins de JEB_PAYLOAD_GRACE secondes
+    (défaut 3600) est gardé: sa trace peut appartenir à une sync dont la
+    transaction n'est pas encore validée. La condition est réévaluée au
+    DELETE, si bien qu'un blob référencé entre-temps n'est pas supprimé.
+    """
+    grace = getattr(settings, "JEB_PAYLOAD_GRACE", 3600) if grace is None else grace
+    limit = timezone.now() - timedelta(seconds=grace)
+    orphans = PayloadBlob.objects.filter(vu_le__lt=limit).exclude(
+        models.Exists(ImportAPI.objects.filter(payload_hash=models.OuterRef("pk")))
+    )
+    size = batch_size()
+    deleted = 0
+    while True:
+        keys = list(orphans.values_list("pk", flat=True)[:size])
+        if not keys:
+            return deleted
+        count, _ = orphans.filter(pk__in=keys).delete()
+        deleted += count
@@ -0,0 +1,248 @@
+import json
+import logging
+import uuid
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .bulk import batch_size
+from .models import ImportAPI, MissingRecord
+from .schema import table_columns
+
+logger = logging.getLogger(__name__)
+
+# report: journalise seulement; flag: MissingRecord 'signale'; soft_delete:
+# MissingRecord 'supprime' + colonne de suppression logique si la table en a
+# une; archive: copie dans MissingRecord puis suppression de la ligne
+POLICIES = ("report", "flag", "soft_delete", "archive")
+
+# colonnes de suppression logique reconnues, par ordre de préférence
+SOFT_DELETE_COLUMNS = ("deleted_at", "supprime_le", "is_active", "actif")
+
+
+def missing_policy(label: str) -> str:
+    """Politique JEB_MISSING_POLICY d'une entité: texte, ou dict {label: politique, "*": défaut}."""
+    policy = getattr(settings, "JEB_MISSING_POLICY", "report")
+    if isinstance(policy, dict):
+        policy = policy.get(label, policy.get("*", "report"))
+    if policy not in POLICIES:
+        logger.warning("JEB_MISSING_POLICY inconnue pour %s: %r (report utilisé)", label, policy)
+        return "report"
+    return policy
+
+
+def _soft_delete_column(model):
+    """(colonne, valeur supprimée, valeur restaurée) ou None si la table n'en porte pas."""
+    columns = table_columns(model._meta.db_table)
+    for name in SOFT_DELETE_COLUMNS:
+        if name in columns:
+            if name in ("is_active", "actif"):
+                return name, False, True
+            return name, connection.ops.adapt_datetimefield_value(timezone.now()), None
+    return None
+
+
+class SeenIds:
+    """Ids distants vus pendant une sync, versés par paquets dans une table temporaire (anti-jointure)."""
+
+    def __init__(self, model, size: int):
+        self.model = model
+        self.size = size
+        self.table = f"import_api_seen_{uuid.uuid4().hex[:12]}"
+        self._pending = []
+        self._created = False
+
+    def add(self, remote_id):
+        self._pending.append(remote_id)
+        if len(self._pending) >= self.size:
+            self.flush()
+
+    def flush(self):
+        qn = connection.ops.quote_name
+        with connection.cursor() as cur:
+            if not self._created:
+                id_type = self.model._meta.pk.rel_db_type(connection)
+                cur.execute(f"CREATE TEMPORARY TABLE {qn(self.table)} (id {id_type} NOT NULL)")
+                self._created = True
+            if self._pending:
+                cur.executemany(f"INSERT INTO {qn(self.table)} (id) VALUES (%s)", [(i,) for i in self._pending])
+                self._pending = []
+
+    def index(self):
+        """Indexe la table avant l'anti-jointure (plus rapide qu'indexer au fil des insertions)."""
+        self.flush()
+        qn = connection.ops.quote_name
+        with connection.cursor() as cur:
+            cur.execute(f"CREATE INDEX {qn(self.table + '_id')} ON {qn(self.table)} (id)")
+
+    def drop(self):
+        if self._created:
+            with connection.cursor() as cur:
+                cur.execute(f"DROP TABLE IF EXISTS {connection.ops.quote_name(self.table)}")
+            self._created = False
+        self._pending = []
+
+
+def reconcile(spec, model, seen: SeenIds) -> dict:
+    """Compare les lignes locales venues de JEB aux ids vus et applique la politique de l'entité."""
+    policy = missing_policy(spec.label)
+    seen.index()
+    qn = connection.ops.quote_name
+    table, pk = qn(model._meta.db_table), qn(model._meta.pk.column)
+    traces = qn(ImportAPI._meta.db_table)
+    # seules les lignes tracées dans ImportAPI: une ligne créée localement n'est jamais touchée;
+    # sous-requête non corrélée, évaluée une fois (import_api n'est pas indexée sur local_id)
+    anti_join = (f"FROM {table} t WHERE t.{pk} IN (SELECT i.local_id FROM {traces} i WHERE i.cible_type = %s) "
+                 f"AND NOT EXISTS (SELECT 1 FROM {qn(seen.table)} s WHERE s.id = t.{pk})")
+    params = [spec.cible_type]
+    limit = getattr(settings, "JEB_MISSING_REPORT_LIMIT", 100)
+    with connection.cursor() as cur:
+        cur.execute(f"SELECT COUNT(*) {anti_join}", params)
+        missing = cur.fetchone()[0]
+        cur.execute(f"SELECT t.{pk} {anti_join} ORDER BY t.{pk} LIMIT %s", [*params, limit])
+        sample = [row[0] for row in cur.fetchall()]
+    report = {"missing_count": missing, "missing_remote": sample, "missing_policy": policy}
+    if missing:
+        logger.warning("%s: %d ligne(s) locale(s) absente(s) de la source distante (politique %s), ex: %s",
+                       spec.label, missing, policy, sample[:20])
+
+    restored = _forget(spec, model, f"SELECT id FROM {qn(seen.table)}")
+    if restored:
+        report["restored"] = restored
+    if policy == "report" or not missing:
+        return report
+
+    # une liste distante vide ou tronquée ne doit rien effacer
+    max_ratio = getattr(settings, "JEB_MISSING_MAX_RATIO", 0.5)
+    local = ImportAPI.objects.filter(cible_type=spec.cible_type).count()
+    if missing > local * max_ratio:
+        logger.error("%s: %d/%d lignes absentes, au-delà de JEB_MISSING_MAX_RATIO=%s: politique %s non appliquée",
+                     spec.label, missing, local, max_ratio, policy)
+        report["missing_policy_skipped"] = "max_ratio"
+        return report
+
+    report.update(_apply(spec, model, policy, anti_join, pk, params))
+    return report
+
+
+def remove_record(spec, model, remote_id) -> dict:
+    """Applique la politique de l'entité à une ligne supprimée côté distant (notification, sans garde de ratio)."""
+    policy = missing_policy(spec.label)
+    qn = connection.ops.quote_name
+    pk = qn(model._meta.pk.column)
+    # comme pour reconcile, une ligne sans trace ImportAPI est locale: jamais touchée
+    present = (model.objects.filter(pk=remote_id).exists()
+               and ImportAPI.objects.filter(cible_type=spec.cible_type, local_id=remote_id).exists())
+    report = {"missing_count": int(present), "missing_remote": [remote_id] if present else [], "missing_policy": policy}
+    if not present or policy == "report":
+        if present:
+            logger.warning("%s %s supprimé côté distant (politique report)", spec.cible_type, remote_id)
+        return report
+    report.update(_apply(spec, model, policy, f"FROM {qn(model._meta.db_table)} t WHERE t.{pk} = %s", pk, [remote_id]))
+    return report
+
+
+def restore_record(spec, model, remote_id) -> int:
+    """Retire de MissingRecord (et restaure) une ligne revenue côté distant; 1 si elle y était."""
+    return _forget(spec, model, "%s", [remote_id])
+
+
+def _apply(spec, model, policy: str, anti_join: str, pk: str, params=()) -> dict:
+    """Politique flag / soft_delete / archive sur les lignes de `anti_join` (FROM ... t WHERE ...)."""
+    with transaction.atomic():
+        if policy == "archive":
+            return {"archived": _archive(spec, model, anti_join, pk, params)}
+        _flag(spec, anti_join, pk, "supprime" if policy == "soft_delete" else "signale", params)
+        if policy == "soft_delete":
+            _soft_delete(model, anti_join, pk, params)
+    return {}
+
+
+def _forget(spec, model, ids_sql: str, params=()) -> int:
+    """Retire de MissingRecord les ids de `ids_sql` (sous-requête ou %s), en restaurant les supprimés logiques."""
+    statuts = set(MissingRecord.objects.filter(cible_type=spec.cible_type).values_list("statut", flat=True).distinct())
+    if not statuts:
+        return 0
+    qn = connection.ops.quote_name
+    missing_table = qn(MissingRecord._meta.db_table)
+    back = f"cible_type = %s AND local_id IN ({ids_sql})"
+    column = _soft_delete_column(model) if "supprime" in statuts else None
+    with transaction.atomic(), connection.cursor() as cur:
+        if column is not None:
+            name, _, restored_value = column
+            cur.execute(
+                f"UPDATE {qn(model._meta.db_table)} SET {qn(name)} = %s "
+                f"WHERE {qn(model._meta.pk.column)} IN (SELECT local_id FROM {missing_table} WHERE statut = %s AND {back})",
+                [restored_value, "supprime", spec.cible_type, *params],
+            )
+        cur.execute(f"DELETE FROM {missing_table} WHERE {back}", [spec.cible_type, *params])
+        return cur.rowcount
+
+
+def _flag(spec, anti_join: str, pk: str, statut: str, params=()):
+    """Crée ou rafraîchit, en deux requêtes, les MissingRecord des lignes absentes."""
+    missing_table = connection.ops.quote_name(MissingRecord._meta.db_table)
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    with connection.cursor() as cur:
+        cur.execute(
+            f"UPDATE {missing_table} SET statut = %s, vu_le = %s "
+            f"WHERE cible_type = %s AND local_id IN (SELECT t.{pk} {anti_join})",
+            [statut, now, spec.cible_type, *params],
+        )
+        cur.execute(
+            f"INSERT INTO {missing_table} (cible_type, local_id, statut, detecte_le, vu_le) "
+            f"SELECT %s, t.{pk}, %s, %s, %s {anti_join} AND NOT EXISTS "
+            f"(SELECT 1 FROM {missing_table} m WHERE m.cible_type = %s AND m.local_id = t.{pk})",
+            [spec.cible_type, statut, now, now, *params, spec.cible_type],
+        )
+
+
+def _soft_delete(model, anti_join: str, pk: str, params=()):
+    column = _soft_delete_column(model)
+    if column is None:
+        logger.warning("Table %s sans colonne de suppression logique (%s): lignes seulement signalées",
+                       model._meta.db_table, ", ".join(SOFT_DELETE_COLUMNS))
+        return
+    name, deleted_value, _ = column
+    qn = connection.ops.quote_name
+    # une date de suppression déjà posée est conservée
+    keep = f" AND {qn(name)} IS NULL" if deleted_value is not False else ""
+    with connection.cursor() as cur:
+        cur.execute(
+            f"UPDATE {qn(model._meta.db_table)} SET {qn(name)} = %s WHERE {pk} IN (SELECT t.{pk} {anti_join}){keep}",
+            [deleted_value, *params],
+        )
+
+
+def _archive(spec, model, anti_join: str, pk: str, params=()) -> int:
+    """Copie les lignes absentes dans MissingRecord puis les supprime par l'ORM (cascades, traces), par paquets."""
+    size = batch_size()
+    archived = 0
+    while True:
+        with connection.cursor() as cur:
+            cur.execute(f"SELECT t.{pk} {anti_join} ORDER BY t.{pk} LIMIT %s", [*params, size])
+            chunk = [row[0] for row in cur.fetchall()]
+        if not chunk:
+            return archived
+        now = timezone.now()
+        MissingRecord.objects.bulk_create(
+            [
+                MissingRecord(
+                    cible_type=spec.cible_type,
+                    local_id=row[model._meta.pk.attname],
+                    statut="archive",
+                    detecte_le=now,
+                    vu_le=now,
+                    donnees=json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False),
+                )
+                for row in model.objects.filter(pk__in=chunk).values()
+            ],
+            update_conflicts=True,
+            unique_fields=["cible_type", "local_id"],
+            update_fields=["statut", "vu_le", "donnees"],
+        )
+        ImportAPI.objects.filter(cible_type=spec.cible_type, remote_id__in=[str(i) for i in chunk]).delete()
+        model.objects.filter(pk__in=chunk).delete()
+        archived += len(chunk)
@@ -0,0 +1,49 @@
+import logging
+import threading
+import time
+from typing import Optional
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def _ttl() -> float:
+    return getattr(settings, "JEB_SCHEMA_CACHE_TTL", 600)
+
+
+def table_columns(table: str, using: str = "default", ttl: Optional[float] = None) -> frozenset:
+    """Noms des colonnes réelles de `table`, introspectées puis gardées en cache.
+
+    Le cache est propre au processus et expire après JEB_SCHEMA_CACHE_TTL
+    secondes (défaut 600): une colonne ajoutée à chaud est prise en compte au
+    plus tard au run suivant l'expiration. Une table introuvable donne un
+    ensemble vide (mis en cache lui aussi).
+    """
+    ttl = _ttl() if ttl is None else ttl
+    key = (using, table)
+    now = time.monotonic()
+    with _lock:
+        hit = _cache.get(key)
+        if hit is not None and hit[0] > now:
+            return hit[1]
+    connection = connections[using]
+    try:
+        with connection.cursor() as cur:
+            columns = frozenset(col.name for col in connection.introspection.get_table_description(cur, table))
+    except DatabaseError:
+        logger.warning("Introspection de la table %s impossible", table, exc_info=True)
+        columns = frozenset()
+    with _lock:
+        _cache[key] = (now + ttl, columns)
+    return columns
+
+
+def clear_cache():
+    """Oublie les schémas introspectés (ex: après une migration)."""
+    with _lock:
+        _cache.clear()
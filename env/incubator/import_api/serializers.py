@@ -0,0 +1,52 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework import serializers
+from .models import ImportAPI, MissingRecord, SyncJob, SyncRun
+from .specs import SPECS
+from .webhooks import EVENTS, resolve_entity
+
+class ImportAPISerializer(serializers.ModelSerializer):
+    # payload archivé décodé (cf. ImportAPI.payload)
+    payload = serializers.JSONField(read_only=True)
+
+    class Meta:
+        model = ImportAPI
+        fields = '__all__'
+
+class SyncRunSerializer(serializers.ModelSerializer):
+    duree = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = SyncRun
+        fields = '__all__'
+
+class MissingRecordSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = MissingRecord
+        fields = '__all__'
+
+class SyncJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SyncJob
+        fields = '__all__'
+
+class WebhookEventSerializer(serializers.Serializer):
+    """Notification de changement JEB: {"event": "updated", "entity": "startups", "id": 42, "payload": {...}}."""
+    event = serializers.ChoiceField(choices=EVENTS)
+    entity = serializers.CharField(max_length=100)
+    id = serializers.CharField(max_length=255)
+    payload = serializers.DictField(required=False, allow_null=True)
+
+    def validate_entity(self, value):
+        label = resolve_entity(value)
+        if label is None:
+            raise serializers.ValidationError(f"Entité inconnue: {value}")
+        return label
+
+    def validate(self, attrs):
+        # id lu comme la pk du modèle cible: "abc" pour une pk entière est refusé ici (400), pas par la tâche
+        spec = next(spec for spec in SPECS if spec.label == attrs["entity"])
+        try:
+            attrs["id"] = str(spec.get_model()._meta.pk.to_python(attrs["id"]))
+        except DjangoValidationError:
+            raise serializers.ValidationError({"id": f"Identifiant invalide pour {attrs['entity']}: {attrs['id']}"})
+        return attrs
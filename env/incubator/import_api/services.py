@@ -0,0 +1,1486 @@
+import json
+import logging
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from datetime import datetime, timedelta, timezone as dt_timezone
+from functools import partial
+from typing import Any, Iterable, Iterator, Optional
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+import requests
+from django.apps import apps
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, connection, models, transaction
+from . import payloads
+from .bulk import batch_size, copy_rows, create_staging, drop_staging
+from .client import JEBClient, get_client
+from .metrics import Stopwatch, SyncMetrics
+from .models import EndpointDiscovery, ImportAPI, SyncCursor, SyncRun
+from .reconcile import SeenIds, reconcile, remove_record, restore_record
+from .schema import table_columns
+from .specs import EVENTS, INVESTORS, NEWS, PARTNERS, SPECS, STARTUPS, USERS, EntitySpec, Ref
+from .streaming import ENVELOPE_KEYS, iter_json_items
+
+logger = logging.getLogger(__name__)
+
+
+class _TraceBuffer:
+    """Traces d'import (ImportAPI) accumulées puis écrites par paquets.
+
+    Chaque paquet est écrit en une requête INSERT ... ON CONFLICT sur la
+    contrainte uix_import_api_source_type_remote (source, cible_type,
+    remote_id): plus de lecture préalable ni de nettoyage de doublons. Les
+    payloads vont dans l'archive compressée (payloads.store), la trace ne
+    garde que leur empreinte.
+    """
+
+    def __init__(self, cible_type: str, source: str = 'API JEB', size: Optional[int] = None):
+        self.cible_type = cible_type
+        self.source = source
+        self.size = size or batch_size()
+        self._pending = {}
+
+    def add(self, remote_id: Any, local_id: Any, payload: dict, payload_hash: Optional[str] = None):
+        # une même ressource vue deux fois avant flush: la dernière version l'emporte
+        self._pending[str(remote_id)] = (local_id, payload, payload_hash or _payload_hash(payload))
+        if len(self._pending) >= self.size:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        now = timezone.now()
+        rows = [
+            ImportAPI(
+                source=self.source,
+                cible_type=self.cible_type,
+                remote_id=remote_id,
+                local_id=local_id,
+                dernier_sync=now,
+                payload_brut=None,
+                payload_hash=payload_hash,
+            )
+            for remote_id, (local_id, payload, payload_hash) in pending.items()
+        ]
+        try:
+            # savepoint: un échec ne doit pas invalider la transaction de tranche en cours
+            with transaction.atomic():
+                payloads.store({payload_hash: payload for _, payload, payload_hash in pending.values()})
+                ImportAPI.objects.bulk_create(
+                    rows,
+                    update_conflicts=True,
+                    unique_fields=['source', 'cible_type', 'remote_id'],
+                    update_fields=['local_id', 'dernier_sync', 'payload_brut', 'payload_hash'],
+                )
+        except Exception:
+            logger.exception("Trace import échouée (%s, %d éléments)", self.cible_type, len(rows))
+
+    def stored_hashes(self, remote_ids: Iterable[Any]) -> dict:
+        """{remote_id (str): payload_hash} des traces existantes pour ces ids."""
+        stored = {}
+        for chunk in _chunks([str(r) for r in remote_ids], self.size):
+            stored.update(
+                ImportAPI.objects.filter(source=self.source, cible_type=self.cible_type, remote_id__in=chunk)
+                .values_list('remote_id', 'payload_hash')
+            )
+        return stored
+
+
+def _chunks(seq: list, size: int) -> Iterator[list]:
+    for i in range(0, len(seq), size):
+        yield seq[i:i + size]
+
+
+def _payload_hash(payload: Any) -> str:
+    """Empreinte stable d'un payload distant (JSON canonisé: clés triées, sans espaces)."""
+    return payloads.digest(payload)
+
+
+def _hash_items(items: Iterable[Any]) -> dict:
+    """{remote_id (str): empreinte} calculé une fois par item."""
+    hashes = {}
+    for item in items:
+        if isinstance(item, dict):
+            rid = item.get("id") or item.get("pk")
+            if rid is not None:
+                hashes[str(rid)] = _payload_hash(item)
+    return hashes
+
+
+def _unchanged_ids(model, traces: _TraceBuffer, hashes: dict) -> set:
+    """Ids (str) dont l'empreinte égale celle de la dernière trace et dont la ligne locale existe.
+
+    Une ligne locale supprimée entre deux runs est donc ré-écrite même si le
+    payload distant n'a pas bougé.
+    """
+    stored = traces.stored_hashes(hashes)
+    candidates = [rid for rid, h in hashes.items() if stored.get(rid) == h]
+    unchanged = set()
+    for chunk in _chunks(candidates, traces.size):
+        unchanged.update(str(pk) for pk in model.objects.filter(pk__in=chunk).values_list("pk", flat=True))
+    return unchanged
+
+
+class _RefMap:
+    """Résolution d'une clé étrangère pour tout un run: id distant -> pk locale.
+
+    Les ids référencés par les items à écrire sont chargés d'avance par
+    paquets (pk__in), au lieu d'un filter().first() par item. Les ids
+    référencés mais absents localement sont collectés dans `unknown` pour le
+    rapport de sync; la clé étrangère est alors laissée vide, comme avant.
+    """
+
+    def __init__(self, model, size: Optional[int] = None):
+        self.model = model
+        self.size = size or batch_size()
+        self.unknown = set()
+        self._known = {}
+
+    def preload(self, raw_ids: Iterable[Any]):
+        field = self.model._meta.pk
+        wanted = {}
+        for raw in raw_ids:
+            if not raw:
+                continue
+            key = str(raw)
+            if key in self._known or key in wanted:
+                continue
+            try:
+                wanted[key] = field.to_python(raw)
+            except (TypeError, ValueError, ValidationError):
+                self._known[key] = None
+        found = set()
+        for chunk in _chunks(list(set(wanted.values())), self.size):
+            found.update(self.model.objects.filter(pk__in=chunk).values_list("pk", flat=True))
+        for key, pk in wanted.items():
+            self._known[key] = pk if pk in found else None
+
+    def resolve(self, raw: Any) -> Optional[Any]:
+        if not raw:
+            return None
+        key = str(raw)
+        if key not in self._known:
+            self.preload([raw])
+        pk = self._known[key]
+        if pk is None:
+            self.unknown.add(key)
+        return pk
+
+    def report(self) -> list:
+        return sorted(self.unknown)
+
+
+def _endpoint_ttl() -> timedelta:
+    return timedelta(seconds=getattr(settings, "JEB_ENDPOINT_CACHE_TTL", 24 * 3600))
+
+
+def _cached_path(cible_type: str, portee: str) -> Optional[str]:
+    """Chemin mémorisé pour (cible_type, portee) s'il est encore dans le TTL."""
+    try:
+        entry = EndpointDiscovery.objects.filter(cible_type=cible_type, portee=portee).first()
+    except DatabaseError:
+        logger.warning("Cache de découverte indisponible (%s/%s)", cible_type, portee)
+        return None
+    if entry is None or entry.verifie_le < timezone.now() - _endpoint_ttl():
+        return None
+    return entry.chemin
+
+
+def _remember_path(cible_type: str, portee: str, chemin: str):
+    try:
+        EndpointDiscovery.objects.update_or_create(
+            cible_type=cible_type, portee=portee,
+            defaults={"chemin": chemin, "verifie_le": timezone.now()},
+        )
+    except DatabaseError:
+        logger.warning("Impossible de mémoriser le chemin %s pour %s/%s", chemin, cible_type, portee)
+
+
+def _forget_path(cible_type: str, portee: str):
+    try:
+        EndpointDiscovery.objects.filter(cible_type=cible_type, portee=portee).delete()
+    except DatabaseError:
+        logger.warning("Impossible d'invalider le chemin de %s/%s", cible_type, portee)
+
+
+def _ordered_paths(candidate_paths: list, cached: Optional[str]) -> list:
+    """Candidats avec le chemin mémorisé en tête (s'il existe)."""
+    if cached is None:
+        return list(candidate_paths)
+    return [cached] + [p for p in candidate_paths if p != cached]
+
+
+def _fetch_list(client: JEBClient, cible_type: str, candidate_paths: list, stream: bool = False,
+                extra_params: Optional[dict] = None, conditional: bool = True):
+    """Retourne (réponse, url) pour le premier chemin candidat non 404.
+
+    La requête est conditionnelle (sauf conditional=False): un 304 signifie
+    que la liste n'a pas changé depuis le dernier run, son corps venant du
+    cache disque. En mode
+    page/limit, c'est la première page qui est demandée; `extra_params`
+    (filtre "modifié depuis") s'ajoute à la requête.
+    Le chemin découvert est mémorisé (EndpointDiscovery) : les runs suivants
+    l'interrogent directement et ne reviennent au sondage que sur 404.
+    """
+    params = {**(_first_page_params() or {}), **(extra_params or {})}
+    cached = _cached_path(cible_type, "list")
+    for suffix in _ordered_paths(candidate_paths, cached):
+        url = client.url(suffix)
+        if params:
+            url = _with_query(url, params)
+        logger.info("Tentative sync %s via %s", cible_type, url)
+        try:
+            resp = client.get(url, conditional=conditional, stream=stream)
+        except requests.RequestException as e:
+            logger.warning("Erreur tentative %s: %s", url, e)
+            continue
+        if resp.status_code == 404:
+            resp.close()
+            if suffix == cached:
+                logger.info("Chemin mémorisé %s obsolète pour %s, nouveau sondage", suffix, cible_type)
+                _forget_path(cible_type, "list")
+                cached = None
+            continue
+        # garder première réponse non 404
+        if resp.status_code < 400 and suffix != cached:
+            _remember_path(cible_type, "list", suffix)
+        return resp, url
+    return None, None
+
+
+def _streaming() -> bool:
+    return getattr(settings, "JEB_STREAMING", True)
+
+
+def _iter_response_items(client: JEBClient, response: requests.Response, state: dict,
+                         envelope: Optional[dict] = None) -> Iterator[Any]:
+    """Items d'une réponse de liste, lus au fil du flux si elle a été ouverte en stream.
+
+    Les clés d'enveloppe (next, count...) sont recopiées dans `envelope`.
+    Une erreur de décodage ou de transport en cours de lecture arrête
+    l'itération et est consignée dans `state["error"]` (les items déjà rendus
+    restent valides).
+    """
+    if envelope is None:
+        envelope = {}
+    if not _streaming():
+        try:
+            raw = _parse_json(client, response)
+        except ValueError:
+            logger.error("Réponse non JSON: %s", response.text[:200])
+            state["error"] = "invalid_json"
+            return
+        if isinstance(raw, dict):
+            envelope.update((k, v) for k, v in raw.items() if k not in ENVELOPE_KEYS)
+        yield from _normalize_response(raw)
+        return
+    # temps de décodage = attente des items - attente des fragments réseau
+    network, total = Stopwatch(), Stopwatch()
+    try:
+        yield from total.wrap(iter_json_items(network.wrap(client.iter_bytes(response)), envelope,
+                                              normalize=_normalize_response))
+    except ValueError as e:
+        logger.error("Réponse non JSON (%s): %s", response.url, e)
+        state["error"] = "invalid_json"
+    except requests.RequestException as e:
+        logger.error("Flux interrompu (%s): %s", response.url, e)
+        state["error"] = "stream_error"
+    finally:
+        if client.metrics is not None:
+            client.metrics.add_parse(total.seconds - network.seconds)
+
+
+def _parse_json(client: JEBClient, response: requests.Response) -> Any:
+    """response.json(), chronométré dans les métriques du client."""
+    start = time.perf_counter()
+    try:
+        return response.json()
+    finally:
+        if client.metrics is not None:
+            client.metrics.add_parse(time.perf_counter() - start)
+
+
+def _page_size() -> Optional[int]:
+    """Taille de page pour la pagination page/limit (None: seuls les liens 'next' sont suivis)."""
+    return getattr(settings, "JEB_API_PAGE_SIZE", None)
+
+
+def _first_page_params() -> Optional[dict]:
+    size = _page_size()
+    if not size:
+        return None
+    return {
+        getattr(settings, "JEB_API_PAGE_PARAM", "page"): 1,
+        getattr(settings, "JEB_API_LIMIT_PARAM", "limit"): size,
+    }
+
+
+def _with_query(url: str, params: dict) -> str:
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query, keep_blank_values=True))
+    query.update({k: str(v) for k, v in params.items()})
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def _next_page_url(envelope: dict, url: str, page: int, count: int) -> Optional[str]:
+    """URL de la page suivante.
+
+    - lien 'next' de l'enveloppe (DRF: next, JSON:API: links.next, next_page)
+    - sinon, en mode page/limit (JEB_API_PAGE_SIZE), page+1 tant que la page
+      courante est pleine
+    """
+    links = envelope.get("links") if isinstance(envelope.get("links"), dict) else {}
+    nxt = envelope.get("next") or envelope.get("next_page") or links.get("next")
+    if isinstance(nxt, str) and nxt:
+        return urljoin(url, nxt)
+    size = _page_size()
+    if size and count >= size:
+        return _with_query(url, {
+            getattr(settings, "JEB_API_PAGE_PARAM", "page"): page + 1,
+            getattr(settings, "JEB_API_LIMIT_PARAM", "limit"): size,
+        })
+    return None
+
+
+def _remote_updated_at(item: Any) -> Optional[datetime]:
+    """Date de modification distante d'un item (premier champ de JEB_DELTA_FIELDS lisible), en UTC."""
+    if not isinstance(item, dict):
+        return None
+    for key in getattr(settings, "JEB_DELTA_FIELDS", ("updated_at", "updatedAt", "modified_at", "date_modification")):
+        value = item.get(key)
+        if not value or not isinstance(value, str):
+            continue
+        try:
+            parsed = parse_datetime(value)
+        except ValueError:
+            parsed = None
+        if parsed is not None:
+            return timezone.make_aware(parsed, dt_timezone.utc) if timezone.is_naive(parsed) else parsed
+    return None
+
+
+def _track_updates(pages: Iterable[tuple], mark: dict) -> Iterator[tuple]:
+    """Laisse passer les (item, inchangé) en relevant dans mark["max"] la plus grande date de modification."""
+    for item, not_modified in pages:
+        updated_at = _remote_updated_at(item)
+        if updated_at is not None and (mark.get("max") is None or updated_at > mark["max"]):
+            mark["max"] = updated_at
+        yield item, not_modified
+
+
+def _load_cursor(spec: EntitySpec) -> Optional[SyncCursor]:
+    try:
+        return SyncCursor.objects.filter(cible_type=spec.cible_type).first()
+    except DatabaseError:
+        logger.warning("Curseur de sync indisponible (%s)", spec.cible_type)
+        return None
+
+
+def _save_cursor(spec: EntitySpec, **values):
+    try:
+        SyncCursor.objects.update_or_create(cible_type=spec.cible_type, defaults=values)
+    except DatabaseError:
+        logger.warning("Impossible d'enregistrer le curseur de %s", spec.cible_type, exc_info=True)
+
+
+def _probe_first_item(client: JEBClient, url: str) -> tuple:
+    """(réponse exploitable, premier item ou None) de la liste `url`; seul le début est lu."""
+    try:
+        response = client.get(url, stream=_streaming())
+    except requests.RequestException as e:
+        logger.warning("Sondage du filtre incrémental sur %s: %s", url, e)
+        return False, None
+    try:
+        if response.status_code != 200:
+            return False, None
+        state = {}
+        first = next(iter(_iter_response_items(client, response, state)), None)
+    finally:
+        response.close()
+    return "error" not in state, first
+
+
+def _probe_delta_param(client: JEBClient, spec: EntitySpec, path: str) -> str:
+    """Premier paramètre de JEB_DELTA_PARAMS que l'API applique sur `path`, '' si aucun.
+
+    Chaque candidat est essayé avec une date future puis une date passée:
+    seule une API qui filtre renvoie une liste vide pour la première et non
+    vide pour la seconde. Un catalogue vide, ou une API qui renvoie [] pour
+    tout paramètre inconnu, ne prouve rien: '' (syncs complètes).
+    """
+    future = (timezone.now() + timedelta(days=1)).isoformat()
+    past = datetime(1970, 1, 1, tzinfo=dt_timezone.utc).isoformat()
+    candidates = getattr(settings, "JEB_DELTA_PARAMS",
+                         ("updated_since", "updated_after", "modified_since", "since", "updated_at__gte"))
+    for param in candidates:
+        ok, first = _probe_first_item(client, _with_query(client.url(path), {**(_first_page_params() or {}), param: future}))
+        if not ok or first is not None:
+            continue
+        ok, first = _probe_first_item(client, _with_query(client.url(path), {**(_first_page_params() or {}), param: past}))
+        if ok and first is not None:
+            logger.info("Sync %s: filtre incrémental ?%s= supporté par %s", spec.label, param, path)
+            return param
+    logger.info("Sync %s: pas de filtre incrémental sur %s, syncs complètes", spec.label, path)
+    return ""
+
+
+def _delta_filter(client: JEBClient, spec: EntitySpec, cursor: Optional[SyncCursor]) -> Optional[dict]:
+    """Paramètre "modifié depuis" de la prochaine liste, None pour une sync complète.
+
+    Sync complète tant qu'aucune n'a établi de point de reprise, quand la
+    dernière date de plus de JEB_DELTA_FULL_EVERY secondes (défaut 24 h:
+    seule une liste complète révèle les suppressions), ou si l'API ne sait
+    pas filtrer. Le support du filtre est détecté une fois par chemin de
+    liste (cf. SyncCursor). La fenêtre recouvre de JEB_DELTA_OVERLAP
+    secondes (défaut 60) la précédente: les items revus sont sautés par
+    leur empreinte.
+    """
+    now = timezone.now()
+    if cursor is None or cursor.max_maj_distante is None or cursor.dernier_complet is None:
+        return None
+    if cursor.dernier_complet < now - timedelta(seconds=getattr(settings, "JEB_DELTA_FULL_EVERY", 24 * 3600)):
+        return None
+    path = _cached_path(spec.cible_type, "list")
+    if path is None:
+        return None
+    param = cursor.filtre
+    if (param is None or cursor.filtre_chemin != path or cursor.filtre_verifie_le is None
+            or cursor.filtre_verifie_le < now - _endpoint_ttl()):
+        param = _probe_delta_param(client, spec, path)
+        _save_cursor(spec, filtre=param, filtre_chemin=path, filtre_verifie_le=now)
+    if not param:
+        return None
+    since = cursor.max_maj_distante - timedelta(seconds=getattr(settings, "JEB_DELTA_OVERLAP", 60))
+    return {param: since.isoformat()}
+
+
+def _iter_pages(client: JEBClient, response: requests.Response, url: str, state: dict,
+                conditional: bool = True) -> Iterator[tuple]:
+    """Rend (item, inchangé) pour toutes les pages d'une liste paginée.
+
+    Dès que l'URL de la page N+1 est connue (lien 'next' lu dans l'enveloppe,
+    souvent avant le tableau), sa requête part sur un thread de préchargement:
+    le réseau de la page N+1 recouvre l'écriture en base de la page N.
+    `inchangé` vaut True pour les items d'une page servie en 304.
+    `state["pages"]` et `state["not_modified_pages"]` comptent les pages lues,
+    `state["urls"]` garde leurs URLs.
+    """
+    max_pages = getattr(settings, "JEB_API_MAX_PAGES", 1000)
+    visited = state["urls"] = {url}
+    page = 1
+    state.setdefault("pages", 0)
+    state.setdefault("not_modified_pages", 0)
+    future = None
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="jeb-page") as prefetch:
+        try:
+            while True:
+                state["pages"] += 1
+                not_modified = response.status_code == 304
+                if not_modified:
+                    state["not_modified_pages"] += 1
+                envelope = {}
+                count = 0
+                future = None
+                next_url = None
+                for item in _iter_response_items(client, response, state, envelope):
+                    count += 1
+                    if future is None and envelope:
+                        next_url = _next_page_url(envelope, url, page, 0)
+                        if next_url and next_url not in visited:
+                            future = prefetch.submit(client.get, next_url, conditional=conditional,
+                                                     stream=_streaming())
+                    yield item, not_modified
+                if "error" in state:
+                    break
+                if future is None:
+                    next_url = _next_page_url(envelope, url, page, count)
+                    if not next_url or next_url in visited:
+                        break
+                    future = prefetch.submit(client.get, next_url, conditional=conditional, stream=_streaming())
+                if page >= max_pages:
+                    logger.warning("Pagination arrêtée après %d pages (%s)", page, url)
+                    break
+                try:
+                    response = future.result()
+                except requests.RequestException as e:
+                    logger.error("Erreur page %s: %s", next_url, e)
+                    state["error"] = "page_error"
+                    break
+                finally:
+                    future = None
+                if response.status_code >= 400:
+                    logger.error("Réponse %s sur la page %s", response.status_code, next_url)
+                    response.close()
+                    # page au-delà de la dernière en mode page/limit: fin normale
+                    if not (response.status_code == 404 and _page_size()):
+                        state["error"] = "page_error"
+                    break
+                visited.add(next_url)
+                url = next_url
+                page += 1
+        finally:
+            # page suivante déjà demandée mais pas lue (arrêt, erreur, max_pages):
+            # cancel() est sans effet sur une requête partie, sa connexion est rendue au pool
+            if future is not None and not future.cancel():
+                try:
+                    future.result().close()
+                except Exception:
+                    pass
+
+
+def _normalize_response(payload: Any) -> Iterable[dict]:
+    """Ramène la réponse JSON à une liste de dicts.
+
+    Gère cas:
+      - payload déjà list
+      - payload dict avec clé 'results' ou 'data'
+      - payload string JSON (simple list ou dict)
+    """
+    if payload is None:
+        return []
+
+    # Si payload est déjà une structure Python (list/dict), la traiter sans json.loads
+    if isinstance(payload, list):
+        return payload
+    if isinstance(payload, dict):
+        # dict paginé / enveloppé
+        if isinstance(payload.get("results"), list):
+            return payload["results"]
+        if isinstance(payload.get("data"), list):
+            return payload["data"]
+        # si le dict ressemble déjà à un objet startup unique -> le mettre dans liste
+        # heuristique: présence d'un champ id et d'un champ name/nom
+        if any(k in payload for k in ("id", "nom", "name")):
+            return [payload]
+        return []
+
+    # si bytes -> décoder en str
+    if isinstance(payload, (bytes, bytearray)):
+        try:
+            payload = payload.decode('utf-8')
+        except Exception:
+            logger.warning("Payload bytes non décodable, ignore")
+            return []
+
+    # si string -> tenter json.loads
+    if isinstance(payload, str):
+        try:
+            payload = json.loads(payload)
+        except json.JSONDecodeError:
+            logger.warning("Payload string non JSON, ignore")
+            return []
+
+    # Après tentative de décodage, si on obtient une liste ou dict, ré-appeler la fonction
+    if isinstance(payload, list):
+        return payload
+    if isinstance(payload, dict):
+        if isinstance(payload.get("results"), list):
+            return payload["results"]
+        if isinstance(payload.get("data"), list):
+            return payload["data"]
+        if any(k in payload for k in ("id", "nom", "name")):
+            return [payload]
+
+    return []
+
+
+def _fetch_detail(client: JEBClient, spec: EntitySpec, item: dict, detail_paths: list):
+    """Récupère la ressource détail d'un item de liste partiel.
+
+    Retourne (item, gabarit de chemin ayant répondu); l'item d'origine et None
+    en cas d'échec.
+    """
+    remote_id = item.get("id") or item.get("pk")
+    for template in detail_paths:
+        detail_url = client.url(template.format(id=remote_id))
+        try:
+            logger.info("Fetching detail for %s %s via %s", spec.cible_type, remote_id, detail_url)
+            r = client.get(detail_url, conditional=True)
+        except requests.RequestException as e:
+            logger.warning("Erreur fetch detail %s: %s", detail_url, e)
+            continue
+        # 304: le corps en cache sert d'item (son empreinte sera inchangée)
+        if r.status_code not in (200, 304):
+            continue
+        try:
+            detail_raw = _parse_json(client, r)
+        except ValueError:
+            logger.warning("Detail non JSON for %s from %s", remote_id, detail_url)
+            continue
+        detail_items = _normalize_response(detail_raw)
+        if isinstance(detail_items, list) and detail_items:
+            return detail_items[0], template
+        if isinstance(detail_raw, dict):
+            return detail_raw, template
+        return item, template
+    return item, None
+
+
+def _iter_details(spec: EntitySpec, items: Iterable[Any], client: JEBClient, concurrency: Optional[int] = None) -> Iterator[Any]:
+    """Complète les items partiels via la ressource détail de la spec, en parallèle.
+
+    Les items complets sont rendus immédiatement; les autres sont confiés à un
+    pool de threads borné (JEB_DETAIL_CONCURRENCY, défaut: la limite maximale
+    du gouverneur) et rendus dans l'ordre où leurs détails arrivent. Le
+    nombre de requêtes réellement en vol est celui que le gouverneur du
+    client autorise à l'instant (AIMD). Au plus 2 x concurrency requêtes sont
+    en attente à la fois pour ne pas matérialiser tout le catalogue.
+
+    Le gabarit de chemin détail qui répond est mémorisé (EndpointDiscovery)
+    depuis le thread principal et placé en tête pour les requêtes suivantes.
+    """
+    concurrency = concurrency or getattr(settings, "JEB_DETAIL_CONCURRENCY", None) or int(client.governor.maximum)
+    cached = _cached_path(spec.cible_type, "detail")
+    detail_paths = _ordered_paths(spec.detail_paths, cached)
+
+    def _learn(template):
+        nonlocal cached, detail_paths
+        if template is not None and template != cached:
+            _remember_path(spec.cible_type, "detail", template)
+            cached = template
+            detail_paths = _ordered_paths(spec.detail_paths, cached)
+
+    if concurrency <= 1:
+        for item in items:
+            if spec.needs_detail(item):
+                item, template = _fetch_detail(client, spec, item, detail_paths)
+                _learn(template)
+            yield item
+        return
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="jeb-detail") as pool:
+        pending = set()
+        for item in items:
+            if not spec.needs_detail(item):
+                yield item
+                continue
+            pending.add(pool.submit(_fetch_detail, client, spec, item, detail_paths))
+            if len(pending) >= 2 * concurrency:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    detailed, template = fut.result()
+                    _learn(template)
+                    yield detailed
+        for fut in as_completed(pending):
+            detailed, template = fut.result()
+            _learn(template)
+            yield detailed
+
+
+def _transaction_size() -> int:
+    """Lignes écrites par transaction (JEB_SYNC_TRANSACTION_SIZE, défaut: un lot); au moins un lot."""
+    # une tranche plus grande suspend la lecture HTTP le temps de l'écrire: plus lent (cf. benchmark)
+    return max(batch_size(), getattr(settings, "JEB_SYNC_TRANSACTION_SIZE", 0))
+
+
+def _bulk_upsert(model, rows: dict, update_fields: list):
+    """Upsert ensembliste d'un lot {pk: valeurs} en une requête INSERT ... ON CONFLICT.
+
+    Retourne (créés, mis à jour); les ids existants sont lus en une requête
+    avant l'écriture pour que les compteurs restent exacts.
+    """
+    pk_name = model._meta.pk.attname
+    existing = set(model.objects.filter(pk__in=list(rows)).values_list("pk", flat=True))
+    model.objects.bulk_create(
+        [model(**{pk_name: pk}, **values) for pk, values in rows.items()],
+        update_conflicts=True,
+        unique_fields=[model._meta.pk.name],
+        update_fields=update_fields,
+    )
+    return len(rows) - len(existing), len(existing)
+
+
+def _upsert_row(model, remote_id: Any, values: dict, update_fields: list) -> bool:
+    """Upsert unitaire (repli quand le lot échoue); retourne True si créée."""
+    # Avoid Django JSONField.from_db_value TypeError by not forcing
+    # a model instance load when the DB may return native Python types
+    # for JSON columns. Use exists()/update() to perform upsert.
+    if model.objects.filter(pk=remote_id).exists():
+        model.objects.filter(pk=remote_id).update(**{k: values[k] for k in update_fields if k in values})
+        return False
+    model.objects.create(pk=remote_id, **values)
+    return True
+
+
+def _optional_columns(spec: EntitySpec, model) -> dict:
+    """{colonne: extracteur} des colonnes optionnelles de la spec réellement présentes dans la table.
+
+    La table est introspectée une fois (cache par processus, cf. schema.py)
+    au lieu de tenter un UPDATE ou une requête information_schema par item.
+    """
+    if not spec.optional_columns:
+        return {}
+    columns = table_columns(model._meta.db_table)
+    declared = {f.column for f in model._meta.concrete_fields}
+    found = {}
+    for optional in spec.optional_columns:
+        name = next((n for n in optional.names if n in columns and n not in declared), None)
+        if name:
+            found[name] = optional.value
+    return found
+
+
+def _write_optional_columns(model, values_by_id: dict):
+    """Écrit les colonnes optionnelles d'un lot en un seul executemany.
+
+    Une valeur absente de la source (None) laisse la colonne inchangée.
+    """
+    rows = {rid: values for rid, values in values_by_id.items() if any(v is not None for v in values.values())}
+    if not rows:
+        return
+    columns = sorted(next(iter(rows.values())))
+    qn = connection.ops.quote_name
+    sql = "UPDATE {} SET {} WHERE {} = %s".format(
+        qn(model._meta.db_table),
+        ", ".join(f"{qn(c)} = COALESCE(%s, {qn(c)})" for c in columns),
+        qn(model._meta.pk.column),
+    )
+    with connection.cursor() as cur:
+        cur.executemany(sql, [[values[c] for c in columns] + [rid] for rid, values in rows.items()])
+
+
+class _EntityWriter:
+    """Écrit par lots les items d'une spec.
+
+    Pour chaque lot: les items dont l'empreinte n'a pas changé depuis la
+    dernière trace sont comptés 'unchanged' et sautés, les clés étrangères
+    sont préchargées (une requête pk__in par référence), puis le reste est
+    upserté en une requête, colonnes optionnelles comprises. En cas d'échec
+    (ex: slug en doublon) on repasse ligne par ligne pour isoler l'item
+    fautif. Viennent ensuite le hook after_write de la spec et les traces.
+
+    Les lots reçus sont mis de côté jusqu'à JEB_SYNC_TRANSACTION_SIZE lignes,
+    puis flush() les écrit dans une transaction validée aussitôt: un COMMIT
+    (et un fsync) par tranche plutôt que par requête, et aucune transaction
+    ouverte pendant les appels HTTP des pages suivantes. Chaque étape qui peut
+    échouer seule (upsert groupé, chaque ligne du repli, after_write,
+    traces) tourne dans un savepoint, si bien qu'un item fautif n'annule
+    pas la tranche. Les créations / mises à jour ne sont comptées qu'au
+    COMMIT; si celui-ci échoue, elles passent en erreurs.
+    """
+
+    def __init__(self, spec: EntitySpec, model, stats: dict):
+        self.spec = spec
+        self.model = model
+        self.stats = stats
+        self.size = batch_size()
+        self.transaction_size = _transaction_size()
+        self.traces = _TraceBuffer(spec.cible_type)
+        self.refs = {name: _RefMap(apps.get_model(ref.model)) for name, ref in spec.refs.items()}
+        self.optional = _optional_columns(spec, model)
+        self.attnames = {name: model._meta.get_field(name).attname for name in spec.fields}
+        create_only = {model._meta.get_field(name).attname for name in spec.create_only}
+        self.update_fields = [a for a in self.attnames.values() if a not in create_only]
+        # auto_now (maj_le...) est posé par l'INSERT; le reporter aussi sur conflit
+        self.update_fields += [
+            f.attname for f in model._meta.concrete_fields
+            if getattr(f, "auto_now", False) and f.attname not in self.update_fields
+        ]
+        self._batch = {}
+        self._ready = []
+        self._ready_rows = 0
+        self._tx = None
+        self._pending = {"created": 0, "updated": 0}
+        self.failed_commits = 0
+
+    def add(self, remote_id: Any, item: dict):
+        # un id répété dans le même lot: la dernière version l'emporte
+        self._batch[remote_id] = (item, _payload_hash(item))
+        if len(self._batch) >= self.size:
+            self._ready.append(self._batch)
+            self._ready_rows += len(self._batch)
+            self._batch = {}
+            if self._ready_rows >= self.transaction_size:
+                self.flush()
+
+    def unknown_refs(self) -> dict:
+        return {name: refs.report() for name, refs in self.refs.items() if refs.unknown}
+
+    def _values(self, item: dict, remote_id: Any) -> dict:
+        values = {}
+        for name, source in self.spec.fields.items():
+            if isinstance(source, Ref):
+                values[self.attnames[name]] = self.refs[name].resolve(source.raw(item))
+            else:
+                values[self.attnames[name]] = source(item, remote_id)
+        return values
+
+    def _begin(self):
+        if self._tx is None:
+            self._tx = transaction.atomic()
+            self._tx.__enter__()
+
+    def commit(self):
+        """Valide la tranche en cours et comptabilise ses écritures."""
+        tx, self._tx = self._tx, None
+        pending, self._pending = self._pending, {"created": 0, "updated": 0}
+        if tx is None:
+            return
+        try:
+            tx.__exit__(None, None, None)
+        except Exception:
+            self.failed_commits += 1
+            self.stats["errors"] += pending["created"] + pending["updated"]
+            logger.exception("COMMIT de tranche %s échoué (%d lignes annulées)",
+                             self.spec.label, pending["created"] + pending["updated"])
+            return
+        self.stats["created"] += pending["created"]
+        self.stats["updated"] += pending["updated"]
+
+    def rollback(self) -> bool:
+        """Annule la tranche en cours (sync interrompue par une exception); True si elle l'était."""
+        tx, self._tx = self._tx, None
+        self._pending = {"created": 0, "updated": 0}
+        if tx is None:
+            return False
+        tx.__exit__(RuntimeError, RuntimeError("sync interrompue"), None)
+        return True
+
+    def flush(self):
+        """Écrit les lots mis de côté (et le lot en cours) en une tranche, puis la valide."""
+        if self._batch:
+            self._ready.append(self._batch)
+            self._batch = {}
+        ready, self._ready, self._ready_rows = self._ready, [], 0
+        for batch in ready:
+            self._flush_batch(batch)
+        self.commit()
+
+    def finish(self):
+        """Fin de sync: écrit et valide le reste."""
+        self.flush()
+
+    def _flush_batch(self, batch: dict):
+        stats = self.stats
+        unchanged = _unchanged_ids(self.model, self.traces, {str(rid): h for rid, (_, h) in batch.items()})
+        if unchanged:
+            stats["unchanged"] += len(unchanged)
+            batch = {rid: row for rid, row in batch.items() if str(rid) not in unchanged}
+            if not batch:
+                return
+        for name, ref in self.spec.refs.items():
+            self.refs[name].preload(ref.raw(item) for item, _ in batch.values())
+        rows = {}
+        for remote_id, (item, _) in batch.items():
+            try:
+                rows[remote_id] = self._values(item, remote_id)
+            except Exception:
+                stats["errors"] += 1
+                logger.exception("Erreur conversion %s (remote id=%s)", self.spec.cible_type, remote_id)
+        if not rows:
+            return
+        extras = {
+            remote_id: {column: value(batch[remote_id][0], remote_id) for column, value in self.optional.items()}
+            for remote_id in rows
+        }
+        self._write(batch, rows, extras)
+
+    def _write(self, batch: dict, rows: dict, extras: dict):
+        """Upsert d'un lot prêt ({id: valeurs}), repli ligne par ligne, after_write et traces."""
+        stats = self.stats
+        written = []
+        pending = self._pending
+        self._begin()
+        try:
+            with transaction.atomic():
+                created, updated = _bulk_upsert(self.model, rows, self.update_fields)
+                _write_optional_columns(self.model, extras)
+            pending["created"] += created
+            pending["updated"] += updated
+            written = list(rows)
+        except Exception:
+            logger.warning("Upsert groupé de %d %s échoué, repli ligne par ligne", len(rows), self.spec.label, exc_info=True)
+            for remote_id, values in rows.items():
+                try:
+                    with transaction.atomic():
+                        is_created = _upsert_row(self.model, remote_id, values, self.update_fields)
+                        _write_optional_columns(self.model, {remote_id: extras[remote_id]})
+                    pending["created" if is_created else "updated"] += 1
+                    written.append(remote_id)
+                except Exception:
+                    stats["errors"] += 1
+                    logger.exception("Erreur traitement %s (remote id=%s)", self.spec.cible_type, remote_id)
+
+        if self.spec.after_write is not None and written:
+            try:
+                with transaction.atomic():
+                    self.spec.after_write({rid: (rows[rid], batch[rid][0]) for rid in written})
+            except Exception:
+                stats["errors"] += len(written)
+                logger.exception("Post-traitement %s échoué pour le lot %s", self.spec.label, written)
+
+        for remote_id in written:
+            self.traces.add(remote_id, remote_id, batch[remote_id][0], batch[remote_id][1])
+        self.traces.flush()
+
+
+class _BulkWriter(_EntityWriter):
+    """Variante de _EntityWriter pour sync_all --bulk (Postgres).
+
+    Chaque lot préparé est copié (COPY, hors transaction) dans une table
+    temporaire de staging, ses traces dans une autre: rien n'est verrouillé
+    pendant les appels HTTP. finish() ouvre ensuite la seule transaction de
+    l'entité, qui fusionne le staging dans la table cible en un seul
+    INSERT ... SELECT ... ON CONFLICT, et les traces de même. Si la fusion
+    échoue (ex: slug en doublon), elle est rejouée par paquets puis ligne
+    par ligne, chacun dans un savepoint, avec la même comptabilité
+    d'erreurs qu'en mode normal. after_write est appelé après la fusion,
+    par paquets relus en base (item None).
+    """
+
+    def __init__(self, spec: EntitySpec, model, stats: dict):
+        super().__init__(spec, model, stats)
+        meta = model._meta
+        self.fields = meta.concrete_fields
+        self.pk_column = meta.pk.column
+        self.optional_names = sorted(self.optional)
+        self.columns = [f.column for f in self.fields] + self.optional_names
+        attname_column = {f.attname: f.column for f in self.fields}
+        self.update_columns = [attname_column[a] for a in self.update_fields if attname_column[a] != self.pk_column]
+        suffix = uuid.uuid4().hex[:12]
+        self.stage = f"import_api_stage_{suffix}"
+        self.trace_stage = f"import_api_stage_tr_{suffix}"
+        self._staged = 0
+        try:
+            create_staging(self.stage, meta.db_table, self.columns)
+            create_staging(self.trace_stage, ImportAPI._meta.db_table, ["remote_id", "local_id", "payload_hash"])
+        except Exception:
+            self._drop_staging()
+            raise
+
+    def _prepare(self, remote_id: Any, values: dict, extras: dict) -> list:
+        """Ligne complète prête pour COPY: défauts et auto_now appliqués comme par bulk_create."""
+        obj = self.model(**{self.model._meta.pk.attname: remote_id}, **values)
+        row = []
+        for field in self.fields:
+            value = field.pre_save(obj, add=True)
+            if isinstance(field, models.JSONField):
+                row.append(None if value is None else json.dumps(value, cls=field.encoder, ensure_ascii=False))
+            else:
+                row.append(field.get_db_prep_save(value, connection))
+        return row + [extras[c] for c in self.optional_names]
+
+    def _write(self, batch: dict, rows: dict, extras: dict):
+        prepared = []
+        staged = []
+        for remote_id, values in rows.items():
+            try:
+                prepared.append(self._prepare(remote_id, values, extras[remote_id]))
+                staged.append(remote_id)
+            except Exception:
+                self.stats["errors"] += 1
+                logger.exception("Erreur conversion %s (remote id=%s)", self.spec.cible_type, remote_id)
+        copy_rows(self.stage, self.columns, prepared)
+        # blobs d'une ligne dont la fusion échoue: orphelins, supprimés par payloads.prune
+        payloads.store({batch[rid][1]: batch[rid][0] for rid in staged})
+        copy_rows(self.trace_stage, ["remote_id", "local_id", "payload_hash"],
+                  [(str(rid), rid, batch[rid][1]) for rid in staged])
+        self._staged += len(staged)
+
+    def finish(self):
+        super().finish()
+        if self._staged:
+            self._begin()
+            self._merge()
+            self._staged = 0
+            self.commit()
+
+    def rollback(self) -> bool:
+        rolled_back = super().rollback()
+        self._drop_staging()
+        return rolled_back
+
+    def _drop_staging(self):
+        try:
+            drop_staging(self.stage, self.trace_stage)
+        except DatabaseError:
+            logger.warning("Staging %s non supprimé", self.stage, exc_info=True)
+
+    def _merge_sql(self, where: str = "") -> str:
+        qn = connection.ops.quote_name
+        table, pk = qn(self.model._meta.db_table), qn(self.pk_column)
+        columns = ", ".join(qn(c) for c in self.columns)
+        updates = [f"{qn(c)} = EXCLUDED.{qn(c)}" for c in self.update_columns]
+        # colonne optionnelle absente de la source (NULL): valeur en base conservée
+        updates += [f"{qn(c)} = COALESCE(EXCLUDED.{qn(c)}, {table}.{qn(c)})" for c in self.optional_names]
+        conflict = f"DO UPDATE SET {', '.join(updates)}" if updates else "DO NOTHING"
+        return (
+            f"INSERT INTO {table} ({columns}) "
+            f"SELECT DISTINCT ON ({pk}) {columns} FROM {qn(self.stage)} s {where} ORDER BY {pk}, _ord DESC "
+            f"ON CONFLICT ({pk}) {conflict}"
+        )
+
+    def _merge_rows(self, ids: Optional[list] = None):
+        """Fusionne tout le staging (ou seulement `ids`); retourne (créés, mis à jour)."""
+        qn = connection.ops.quote_name
+        pk = qn(self.pk_column)
+        where, params = ("", []) if ids is None else (f"WHERE s.{pk} = ANY(%s)", [ids])
+        with connection.cursor() as cur:
+            cur.execute(
+                f"SELECT COUNT(DISTINCT s.{pk}), COUNT(DISTINCT t.{pk}) FROM {qn(self.stage)} s "
+                f"LEFT JOIN {qn(self.model._meta.db_table)} t ON t.{pk} = s.{pk} {where}",
+                params,
+            )
+            total, existing = cur.fetchone()
+            cur.execute(self._merge_sql(where), params)
+        return total - existing, existing
+
+    def _staged_ids(self) -> Iterator[list]:
+        """Ids du staging par paquets de JEB_SYNC_BATCH_SIZE (pagination par clé)."""
+        qn = connection.ops.quote_name
+        pk = qn(self.pk_column)
+        last = None
+        while True:
+            with connection.cursor() as cur:
+                if last is None:
+                    cur.execute(f"SELECT DISTINCT {pk} FROM {qn(self.stage)} ORDER BY {pk} LIMIT %s", [self.size])
+                else:
+                    cur.execute(f"SELECT DISTINCT {pk} FROM {qn(self.stage)} WHERE {pk} > %s ORDER BY {pk} LIMIT %s",
+                                [last, self.size])
+                chunk = [row[0] for row in cur.fetchall()]
+            if not chunk:
+                return
+            yield chunk
+            last = chunk[-1]
+
+    def _merge(self):
+        stats, pending = self.stats, self._pending
+        failed = []
+        try:
+            with transaction.atomic():
+                created, updated = self._merge_rows()
+            pending["created"] += created
+            pending["updated"] += updated
+        except Exception:
+            logger.warning("Fusion groupée du staging %s échouée, repli par paquets", self.spec.label, exc_info=True)
+            for chunk in self._staged_ids():
+                try:
+                    with transaction.atomic():
+                        created, updated = self._merge_rows(chunk)
+                    pending["created"] += created
+                    pending["updated"] += updated
+                    continue
+                except Exception:
+                    pass
+                for remote_id in chunk:
+                    try:
+                        with transaction.atomic():
+                            created, updated = self._merge_rows([remote_id])
+                        pending["created"] += created
+                        pending["updated"] += updated
+                    except Exception:
+                        stats["errors"] += 1
+                        failed.append(remote_id)
+                        logger.exception("Erreur traitement %s (remote id=%s)", self.spec.cible_type, remote_id)
+
+        qn = connection.ops.quote_name
+        if failed:
+            with connection.cursor() as cur:
+                cur.execute(f"DELETE FROM {qn(self.trace_stage)} WHERE remote_id = ANY(%s)", [[str(i) for i in failed]])
+
+        if self.spec.after_write is not None:
+            failed_ids = set(failed)
+            attnames = [self.model._meta.pk.attname] + list(self.attnames.values())
+            for chunk in self._staged_ids():
+                written = {
+                    row[attnames[0]]: (row, None)
+                    for row in self.model.objects.filter(pk__in=[i for i in chunk if i not in failed_ids]).values(*attnames)
+                }
+                if not written:
+                    continue
+                try:
+                    with transaction.atomic():
+                        self.spec.after_write(written)
+                except Exception:
+                    stats["errors"] += len(written)
+                    logger.exception("Post-traitement %s échoué pour le lot %s", self.spec.label, list(written))
+
+        try:
+            with transaction.atomic(), connection.cursor() as cur:
+                cur.execute(
+                    f"INSERT INTO {qn(ImportAPI._meta.db_table)} "
+                    f"(source, cible_type, remote_id, local_id, dernier_sync, payload_hash) "
+                    f"SELECT DISTINCT ON (remote_id) %s, %s, remote_id, local_id, %s, payload_hash "
+                    f"FROM {qn(self.trace_stage)} ORDER BY remote_id, _ord DESC "
+                    f"ON CONFLICT (source, cible_type, remote_id) DO UPDATE SET local_id = EXCLUDED.local_id, "
+                    f"dernier_sync = EXCLUDED.dernier_sync, payload_brut = NULL, "
+                    f"payload_hash = EXCLUDED.payload_hash",
+                    [self.traces.source, self.spec.cible_type, timezone.now()],
+                )
+        except Exception:
+            logger.exception("Trace import échouée (%s, staging)", self.spec.cible_type)
+
+
+def _fresh_items(model, pages: Iterable[tuple], seen_ids: SeenIds, stats: dict) -> Iterator[Any]:
+    """Items à traiter; ceux d'une page servie en 304 sont seulement vus et comptés inchangés.
+
+    Comme pour _unchanged_ids, un item 304 dont la ligne locale n'existe plus
+    est rendu pour être réécrit depuis le corps en cache.
+    """
+    pending = {}
+    for item, not_modified in pages:
+        if not not_modified:
+            yield from _missing_locally(model, pending, seen_ids, stats)
+            yield item
+            continue
+        remote_id = item.get("id") or item.get("pk") if isinstance(item, dict) else None
+        try:
+            pk = model._meta.pk.to_python(remote_id) if remote_id is not None else None
+        except ValidationError:
+            pk = None
+        if pk is None:
+            stats["total"] += 1
+            stats["unchanged"] += 1
+            continue
+        pending[pk] = item
+        if len(pending) >= batch_size():
+            yield from _missing_locally(model, pending, seen_ids, stats)
+    yield from _missing_locally(model, pending, seen_ids, stats)
+
+
+def _missing_locally(model, pending: dict, seen_ids: SeenIds, stats: dict) -> Iterator[Any]:
+    """Vide `pending` ({pk: item 304}): rend les items sans ligne locale, compte les autres inchangés."""
+    if not pending:
+        return
+    items = dict(pending)
+    pending.clear()
+    existing = set(model.objects.filter(pk__in=list(items)).values_list("pk", flat=True))
+    for pk, item in items.items():
+        if pk in existing:
+            stats["total"] += 1
+            stats["unchanged"] += 1
+            seen_ids.add(pk)
+        else:
+            yield item
+
+
+def sync_entity(spec: EntitySpec, client: Optional[JEBClient] = None, bulk: bool = False, full: bool = False) -> dict:
+    """Synchronise une entité décrite par `spec` (cf. specs.py).
+
+    La liste est lue en flux, page après page, complétée par la ressource
+    détail si la spec en a une, puis écrite par lots de JEB_SYNC_BATCH_SIZE,
+    regroupés en transactions de JEB_SYNC_TRANSACTION_SIZE lignes.
+
+    Sync incrémentale par défaut (JEB_DELTA_SYNC): quand l'API sait filtrer,
+    seuls les items modifiés depuis le point de reprise de l'entité sont
+    demandés (cf. _delta_filter), sans réconciliation des absents.
+    full=True force la liste complète. Le point de reprise n'avance
+    qu'après une sync sans erreur.
+
+    bulk=True (réimport complet): sur Postgres, lots copiés par COPY dans un
+    staging puis fusionnés en une requête (cf. _BulkWriter); ailleurs, le
+    chemin normal par lots est utilisé.
+    """
+    client = client or get_client()
+    model = spec.get_model()
+    cursor = _load_cursor(spec)
+    since = None
+    if not (full or bulk) and getattr(settings, "JEB_DELTA_SYNC", True):
+        since = _delta_filter(client, spec, cursor)
+    # réimport / liste complète: pas de 304, chaque page est relue et réécrite même si le cache HTTP est chaud
+    conditional = not (bulk or full)
+    response, chosen_url = _fetch_list(client, spec.cible_type, spec.paths, stream=_streaming(), extra_params=since,
+                                       conditional=conditional)
+
+    if response is None:
+        logger.error("Sync %s: toutes les tentatives ont retourné 404 / erreur", spec.label)
+        return {"ok": False, "error": "all_404"}
+
+    if response.status_code >= 400:
+        logger.error("Réponse %s sur %s", response.status_code, chosen_url)
+        response.close()
+        return {"ok": False, "status": response.status_code, "url": chosen_url}
+
+    stream_state = {}
+    stats = {"created": 0, "updated": 0, "unchanged": 0, "errors": 0, "total": 0}
+    # Pour réconciliation: remote_ids rencontrés, versés dans une table temporaire
+    seen_ids = SeenIds(model, batch_size())
+    # table temporaire créée hors des transactions de tranche
+    seen_ids.flush()
+    if bulk and connection.vendor != "postgresql":
+        logger.info("Sync %s --bulk: COPY indisponible sur %s, upserts par lots", spec.label, connection.vendor)
+    bulk = bulk and connection.vendor == "postgresql"
+    writer = (_BulkWriter if bulk else _EntityWriter)(spec, model, stats)
+    mark = {}
+    try:
+        pages = _track_updates(_iter_pages(client, response, chosen_url, stream_state, conditional), mark)
+        items = _fresh_items(model, pages, seen_ids, stats)
+        if spec.detail_paths:
+            items = _iter_details(spec, items, client)
+        for item in items:
+            stats["total"] += 1
+            if not isinstance(item, dict):
+                logger.warning("Item ignoré type=%s valeur=%r", type(item).__name__, item)
+                continue
+            remote_id = item.get("id") or item.get("pk")
+            if remote_id is None:
+                logger.warning("Item sans id: %r", item)
+                continue
+            try:
+                remote_id = model._meta.pk.to_python(remote_id)
+            except ValidationError:
+                stats["errors"] += 1
+                logger.warning("Id distant invalide pour %s: %r", spec.cible_type, remote_id)
+                continue
+            seen_ids.add(remote_id)
+            writer.add(remote_id, item)
+        writer.finish()
+
+        result = {"ok": True, **stats, "mode": "delta" if since else "full"}
+        if since:
+            result["since"] = next(iter(since.values()))
+        unknown_refs = writer.unknown_refs()
+        if unknown_refs:
+            result["unknown_refs"] = unknown_refs
+            logger.warning("Sync %s: références inconnues localement: %s", spec.label, unknown_refs)
+
+        if "error" in stream_state:
+            # flux interrompu: les lots déjà reçus sont écrits, mais la liste est
+            # incomplète, donc pas de réconciliation
+            result["ok"] = False
+            result["error"] = stream_state["error"]
+            logger.error("Sync %s interrompue: %s", spec.label, result)
+            return result
+        if writer.failed_commits:
+            # des ids vus ont été annulés avec leur tranche: réconciliation faussée
+            logger.error("Sync %s: %d tranche(s) annulée(s), pas de réconciliation", spec.label, writer.failed_commits)
+            return result
+
+        if since is None:
+            # liste complète seulement: une liste incrémentale ne dit rien des absents
+            try:
+                result.update(reconcile(spec, model, seen_ids))
+            except Exception:
+                logger.exception("Impossible de calculer la réconciliation des IDs %s", spec.label)
+                result["missing_error"] = True
+
+        cursor_values = {"dernier_succes": timezone.now()}
+        if since is None:
+            cursor_values["dernier_complet"] = cursor_values["dernier_succes"]
+        # un item en erreur doit revenir dans la prochaine fenêtre: pas d'avance
+        if not stats["errors"] and mark.get("max") and (
+                cursor is None or cursor.max_maj_distante is None or mark["max"] > cursor.max_maj_distante):
+            cursor_values["max_maj_distante"] = mark["max"]
+        _save_cursor(spec, **cursor_values)
+    finally:
+        if writer.rollback() or writer.failed_commits or stats["errors"]:
+            # des items de pages déjà mises en cache ne sont pas en base: ces
+            # pages doivent être relues en entier au prochain run, pas en 304
+            for url in stream_state.get("urls", ()):
+                client.forget(url)
+        seen_ids.drop()
+
+    if stream_state["not_modified_pages"] == stream_state["pages"]:
+        result["not_modified"] = True
+    logger.info("Sync %s terminé: %s", spec.label, result)
+    return result
+
+
+def _record_paths(spec: EntitySpec) -> list:
+    """Gabarits de chemin d'un enregistrement seul: ceux de la spec, sinon déduits des chemins de liste."""
+    templates = spec.detail_paths or tuple(dict.fromkeys(f"{path.rstrip('/')}/{{id}}" for path in spec.paths))
+    return _ordered_paths(list(templates), _cached_path(spec.cible_type, "detail"))
+
+
+def sync_record(spec: EntitySpec, remote_id: Any, payload: Optional[dict] = None, deleted: bool = False,
+                client: Optional[JEBClient] = None) -> dict:
+    """Synchronise un seul enregistrement, par exemple sur notification du webhook JEB.
+
+    Le `payload` reçu sert d'item s'il est complet; sinon l'enregistrement
+    est relu sur l'API. L'écriture passe par le même _EntityWriter que
+    sync_entity (empreinte, références, upsert, after_write, trace).
+    deleted=True applique JEB_MISSING_POLICY à la ligne (cf. reconcile).
+    """
+    model = spec.get_model()
+    try:
+        remote_id = model._meta.pk.to_python(remote_id)
+    except ValidationError:
+        # échec définitif: la tâche n'est pas retentée (cf. jobs._finish)
+        return {"ok": False, "error": "invalid_id", "id": remote_id, "permanent": True}
+    if deleted:
+        result = {"ok": True, "deleted": True, **remove_record(spec, model, remote_id)}
+        logger.info("Sync %s %s (suppression): %s", spec.cible_type, remote_id, result)
+        return result
+
+    item = dict(payload) if isinstance(payload, dict) else {}
+    item.setdefault("id", remote_id)
+    if not payload or spec.needs_detail(item):
+        client = client or get_client()
+        item, template = _fetch_detail(client, spec, item, _record_paths(spec))
+        if template is None:
+            return {"ok": False, "error": "fetch_failed", "id": remote_id}
+        if template != _cached_path(spec.cible_type, "detail"):
+            _remember_path(spec.cible_type, "detail", template)
+
+    stats = {"created": 0, "updated": 0, "unchanged": 0, "errors": 0, "total": 1}
+    writer = _EntityWriter(spec, model, stats)
+    try:
+        writer.add(remote_id, item)
+        writer.finish()
+    finally:
+        writer.rollback()
+    result = {"ok": not stats["errors"] and not writer.failed_commits, "id": remote_id, **stats}
+    unknown_refs = writer.unknown_refs()
+    if unknown_refs:
+        result["unknown_refs"] = unknown_refs
+    if result["ok"] and restore_record(spec, model, remote_id):
+        result["restored"] = 1
+    logger.info("Sync %s %s terminé: %s", spec.cible_type, remote_id, result)
+    return result
+
+
+def sync_startups(client: Optional[JEBClient] = None):
+    return sync_entity(STARTUPS, client)
+
+
+def sync_users(client: Optional[JEBClient] = None):
+    return sync_entity(USERS, client)
+
+
+def sync_investors(client: Optional[JEBClient] = None):
+    return sync_entity(INVESTORS, client)
+
+
+def sync_partners(client: Optional[JEBClient] = None):
+    return sync_entity(PARTNERS, client)
+
+
+def sync_news(client: Optional[JEBClient] = None):
+    return sync_entity(NEWS, client)
+
+
+def sync_events(client: Optional[JEBClient] = None):
+    return sync_entity(EVENTS, client)
+
+
+def _dependencies(specs) -> dict:
+    """{label: labels prérequis}: une spec dépend de celles dont ses Ref visent le modèle.
+
+    Ex: news et events résolvent auteur / organisateur parmi les utilisateurs,
+    qui doivent donc être synchronisés avant.
+    """
+    by_model = {spec.model.lower(): spec.label for spec in specs}
+    deps = {}
+    for spec in specs:
+        required = {by_model.get(ref.model.lower()) for ref in spec.refs.values()} - {None, spec.label}
+        if required:
+            deps[spec.label] = tuple(sorted(required))
+    return deps
+
+
+SYNC_DEPENDENCIES = _dependencies(SPECS)
+
+
+def _record_run(run_id: uuid.UUID, label: str, started, elapsed: float, result: dict, metrics: SyncMetrics) -> dict:
+    """Enregistre le SyncRun d'une entité et retourne son profil (durées, volumes, débit)."""
+    profile = {"seconds": round(elapsed, 3), **metrics.as_dict()}
+    rows = result.get("total") or 0
+    profile["rows_per_sec"] = round(rows / elapsed, 1) if elapsed > 0 else 0.0
+    try:
+        SyncRun.objects.create(
+            lot=run_id,
+            entite=label,
+            debut=started,
+            fin=started + timedelta(seconds=elapsed),
+            ok=bool(result.get("ok")),
+            duree_http=profile["http_seconds"],
+            duree_parse=profile["parse_seconds"],
+            duree_db=profile["db_seconds"],
+            nb_requetes_http=profile["http_requests"],
+            nb_requetes_sql=profile["db_queries"],
+            octets_recus=profile["bytes_received"],
+            lignes_par_sec=profile["rows_per_sec"],
+            nb_lignes=rows,
+            nb_crees=result.get("created") or 0,
+            nb_maj=result.get("updated") or 0,
+            nb_inchanges=result.get("unchanged") or 0,
+            nb_erreurs=result.get("errors") or 0,
+            resultat=json.dumps(result, ensure_ascii=False, default=str),
+        )
+    except DatabaseError:
+        logger.warning("Journal de sync indisponible pour %s", label, exc_info=True)
+    return profile
+
+
+def _run_sync_task(label: str, fn, run_id: uuid.UUID, profile: bool = False, worker: bool = True) -> dict:
+    """Exécute une sync avec son propre client HTTP et la journalise (SyncRun).
+
+    Temps HTTP, temps de décodage et requêtes SQL (execute_wrapper sur la
+    connexion du thread) sont mesurés pendant la sync; avec profile=True le
+    profil est aussi ajouté au résultat. Dans un thread du planificateur
+    (worker), la connexion base ouverte est fermée à la fin pour ne pas
+    laisser de connexion orpheline.
+    """
+    client = JEBClient()
+    metrics = SyncMetrics()
+    client.metrics = metrics
+    started = timezone.now()
+    clock = time.perf_counter()
+    try:
+        try:
+            with connection.execute_wrapper(metrics.db_wrapper):
+                result = fn(client=client)
+        except Exception as e:
+            logger.exception("Erreur sync %s", label)
+            result = {"ok": False, "error": str(e)}
+        run_profile = _record_run(run_id, label, started, time.perf_counter() - clock, result, metrics)
+        if profile:
+            result["profile"] = run_profile
+        return result
+    finally:
+        client.close()
+        if worker:
+            connection.close()
+
+
+def sync_all(parallelism: Optional[int] = None, profile: bool = False, bulk: bool = False, full: bool = False):
+    """Lance toutes les syncs en respectant SYNC_DEPENDENCIES.
+
+    Les syncs indépendantes tournent en parallèle (JEB_SYNC_PARALLELISM,
+    défaut 4), chacune avec sa connexion base et son client HTTP; une sync
+    dépendante démarre dès que ses prérequis sont terminés (qu'ils aient
+    réussi ou non, comme en séquentiel). Avec parallelism=1, ou sur SQLite
+    qui sérialise de toute façon les écritures, exécution dans l'ordre
+    historique sur le thread courant.
+
+    Chaque entité laisse un SyncRun (même identifiant de lot pour tout le
+    run); profile=True ajoute en plus son profil à chaque résultat.
+    bulk=True: réimport complet par COPY et fusion ensembliste; full=True:
+    listes complètes même si une sync incrémentale est possible (cf. sync_entity).
+    """
+    actions = [(spec.label, partial(sync_entity, spec, bulk=bulk, full=full)) for spec in SPECS]
+    parallelism = parallelism or getattr(settings, "JEB_SYNC_PARALLELISM", 4)
+    if connection.vendor == "sqlite":
+        parallelism = 1
+    run_id = uuid.uuid4()
+    results = {label: None for label, _ in actions}
+    if parallelism <= 1:
+        for label, fn in actions:
+            results[label] = _run_sync_task(label, fn, run_id, profile=profile, worker=False)
+        return results
+
+    funcs = dict(actions)
+    waiting = {label: set(SYNC_DEPENDENCIES.get(label, ())) & set(funcs) for label in funcs}
+    with ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix="jeb-sync") as pool:
+        running = {}
+
+        def _start_ready():
+            for label in [l for l, deps in waiting.items() if not deps]:
+                del waiting[label]
+                running[pool.submit(_run_sync_task, label, funcs[label], run_id, profile)] = label
+
+        _start_ready()
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                label = running.pop(fut)
+                results[label] = fut.result()
+                for deps in waiting.values():
+                    deps.discard(label)
+            _start_ready()
+    return results
@@ -0,0 +1,317 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from django.apps import apps
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.utils import timezone
+
+_UNSET = object()
+
+
+def list_paths(resource: str) -> tuple:
+    """Chemins de liste sondés pour une ressource, dans l'ordre historique."""
+    return tuple(f"{prefix}/{resource}{slash}" for prefix in ("", "/api", "/api/v1", "/v1") for slash in ("/", ""))
+
+
+class Alias:
+    """Équivaut à `item.get(a) or item.get(b) or default`; un `default` texte reçoit l'id ("Startup-{id}")."""
+
+    def __init__(self, *keys: str, default: Any = _UNSET):
+        self.keys = keys
+        self.default = default
+
+    def __call__(self, item: dict, remote_id: Any) -> Any:
+        value = None
+        for key in self.keys:
+            value = item.get(key)
+            if value:
+                return value
+        if self.default is _UNSET:
+            return value
+        if isinstance(self.default, str):
+            return self.default.format(id=remote_id)
+        return self.default
+
+
+class Ref:
+    """Clé étrangère: id distant lu comme un Alias, résolu parmi les pk de `model` ("app.Modele")."""
+
+    def __init__(self, model: str, *keys: str):
+        self.model = model
+        self.alias = Alias(*keys)
+
+    def raw(self, item: dict) -> Any:
+        return self.alias(item, None)
+
+
+class OptionalColumn:
+    """Colonne que la table peut porter sans que le modèle (managed=False) la déclare."""
+
+    def __init__(self, names, value: Callable[[dict, Any], Any]):
+        self.names = (names,) if isinstance(names, str) else tuple(names)
+        self.value = value
+
+
+@dataclass(frozen=True)
+class EntitySpec:
+    """Entité synchronisée depuis l'API JEB, exécutée par services.sync_entity.
+
+      - label: clé du résultat de sync_all ("startups")
+      - cible_type: type des traces ImportAPI et des chemins mémorisés
+      - model: modèle local, "app.Modele" (pk = id distant)
+      - paths: chemins de liste candidats, sondés dans l'ordre
+      - fields: {champ du modèle: Alias | Ref | callable(item, id distant)}
+      - create_only: champs écrits à la création seulement
+      - optional_columns: colonnes hors modèle, écrites si la table les a
+      - detail_paths / detail_keys: ressource détail demandée quand un item
+        de liste n'a pas toutes les detail_keys
+      - after_write: callable({id: (valeurs, item)}) après chaque lot écrit
+        (en mode bulk: après la fusion, valeurs relues en base et item None)
+    """
+
+    label: str
+    cible_type: str
+    model: str
+    paths: tuple
+    fields: dict
+    create_only: tuple = ()
+    optional_columns: tuple = ()
+    detail_paths: tuple = ()
+    detail_keys: tuple = ()
+    after_write: Optional[Callable[[dict], None]] = None
+    refs: dict = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "refs", {name: src for name, src in self.fields.items() if isinstance(src, Ref)})
+
+    def get_model(self):
+        return apps.get_model(self.model)
+
+    def needs_detail(self, item: Any) -> bool:
+        """Vrai si l'item 'list' est partiel et nécessite la ressource détail."""
+        if not self.detail_paths or not isinstance(item, dict) or (item.get("id") or item.get("pk")) is None:
+            return False
+        return any(k not in item or item.get(k) in (None, "", []) for k in self.detail_keys)
+
+
+def _now(item: dict, remote_id: Any):
+    return timezone.now()
+
+
+def _hashed_password(source: Alias) -> Callable[[dict, Any], Any]:
+    """Mot de passe haché comme le ferait Utilisateur.save(), que les écritures groupées n'appellent pas."""
+    def value(item: dict, remote_id: Any) -> Any:
+        pw = source(item, remote_id)
+        if not pw:
+            return pw
+        if '$' in pw:
+            try:
+                identify_hasher(pw)
+                return pw
+            except Exception:
+                pass
+        return make_password(pw)
+    return value
+
+
+def _founders_json(item: dict, remote_id: Any) -> Optional[list]:
+    founders_data = item.get("founders") or item.get("fondateurs") or []
+    return founders_data if isinstance(founders_data, list) else None
+
+
+def _founder_names(founders_data: Any) -> list:
+    return [
+        f.get("name") or f.get("nom") or "Fondateur"
+        for f in founders_data
+        if isinstance(f, dict)
+    ]
+
+
+def _reconcile_founders(written: dict):
+    """Aligne les Founder d'un lot de startups sur les listes reçues (un DELETE et un INSERT groupés)."""
+    Founder = apps.get_model("startups", "Founder")
+    founders_by_startup = {
+        startup_id: _founder_names(values["founders_json"])
+        for startup_id, (values, _) in written.items()
+        if isinstance(values["founders_json"], list)
+    }
+    if not founders_by_startup:
+        return
+    existing = {}
+    for founder_id, startup_id, name in (
+        Founder.objects.filter(startup_id__in=list(founders_by_startup))
+        .order_by("id")
+        .values_list("id", "startup_id", "name")
+    ):
+        existing.setdefault(startup_id, []).append((founder_id, name))
+
+    to_delete = []
+    to_create = []
+    for startup_id, names in founders_by_startup.items():
+        wanted = Counter(names)
+        for founder_id, name in existing.get(startup_id, []):
+            if wanted[name] > 0:
+                wanted[name] -= 1
+            else:
+                to_delete.append(founder_id)
+        for name in names:
+            if wanted[name] > 0:
+                wanted[name] -= 1
+                to_create.append(Founder(startup_id=startup_id, name=name))
+
+    if to_delete:
+        Founder.objects.filter(id__in=to_delete).delete()
+    if to_create:
+        Founder.objects.bulk_create(to_create)
+
+
+def _event_capacity(item: dict, remote_id: Any) -> Optional[int]:
+    for key in ("max_attendees", "max_attendees_count", "capacity", "max_capacity", "nb_max", "places", "places_prevues"):
+        value = item.get(key)
+        if value is None:
+            continue
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            try:
+                return int(float(value))
+            except (TypeError, ValueError):
+                continue
+    return None
+
+
+STARTUPS = EntitySpec(
+    label="startups",
+    cible_type="startup",
+    model="startups.Startup",
+    paths=list_paths("startups"),
+    fields={
+        "nom": Alias("name", "nom", default="Startup-{id}"),
+        "slug": Alias("slug", default="startup-{id}"),
+        "description_courte": Alias("short_description", "description_courte"),
+        "description_longue": Alias("description", "description_longue"),
+        "secteur": Alias("sector", "secteur"),
+        "stade": Alias("maturity", "stade"),
+        "date_creation": Alias("created_at", "date_creation"),
+        "site_web": Alias("website_url", "site_web"),
+        "reseaux_sociaux": Alias("social_media_url", "reseaux_sociaux"),
+        "logo_url": Alias("logo", "logo_url"),
+        "contact_email": Alias("email", "contact_email", default="inconnu@example.com"),
+        "contact_tel": Alias("phone", "contact_tel"),
+        "localisation": Alias("address", "localisation"),
+        "nb_pers": Alias("team_size", "nb_pers", default=0),
+        "cree_le": _now,
+        "maj_le": _now,
+        "name": Alias("name", "nom", default="Startup-{id}"),
+        "legal_status": Alias("legal_status", "statut_juridique"),
+        "address": Alias("address", "adresse"),
+        "email": Alias("email", "contact_email", default=None),
+        "phone": Alias("phone", "contact_tel"),
+        "created_at": Alias("created_at", "date_creation"),
+        "description": Alias("description", "description_longue"),
+        "website_url": Alias("website_url", "site_web"),
+        "social_media_url": Alias("social_media_url", "reseaux_sociaux"),
+        "project_status": Alias("project_status", "status", default=None),
+        "needs": Alias("needs", "current_needs", "besoins", default=None),
+        "sector": Alias("sector", "secteur"),
+        "maturity": Alias("maturity", "stade"),
+        "founders_json": _founders_json,
+    },
+    create_only=("cree_le",),
+    detail_paths=("/startups/{id}", "/startups/{id}/", "/api/startups/{id}", "/api/v1/startups/{id}"),
+    detail_keys=("description", "created_at", "website_url", "social_media_url", "needs", "founders"),
+    after_write=_reconcile_founders,
+)
+
+USERS = EntitySpec(
+    label="users",
+    cible_type="user",
+    model="users.Utilisateur",
+    paths=list_paths("users"),
+    fields={
+        "nom": Alias("name", "nom", "email", default="User-{id}"),
+        "email": Alias("email", default="user{id}@example.com"),
+        "password": _hashed_password(Alias("password", default="!imported!")),
+        "role": Alias("role", default="startup"),
+        "avatar_url": Alias("avatar", "avatar_url"),
+        "dernier_login": Alias("last_login", "dernier_login"),
+    },
+)
+
+INVESTORS = EntitySpec(
+    label="investors",
+    cible_type="investor",
+    model="startups.Investor",
+    paths=list_paths("investors"),
+    fields={
+        "name": Alias("name", "nom", default="Investor-{id}"),
+        "legal_status": Alias("legal_status"),
+        "address": Alias("address"),
+        "email": Alias("email", default="investor{id}@example.com"),
+        "phone": Alias("phone"),
+        "description": Alias("description"),
+        "investor_type": Alias("type", "investor_type"),
+        "investment_focus": Alias("focus", "investment_focus"),
+    },
+)
+
+PARTNERS = EntitySpec(
+    label="partners",
+    cible_type="partner",
+    model="startups.Partner",
+    paths=list_paths("partners"),
+    fields={
+        "name": Alias("name", "nom", default="Partner-{id}"),
+        "legal_status": Alias("legal_status"),
+        "address": Alias("address"),
+        "email": Alias("email", default="partner{id}@example.com"),
+        "phone": Alias("phone"),
+        "description": Alias("description"),
+        "partnership_type": Alias("partnership_type", "type"),
+    },
+)
+
+NEWS = EntitySpec(
+    label="news",
+    cible_type="news",
+    model="news.Actualite",
+    paths=list_paths("news"),
+    fields={
+        "titre": Alias("title", "titre", default="News-{id}"),
+        "slug": Alias("slug", default="news-{id}"),
+        "contenu": Alias("content", "contenu", default=''),
+        "image_url": Alias("image", "image_url"),
+        "auteur": Ref("users.Utilisateur", "author_id", "auteur_id", "auteur"),
+        "type": Alias("type"),
+    },
+)
+
+EVENTS = EntitySpec(
+    label="events",
+    cible_type="event",
+    model="events.Evenement",
+    paths=list_paths("events"),
+    fields={
+        "titre": Alias("title", "titre", default="Event-{id}"),
+        "description": Alias("description"),
+        "date_debut": Alias("start_date", "date_debut"),
+        "date_fin": Alias("end_date", "date_fin"),
+        "lieu": Alias("location", "lieu"),
+        "organisateur": Ref("users.Utilisateur", "organizer_id", "organisateur_id"),
+        "nb_inscrits": Alias("attendees", "nb_inscrits", default=0),
+        "type": Alias("type", "event_type", default='general'),
+        "photo_url": Alias("image", "photo_url"),
+    },
+    optional_columns=(
+        OptionalColumn("event_type", Alias("event_type", "type", "type_event", default=None)),
+        OptionalColumn("target_audience", Alias("target_audience", "target_audiance", "target", default=None)),
+        OptionalColumn(
+            ("max_attendees", "capacity", "max_capacity", "nb_max", "places", "places_prevues", "capacity_total"),
+            _event_capacity,
+        ),
+    ),
+)
+
+# ordre historique d'exécution de sync_all
+SPECS = (STARTUPS, USERS, INVESTORS, PARTNERS, NEWS, EVENTS)
@@ -0,0 +1,413 @@
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from .specs import SPECS
+
+logger = logging.getLogger(__name__)
+
+# ressources servies (mêmes noms que les chemins de liste des specs)
+RESOURCES = tuple(spec.label for spec in SPECS)
+
+_SECTORS = ["FinTech", "HealthTech", "EdTech", "GreenTech", "AgriTech", "LegalTech", "DeepTech"]
+_MATURITIES = ["Idea", "Prototype", "MVP", "Seed", "Series A"]
+_STATUSES = ["SAS", "SARL", "SASU", "Association"]
+_CITIES = ["Paris", "Lyon", "Nantes", "Bordeaux", "Lille", "Marseille", "Toulouse"]
+_WORDS = ("lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt "
+          "ut labore et dolore magna aliqua").split()
+
+
+class Catalog:
+    """Données servies par le faux serveur JEB.
+
+    `lists[ressource]` est la liste telle que renvoyée par l'endpoint de
+    liste (items éventuellement partiels), `details[ressource][id]` la
+    ressource détail complète. Un id sans détail renvoie l'item de liste.
+    """
+
+    def __init__(self, lists: Optional[dict] = None, details: Optional[dict] = None):
+        self.lists = lists or {}
+        self.details = details or {}
+
+    def list_items(self, resource: str) -> Optional[list]:
+        return self.lists.get(resource)
+
+    def detail(self, resource: str, remote_id: str) -> Optional[dict]:
+        found = self.details.get(resource, {}).get(remote_id)
+        if found is not None:
+            return found
+        for item in self.lists.get(resource) or []:
+            if isinstance(item, dict) and str(item.get("id")) == remote_id:
+                return item
+        return None
+
+    @classmethod
+    def synthesize(cls, counts: dict, partial: float = 0.3, seed: int = 0) -> "Catalog":
+        """Catalogue synthétique: counts = {ressource: nombre d'items}.
+
+        Une fraction `partial` des items des ressources ayant une ressource
+        détail (startups) est servie amputée de ses champs détail dans la
+        liste, ce qui force la sync à demander le détail.
+        """
+        rng = random.Random(seed)
+        n_users = counts.get("users", 0)
+        lists, details = {}, {}
+        for spec in SPECS:
+            n = counts.get(spec.label, 0)
+            if not n:
+                continue
+            make = _GENERATORS[spec.label]
+            full = [make(rng, i, n_users) for i in range(1, n + 1)]
+            for item in full:
+                item["updated_at"] = _stamp(rng)
+            details[spec.label] = {str(item["id"]): item for item in full}
+            if spec.detail_keys:
+                lists[spec.label] = [
+                    {k: v for k, v in item.items() if k not in spec.detail_keys} if rng.random() < partial else item
+                    for item in full
+                ]
+            else:
+                lists[spec.label] = full
+        return cls(lists, details)
+
+    @classmethod
+    def load(cls, directory: str) -> "Catalog":
+        """Catalogue enregistré par record(): <ressource>.json + <ressource>/<id>.json."""
+        lists, details = {}, {}
+        for resource in RESOURCES:
+            path = os.path.join(directory, f"{resource}.json")
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as fh:
+                    lists[resource] = json.load(fh)
+            detail_dir = os.path.join(directory, resource)
+            if os.path.isdir(detail_dir):
+                for name in os.listdir(detail_dir):
+                    if name.endswith(".json"):
+                        with open(os.path.join(detail_dir, name), encoding="utf-8") as fh:
+                            details.setdefault(resource, {})[name[:-len(".json")]] = json.load(fh)
+        return cls(lists, details)
+
+    def save(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        for resource, items in self.lists.items():
+            with open(os.path.join(directory, f"{resource}.json"), "w", encoding="utf-8") as fh:
+                json.dump(items, fh, ensure_ascii=False, indent=1)
+        for resource, by_id in self.details.items():
+            detail_dir = os.path.join(directory, resource)
+            os.makedirs(detail_dir, exist_ok=True)
+            for remote_id, item in by_id.items():
+                with open(os.path.join(detail_dir, f"{remote_id}.json"), "w", encoding="utf-8") as fh:
+                    json.dump(item, fh, ensure_ascii=False, indent=1)
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _date(rng: random.Random, days: int = 2000) -> str:
+    return (datetime(2026, 1, 1) - timedelta(days=rng.randrange(days))).strftime("%Y-%m-%d")
+
+
+def _stamp(rng: random.Random, days: int = 365) -> str:
+    """Date de modification distante (ISO 8601 UTC), dans l'année précédant 2026."""
+    return (datetime(2026, 1, 1) - timedelta(seconds=rng.randrange(days * 86400))).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _parse_stamp(value) -> Optional[datetime]:
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _startup(rng, i, n_users):
+    return {
+        "id": i,
+        "name": f"Startup {i}",
+        "legal_status": rng.choice(_STATUSES),
+        "address": f"{rng.randrange(1, 200)} rue {rng.choice(_WORDS)}, {rng.choice(_CITIES)}",
+        "email": f"contact@startup{i}.example",
+        "phone": f"+33 6 {rng.randrange(10**7, 10**8)}",
+        "sector": rng.choice(_SECTORS),
+        "maturity": rng.choice(_MATURITIES),
+        "created_at": _date(rng),
+        "description": _sentence(rng, rng.randrange(20, 80)),
+        "website_url": f"https://startup{i}.example",
+        "social_media_url": f"https://social.example/startup{i}",
+        "project_status": rng.choice(["Active", "Paused", "Incubated"]),
+        "needs": _sentence(rng, 8),
+        "founders": [{"id": i * 10 + k, "name": f"Founder {i}-{k}", "startup_id": i} for k in range(rng.randrange(1, 4))],
+    }
+
+
+def _user(rng, i, n_users):
+    return {
+        "id": i,
+        "email": f"user{i}@example.com",
+        "name": f"User {i}",
+        "role": rng.choice(["startup", "investor", "admin"]),
+        "last_login": _date(rng, 90) + "T08:00:00Z",
+    }
+
+
+def _investor(rng, i, n_users):
+    return {
+        "id": i,
+        "name": f"Investor {i}",
+        "legal_status": rng.choice(_STATUSES),
+        "address": rng.choice(_CITIES),
+        "email": f"investor{i}@example.com",
+        "phone": f"+33 1 {rng.randrange(10**7, 10**8)}",
+        "description": _sentence(rng, 30),
+        "investor_type": rng.choice(["VC", "Business Angel", "Corporate"]),
+        "investment_focus": rng.choice(_SECTORS),
+    }
+
+
+def _partner(rng, i, n_users):
+    return {
+        "id": i,
+        "name": f"Partner {i}",
+        "legal_status": rng.choice(_STATUSES),
+        "address": rng.choice(_CITIES),
+        "email": f"partner{i}@example.com",
+        "phone": f"+33 1 {rng.randrange(10**7, 10**8)}",
+        "description": _sentence(rng, 30),
+        "partnership_type": rng.choice(["Sponsor", "Mentor", "Academic"]),
+    }
+
+
+def _news(rng, i, n_users):
+    return {
+        "id": i,
+        "title": f"News {i}: {_sentence(rng, 5)}",
+        "content": _sentence(rng, rng.randrange(40, 200)),
+        "type": rng.choice(["funding", "product", "event"]),
+        "news_date": _date(rng, 365),
+        # quelques auteurs inconnus, comme en production
+        "author_id": rng.randrange(1, n_users + 1) if n_users and rng.random() < 0.95 else 10**6 + i,
+    }
+
+
+def _event(rng, i, n_users):
+    start = datetime(2026, 1, 1) + timedelta(days=rng.randrange(365), hours=rng.randrange(8, 18))
+    return {
+        "id": i,
+        "title": f"Event {i}",
+        "description": _sentence(rng, 40),
+        "start_date": start.isoformat() + "Z",
+        "end_date": (start + timedelta(hours=rng.randrange(1, 8))).isoformat() + "Z",
+        "location": rng.choice(_CITIES),
+        "event_type": rng.choice(["workshop", "meetup", "pitch", "conference"]),
+        "target_audience": rng.choice(["startups", "investors", "all"]),
+        "capacity": rng.randrange(10, 500),
+        "organizer_id": rng.randrange(1, n_users + 1) if n_users else None,
+    }
+
+
+_GENERATORS = {
+    "startups": _startup,
+    "users": _user,
+    "investors": _investor,
+    "partners": _partner,
+    "news": _news,
+    "events": _event,
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Routes: /<ressource>[/] (liste, DRF paginée si page_size) et /<ressource>/<id>[/] (détail).
+
+    La liste accepte le filtre ?<delta_param>=<date ISO>: seuls les items
+    dont updated_at est postérieur ou égal sont servis.
+    """
+
+    server: "StandinServer"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):
+        logger.debug("standin: " + fmt, *args)
+
+    def do_GET(self):
+        srv = self.server
+        srv.track(+1)
+        try:
+            srv.simulate_latency()
+            if srv.max_inflight and srv.inflight > srv.max_inflight:
+                self._send(429, b"", {"Retry-After": "1"})
+                return
+            status, payload = self._route()
+            if status != 200:
+                self._send(status, b"")
+                return
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            etag = '"%s"' % hashlib.sha1(body).hexdigest()
+            if srv.etags and self.headers.get("If-None-Match") == etag:
+                self._send(304, b"", {"ETag": etag})
+                return
+            self._send(200, body, {"ETag": etag} if srv.etags else {})
+        finally:
+            srv.track(-1)
+
+    def _route(self):
+        srv = self.server
+        parts = urlsplit(self.path)
+        path = parts.path
+        if srv.prefix:
+            if not path.startswith(srv.prefix + "/"):
+                return 404, None
+            path = path[len(srv.prefix):]
+        segments = [s for s in path.split("/") if s]
+        if not segments or segments[0] not in RESOURCES:
+            return 404, None
+        resource = segments[0]
+        if len(segments) == 2:
+            item = srv.catalog.detail(resource, segments[1])
+            return (200, item) if item is not None else (404, None)
+        if len(segments) != 1:
+            return 404, None
+        items = srv.catalog.list_items(resource)
+        if items is None:
+            return 404, None
+        query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        if srv.delta_param and srv.delta_param in query:
+            since = _parse_stamp(query[srv.delta_param])
+            if since is None:
+                return 400, None
+            items = [item for item in items if not isinstance(item, dict)
+                     or (_parse_stamp(item.get("updated_at")) or since) >= since]
+        if not srv.page_size:
+            return 200, items
+        try:
+            page = max(1, int(query.get("page", "1")))
+        except ValueError:
+            page = 1
+        start = (page - 1) * srv.page_size
+        if start and start >= len(items):
+            return 404, None
+
+        def _link(number):
+            return f"{srv.prefix}/{resource}/?{urlencode({**query, 'page': number})}"
+
+        nxt = _link(page + 1) if start + srv.page_size < len(items) else None
+        prev = _link(page - 1) if page > 1 else None
+        return 200, {"count": len(items), "next": nxt, "previous": prev,
+                     "results": items[start:start + srv.page_size]}
+
+    def _send(self, status: int, body: bytes, headers: Optional[dict] = None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+
+class StandinServer(ThreadingHTTPServer):
+    """Faux serveur JEB servant un Catalog, avec latence et limite de débit simulées.
+
+      - latency / jitter: attente en secondes avant chaque réponse
+        (latency + uniforme[0, jitter])
+      - page_size: pagination DRF (count / next / results), 0 pour une liste brute
+      - prefix: préfixe des routes (ex: "/api"), pour exercer le sondage des chemins
+      - etags: ETag + 304 sur If-None-Match
+      - max_inflight: au-delà, 429 avec Retry-After (0: pas de limite)
+      - delta_param: paramètre de liste "modifié depuis" (None: ignoré, comme
+        une API qui ne sait pas filtrer)
+    """
+
+    daemon_threads = True
+
+    def __init__(self, catalog: Catalog, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 jitter: float = 0.0, page_size: int = 0, prefix: str = "", etags: bool = True,
+                 max_inflight: int = 0, seed: Optional[int] = None, delta_param: Optional[str] = "updated_since"):
+        super().__init__((host, port), _Handler)
+        self.catalog = catalog
+        self.latency = latency
+        self.jitter = jitter
+        self.page_size = page_size
+        self.prefix = prefix.rstrip("/")
+        self.etags = etags
+        self.max_inflight = max_inflight
+        self.delta_param = delta_param
+        self.inflight = 0
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{self.prefix}"
+
+    def track(self, delta: int):
+        with self._lock:
+            self.inflight += delta
+            if delta > 0:
+                self.requests += 1
+
+    def simulate_latency(self):
+        delay = self.latency
+        if self.jitter:
+            with self._lock:
+                delay += self._rng.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def start(self) -> threading.Thread:
+        """Sert en tâche de fond (benchmarks, tests manuels); arrêt via shutdown()."""
+        thread = threading.Thread(target=self.serve_forever, name="jeb-standin", daemon=True)
+        thread.start()
+        return thread
+
+
+def record(directory: str, client=None, resources: Optional[tuple] = None, details: str = "partial") -> dict:
+    """Enregistre les réponses de l'API JEB réelle comme fixtures du faux serveur.
+
+    Les listes sont lues avec la mécanique de sync (sondage des chemins,
+    pagination); details="partial" ne demande la ressource détail que pour
+    les items de liste partiels, "all" pour tous, "none" jamais.
+    Retourne {ressource: nombre d'items enregistrés}.
+    """
+    from . import services
+    from .client import JEBClient
+
+    client = client or JEBClient(cache=None)
+    wanted = set(resources or RESOURCES)
+    catalog = Catalog()
+    counts = {}
+    for spec in SPECS:
+        if spec.label not in wanted:
+            continue
+        response, url = services._fetch_list(client, spec.cible_type, spec.paths)
+        if response is None or response.status_code >= 400:
+            logger.warning("Enregistrement %s impossible (%s)", spec.label,
+                           "404" if response is None else response.status_code)
+            continue
+        state = {}
+        items = [item for item, _ in services._iter_pages(client, response, url, state)]
+        if "error" in state:
+            logger.warning("Liste %s incomplète: %s", spec.label, state["error"])
+        catalog.lists[spec.label] = items
+        if spec.detail_paths and details != "none":
+            paths = services._ordered_paths(spec.detail_paths, services._cached_path(spec.cible_type, "detail"))
+            for item in items:
+                if not isinstance(item, dict) or (details == "partial" and not spec.needs_detail(item)):
+                    continue
+                detailed, template = services._fetch_detail(client, spec, item, paths)
+                if template is not None:
+                    catalog.details.setdefault(spec.label, {})[str(item.get("id") or item.get("pk"))] = detailed
+        counts[spec.label] = len(items)
+    catalog.save(directory)
+    return counts
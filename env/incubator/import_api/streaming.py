@@ -0,0 +1,127 @@
+import codecs
+import json
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+# clés d'enveloppe dont le tableau est rendu élément par élément
+ENVELOPE_KEYS = ("results", "data")
+
+_WHITESPACE = " \t\n\r"
+# suite possible d'un nombre JSON
+_NUMBER_CHARS = "0123456789.eE+-"
+
+
+class _Reader:
+    """Lecteur JSON incrémental sur un flux de fragments d'octets.
+
+    Le tampon ne conserve que la portion non encore consommée: la mémoire est
+    bornée par la taille du plus gros élément, pas par celle du document.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _more(self) -> bool:
+        if self.eof:
+            return False
+        for chunk in self._chunks:
+            text = self._decoder.decode(chunk)
+            if text:
+                self.buf = self.buf[self.pos:] + text
+                self.pos = 0
+                return True
+        self.buf = self.buf[self.pos:] + self._decoder.decode(b"", final=True)
+        self.pos = 0
+        self.eof = True
+        return False
+
+    def peek(self) -> str:
+        """Prochain caractère significatif ('' en fin de flux)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._more():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        c = self.peek()
+        if not c or c not in chars:
+            raise json.JSONDecodeError(f"Expecting one of {chars!r}", self.buf, self.pos)
+        self.pos += 1
+        return c
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                obj, end = self._json.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._more():
+                    continue
+                raise
+            # un nombre coupé par la fin du tampon ("-0." + "5e-3") se décode
+            # trop tôt: relire jusqu'à un délimiteur
+            if (isinstance(obj, (int, float)) and not isinstance(obj, bool) and not self.eof
+                    and (end == len(self.buf) or self.buf[end] in _NUMBER_CHARS) and self._more()):
+                continue
+            self.pos = end
+            return obj
+
+    def array(self) -> Iterator[Any]:
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.expect(",]") == "]":
+                return
+
+
+def iter_json_items(chunks: Iterable[bytes], envelope: Optional[dict] = None,
+                    normalize: Optional[Callable[[Any], Iterable[Any]]] = None) -> Iterator[Any]:
+    """Rend un à un les éléments d'une réponse JSON de liste, sans la charger en entier.
+
+    Formes reconnues (mêmes règles que services._normalize_response):
+      - tableau racine: chaque élément
+      - objet enveloppe: chaque élément du premier tableau 'results' / 'data';
+        les autres clés (count, next, ...) sont recopiées dans `envelope`
+      - objet seul portant id / nom / name: l'objet lui-même
+    Toute autre forme est matérialisée puis confiée à `normalize`.
+    """
+    if envelope is None:
+        envelope = {}
+    reader = _Reader(chunks)
+    first = reader.peek()
+    if first == "[":
+        yield from reader.array()
+    elif first == "{":
+        reader.pos += 1
+        streamed = False
+        if reader.peek() == "}":
+            reader.pos += 1
+        else:
+            while True:
+                key = reader.value()
+                reader.expect(":")
+                if not streamed and key in ENVELOPE_KEYS and reader.peek() == "[":
+                    yield from reader.array()
+                    streamed = True
+                else:
+                    envelope[key] = reader.value()
+                if reader.expect(",}") == "}":
+                    break
+        if not streamed and any(k in envelope for k in ("id", "nom", "name")):
+            yield dict(envelope)
+    elif first:
+        value = reader.value()
+        if normalize is not None:
+            yield from normalize(value)
+    if reader.peek():
+        raise json.JSONDecodeError("Extra data", reader.buf, reader.pos)
@@ -0,0 +1,530 @@
+import hashlib
+import hmac
+import io
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from unittest import mock
+
+import requests
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connections
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from . import benchmark, jobs, services
+from .client import JEBClient
+from .governor import Governor, backoff_delay, retry_after
+from .http_cache import DiskResponseCache
+from .models import ImportAPI, MissingRecord, SyncJob
+from .specs import INVESTORS, STARTUPS, USERS
+from .standin import Catalog, StandinServer
+from .streaming import iter_json_items
+
+# Base de test construite depuis les modèles (TEST: {'MIGRATE': False}), comme
+# pour jeb_benchmark: les migrations de startups ne suivent plus le modèle.
+
+
+@override_settings(PASSWORD_HASHERS=benchmark.FAST_HASHERS)
+class StandinTestCase(TestCase):
+    """Sync contre un faux serveur JEB local, sans cache HTTP sauf demande."""
+
+    counts = {"users": 20, "startups": 10, "investors": 10}
+    page_size = 0
+    etags = True
+
+    @classmethod
+    def setUpClass(cls):
+        # tables des modèles non gérés (users, news, events), hors transaction
+        benchmark.prepare_database()
+        super().setUpClass()
+
+    def setUp(self):
+        self.catalog = Catalog.synthesize(self.counts, partial=0.3, seed=1)
+        self.server = StandinServer(self.catalog, page_size=self.page_size, etags=self.etags)
+        self.server.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.cache = None
+        self.client = self.make_client()
+
+    def make_client(self, cache: bool = False) -> JEBClient:
+        if cache and self.cache is None:
+            directory = tempfile.mkdtemp()
+            self.addCleanup(shutil.rmtree, directory, True)
+            self.cache = DiskResponseCache(directory)
+        client = JEBClient(base=self.server.base_url, token="t", cache=self.cache if cache else None,
+                           governor=Governor(initial=8, maximum=8))
+        self.addCleanup(client.close)
+        return client
+
+    def sync(self, spec, **kwargs):
+        return services.sync_entity(spec, client=kwargs.pop("client", self.client), **kwargs)
+
+
+class GovernorTests(SimpleTestCase):
+    def test_backoff_is_capped(self):
+        for attempt in range(10):
+            self.assertLessEqual(backoff_delay(attempt, base=0.5, cap=4), 4)
+
+    def test_retry_after(self):
+        self.assertEqual(retry_after("3"), 3.0)
+        self.assertIsNone(retry_after("bientôt"))
+        self.assertIsNone(retry_after(None))
+
+    def test_limit_grows_then_halves(self):
+        gov = Governor(initial=4, maximum=8)
+        for _ in range(8):
+            gov.acquire()
+            gov.release(0.01)
+        self.assertGreater(gov.limit, 4)
+        before = gov.limit
+        gov.acquire()
+        gov.release(0.01, overloaded=True)
+        self.assertAlmostEqual(gov.limit, before / 2)
+
+    def test_pause_blocks_acquire(self):
+        gov = Governor(initial=2)
+        gov.pause(0.2)
+        start = time.monotonic()
+        gov.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+
+
+class DiskResponseCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+
+    def test_validators_and_body(self):
+        cache = DiskResponseCache(self.directory)
+        self.assertEqual(cache.validators("u"), {})
+        cache.store("u", '"e1"', None, b"[1]")
+        self.assertEqual(cache.validators("u"), {"If-None-Match": '"e1"'})
+        self.assertEqual(cache.body("u"), b"[1]")
+        cache.forget("u")
+        self.assertEqual(cache.validators("u"), {})
+
+    def test_without_validators_nothing_is_stored(self):
+        cache = DiskResponseCache(self.directory)
+        cache.store("u", None, None, b"[1]")
+        self.assertIsNone(cache.body("u"))
+
+    def test_eviction_keeps_total_size(self):
+        cache = DiskResponseCache(self.directory, max_bytes=10)
+        cache.store("a", '"a"', None, b"123456")
+        time.sleep(0.01)
+        cache.store("b", '"b"', None, b"123456")
+        self.assertIsNone(cache.body("a"))
+        self.assertEqual(cache.body("b"), b"123456")
+
+    def test_directory_listed_once_below_limit(self):
+        cache = DiskResponseCache(self.directory, max_bytes=1000)
+        with mock.patch("import_api.http_cache.os.listdir", wraps=os.listdir) as listdir:
+            for i in range(20):
+                cache.store(f"u{i}", '"e"', None, b"12345")
+            cache.store("u0", '"e"', None, b"1234567890")
+        self.assertEqual(listdir.call_count, 1)
+        self.assertEqual(cache._total, 105)
+
+    def test_full_cache_not_rescanned_on_every_store(self):
+        cache = DiskResponseCache(self.directory, max_bytes=1000)
+        with mock.patch("import_api.http_cache.os.listdir", wraps=os.listdir) as listdir:
+            for i in range(300):
+                cache.store(f"u{i}", '"e"', None, b"0123456789")
+        self.assertLess(listdir.call_count, 30)
+        bodies = [n for n in os.listdir(self.directory) if n.endswith(".body")]
+        self.assertLessEqual(sum(os.path.getsize(os.path.join(self.directory, n)) for n in bodies), 1000)
+
+
+class _Raw(io.BytesIO):
+    released = False
+
+    def release_conn(self):
+        self.released = True
+
+
+class JEBClientTests(SimpleTestCase):
+    def test_cached_304_body_releases_connection(self):
+        client = JEBClient(base="http://jeb.invalid", token="t", cache=None)
+        self.addCleanup(client.close)
+        resp = requests.Response()
+        resp.status_code = 304
+        resp.raw = _Raw()
+        resp._jeb_cached_file = io.BytesIO(b"[1, 2]")
+        self.assertEqual(b"".join(client.iter_bytes(resp, chunk_size=2)), b"[1, 2]")
+        self.assertTrue(resp.raw.released)
+
+
+class StreamingTests(SimpleTestCase):
+    def items(self, text: str, size: int = 3, envelope=None):
+        data = text.encode("utf-8")
+        return list(iter_json_items((data[i:i + size] for i in range(0, len(data), size)), envelope))
+
+    def test_array(self):
+        self.assertEqual(self.items('[{"id": 1}, {"id": 2, "nom": "é"}]'), [{"id": 1}, {"id": 2, "nom": "é"}])
+
+    def test_envelope(self):
+        envelope = {}
+        items = self.items('{"count": 2, "next": null, "results": [{"id": 1}, {"id": 2}]}', envelope=envelope)
+        self.assertEqual(items, [{"id": 1}, {"id": 2}])
+        self.assertEqual(envelope, {"count": 2, "next": None})
+
+    def test_single_object(self):
+        self.assertEqual(self.items('{"id": 7, "name": "x"}'), [{"id": 7, "name": "x"}])
+
+    def test_numbers_split_anywhere(self):
+        for chunks in ([b'[-0.', b'5e-3]'], [b'[-0.5e', b'-3]'], [b'[-0.5e-', b'3]'], [b'[1', b'2, 3', b'4]']):
+            self.assertEqual(list(iter_json_items(chunks)), json.loads(b"".join(chunks)))
+
+    def test_chunk_boundary_fuzz(self):
+        rng = random.Random(0)
+
+        def value(depth=0):
+            kind = rng.randrange(8 if depth < 3 else 5)
+            if kind == 0:
+                return rng.randint(-10 ** 6, 10 ** 6)
+            if kind == 1:
+                return rng.uniform(-1e6, 1e6) * 10 ** rng.randint(-30, 30)
+            if kind == 2:
+                return rng.choice([True, False, None])
+            if kind in (3, 4):
+                return "".join(rng.choice('ab é"\\\n€') for _ in range(rng.randrange(6)))
+            if kind == 5:
+                return [value(depth + 1) for _ in range(rng.randrange(4))]
+            return {f"k{i}": value(depth + 1) for i in range(rng.randrange(4))}
+
+        for _ in range(200):
+            doc = [value() for _ in range(rng.randrange(1, 6))]
+            data = json.dumps(doc, ensure_ascii=rng.random() < 0.5).encode("utf-8")
+            expected = json.loads(data)
+            for cut in range(1, len(data)):
+                self.assertEqual(list(iter_json_items([data[:cut], data[cut:]])), expected, data)
+            cuts = sorted(rng.sample(range(1, len(data)), min(len(data) - 1, 5)))
+            chunks = [data[i:j] for i, j in zip([0] + cuts, cuts + [len(data)])]
+            self.assertEqual(list(iter_json_items(chunks)), expected, data)
+
+    def test_truncated_document(self):
+        with self.assertRaises(ValueError):
+            self.items('[{"id": 1}, {"id"')
+
+
+class SyncEntityTests(StandinTestCase):
+    def test_cold_then_warm(self):
+        result = self.sync(USERS)
+        self.assertTrue(result["ok"], result)
+        self.assertEqual(result["created"], 20)
+        self.assertEqual(ImportAPI.objects.filter(cible_type=USERS.cible_type).count(), 20)
+        again = self.sync(USERS, full=True)
+        self.assertEqual((again["created"], again["updated"], again["unchanged"]), (0, 0, 20))
+
+    def test_details_completed(self):
+        self.sync(USERS)
+        result = self.sync(STARTUPS)
+        self.assertTrue(result["ok"], result)
+        self.assertEqual(result["created"], 10)
+        model = STARTUPS.get_model()
+        for remote_id, item in self.catalog.details["startups"].items():
+            self.assertTrue(model.objects.filter(pk=int(remote_id)).exists())
+
+    def test_update_detected_by_hash(self):
+        self.sync(INVESTORS)
+        item = self.catalog.lists["investors"][0]
+        item["name"] = f"{item.get('name')} (maj)"
+        result = self.sync(INVESTORS, full=True)
+        self.assertEqual((result["updated"], result["unchanged"]), (1, 9))
+
+
+class ConditionalSyncTests(StandinTestCase):
+    @override_settings(JEB_DELTA_SYNC=False)
+    def test_not_modified_pages_restore_missing_rows(self):
+        client = self.make_client(cache=True)
+        self.assertEqual(self.sync(INVESTORS, client=client)["created"], 10)
+        model = INVESTORS.get_model()
+        model.objects.filter(pk__in=[1, 2, 3]).delete()
+        result = self.sync(INVESTORS, client=client)
+        self.assertTrue(result["ok"], result)
+        self.assertTrue(result.get("not_modified"))
+        self.assertEqual((result["created"], result["unchanged"]), (3, 7))
+        self.assertEqual(model.objects.count(), 10)
+
+    @override_settings(JEB_DELTA_SYNC=False)
+    def test_not_modified_pages_are_skipped(self):
+        client = self.make_client(cache=True)
+        self.sync(INVESTORS, client=client)
+        result = self.sync(INVESTORS, client=client)
+        self.assertEqual((result["created"], result["updated"], result["unchanged"]), (0, 0, 10))
+
+    @override_settings(JEB_DELTA_SYNC=False)
+    def test_bulk_ignores_http_cache(self):
+        client = self.make_client(cache=True)
+        self.sync(INVESTORS, client=client)
+        INVESTORS.get_model().objects.all().delete()
+        result = self.sync(INVESTORS, client=client, bulk=True)
+        self.assertTrue(result["ok"], result)
+        self.assertFalse(result.get("not_modified"))
+        self.assertEqual(result["created"], 10)
+
+
+class DeltaSyncTests(StandinTestCase):
+    def probe(self, delta_param="updated_since", items=None):
+        catalog = self.catalog if items is None else Catalog({"investors": items}, {"investors": {}})
+        server = StandinServer(catalog, delta_param=delta_param)
+        server.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        client = JEBClient(base=server.base_url, token="t", cache=None, governor=Governor(initial=8, maximum=8))
+        self.addCleanup(client.close)
+        with override_settings(JEB_DELTA_PARAMS=("since", "updated_since")):
+            return services._probe_delta_param(client, INVESTORS, "/investors")
+
+    def test_probe_detects_filter(self):
+        self.assertEqual(self.probe(), "updated_since")
+
+    def test_probe_needs_a_filtered_difference(self):
+        self.assertEqual(self.probe(delta_param=None), "")
+        self.assertEqual(self.probe(items=[]), "")
+
+    def test_second_sync_is_incremental(self):
+        self.sync(INVESTORS)
+        item = self.catalog.lists["investors"][0]
+        item["name"] = f"{item.get('name')} (maj)"
+        item["updated_at"] = "2026-06-01T00:00:00Z"
+        result = self.sync(INVESTORS)
+        self.assertEqual(result["mode"], "delta", result)
+        self.assertEqual((result["updated"], result["unchanged"]), (1, 0))
+
+    def test_full_ignores_http_cache(self):
+        client = self.make_client(cache=True)
+        self.sync(INVESTORS, client=client)
+        INVESTORS.get_model().objects.all().delete()
+        result = self.sync(INVESTORS, client=client, full=True)
+        self.assertFalse(result.get("not_modified"))
+        self.assertEqual((result["mode"], result["created"]), ("full", 10))
+
+
+class ReconcileTests(StandinTestCase):
+    def setUp(self):
+        super().setUp()
+        self.sync(INVESTORS)
+        self.model = INVESTORS.get_model()
+        # ligne créée localement, sans trace ImportAPI
+        row = self.model.objects.values().get(pk=1)
+        row["id"] = 999
+        self.model.objects.create(**row)
+        self.catalog.lists["investors"] = [item for item in self.catalog.lists["investors"] if item["id"] not in (1, 2)]
+
+    def reconcile(self, policy):
+        with override_settings(JEB_MISSING_POLICY=policy):
+            result = self.sync(INVESTORS, full=True)
+        self.assertTrue(result["ok"], result)
+        self.assertEqual((result["missing_count"], result["missing_remote"]), (2, [1, 2]))
+        self.assertTrue(self.model.objects.filter(pk=999).exists())
+        return result
+
+    def statuts(self):
+        return dict(MissingRecord.objects.filter(cible_type=INVESTORS.cible_type).values_list("local_id", "statut"))
+
+    def test_report(self):
+        self.reconcile("report")
+        self.assertEqual(self.statuts(), {})
+        self.assertEqual(self.model.objects.count(), 11)
+
+    def test_flag(self):
+        self.reconcile("flag")
+        self.assertEqual(self.statuts(), {1: "signale", 2: "signale"})
+        self.assertEqual(self.model.objects.count(), 11)
+
+    def test_soft_delete(self):
+        self.reconcile("soft_delete")
+        self.assertEqual(self.statuts(), {1: "supprime", 2: "supprime"})
+
+    def test_archive(self):
+        result = self.reconcile("archive")
+        self.assertEqual(result["archived"], 2)
+        self.assertEqual(self.statuts(), {1: "archive", 2: "archive"})
+        self.assertEqual(sorted(self.model.objects.values_list("pk", flat=True)), [3, 4, 5, 6, 7, 8, 9, 10, 999])
+        self.assertFalse(ImportAPI.objects.filter(cible_type=INVESTORS.cible_type, local_id__in=[1, 2]).exists())
+
+    def test_returning_record_is_forgotten(self):
+        self.reconcile("flag")
+        self.catalog.lists["investors"].append(self.catalog.details["investors"]["1"])
+        result = self.sync(INVESTORS, full=True)
+        self.assertEqual(result["restored"], 1)
+        self.assertEqual(self.statuts(), {2: "signale"})
+
+    def test_deleted_notification_spares_local_rows(self):
+        with override_settings(JEB_MISSING_POLICY="archive"):
+            result = services.sync_record(INVESTORS, 999, deleted=True)
+        self.assertEqual(result["missing_count"], 0)
+        self.assertTrue(self.model.objects.filter(pk=999).exists())
+
+
+class PagedSyncEntityTests(StandinTestCase):
+    page_size = 4
+
+    def test_stopped_consumer_releases_prefetched_page(self):
+        responses = []
+        get = self.client.get
+
+        def recording_get(*args, **kwargs):
+            responses.append(get(*args, **kwargs))
+            return responses[-1]
+
+        self.client.get = recording_get
+        first = self.client.get(self.client.url("/users"), stream=True)
+        pages = services._iter_pages(self.client, first, first.url, {})
+        next(pages)
+        pages.close()
+        self.assertEqual(len(responses), 2)
+        self.assertTrue(all(resp.raw.closed for resp in responses))
+
+    @override_settings(JEB_SYNC_BATCH_SIZE=2, JEB_SYNC_TRANSACTION_SIZE=4)
+    def test_no_transaction_open_while_reading_pages(self):
+        self.sync(USERS)
+        depth = len(connections["default"].atomic_blocks)
+        depths = []
+        iter_pages = services._iter_pages
+
+        def recording_pages(*args, **kwargs):
+            for page in iter_pages(*args, **kwargs):
+                depths.append(len(connections["default"].atomic_blocks) - depth)
+                yield page
+
+        with mock.patch.object(services, "_iter_pages", recording_pages):
+            result = self.sync(STARTUPS, full=True)
+        self.assertEqual(result["created"], 10)
+        self.assertEqual(len(depths), 10)
+        self.assertEqual(set(depths), {0})
+
+    def test_all_pages_read(self):
+        result = self.sync(USERS)
+        self.assertTrue(result["ok"], result)
+        self.assertEqual(result["created"], 20)
+        self.assertEqual(self.server.requests, 5)
+
+
+@override_settings(JEB_WEBHOOK_SECRET="secret", JEB_WEBHOOK_DEBOUNCE=0)
+class WebhookTests(TestCase):
+    def post(self, event, signature=None):
+        body = json.dumps(event).encode()
+        if signature is None:
+            signature = "sha256=" + hmac.new(b"secret", body, hashlib.sha256).hexdigest()
+        return self.client.post(reverse("jeb-webhook"), body, content_type="application/json",
+                                headers={"X-JEB-Signature": signature})
+
+    def test_signed_event_is_queued(self):
+        response = self.post({"event": "updated", "entity": "startup", "id": "042"})
+        self.assertEqual(response.status_code, 202, response.content)
+        job = SyncJob.objects.get(type=jobs.RECORD)
+        self.assertEqual((job.params["entity"], job.params["id"]), ("startups", "42"))
+
+    def test_bad_signature_is_rejected(self):
+        response = self.post({"event": "updated", "entity": "startups", "id": 1}, signature="sha256=00")
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(SyncJob.objects.exists())
+
+    def test_invalid_id_is_rejected(self):
+        response = self.post({"event": "updated", "entity": "startups", "id": "abc"})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(SyncJob.objects.exists())
+
+
+class OperationsViewTests(TestCase):
+    def test_staff_only(self):
+        jobs.enqueue("investors", {"full": True})
+        for name in ("syncjob-list", "syncrun-list", "missingrecord-list"):
+            self.assertEqual(self.client.get(reverse(name)).status_code, 403, name)
+        client = APIClient()
+        client.force_authenticate(get_user_model()(username="ops"))
+        self.assertEqual(client.get(reverse("syncjob-list")).status_code, 403)
+        client.force_authenticate(get_user_model()(username="ops", is_staff=True))
+        response = client.get(reverse("syncjob-list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 1)
+
+
+@override_settings(JEB_WEBHOOK_DEBOUNCE=0)
+class JobQueueTests(TestCase):
+    def test_permanent_failure_is_not_retried(self):
+        job, _ = jobs.enqueue_record("startups", "abc", "updated")
+        result = jobs.run(jobs.claim("w"))
+        self.assertEqual(result["error"], "invalid_id")
+        job.refresh_from_db()
+        self.assertEqual((job.statut, job.tentatives), (jobs.ECHEC, 1))
+
+    def test_active_key_deduplicates(self):
+        self.assertIsNotNone(jobs.enqueue("investors"))
+        self.assertIsNone(jobs.enqueue("investors"))
+
+    def test_retry_restores_record_key(self):
+        job, _ = jobs.enqueue_record("startups", 1, "updated")
+        job = jobs.claim("w")
+        self.assertIsNone(job.cle)
+        jobs._finish(job, {"ok": False, "error": "fetch_failed"})
+        job.refresh_from_db()
+        self.assertEqual((job.statut, job.cle), (jobs.EN_ATTENTE, "record:startups:1"))
+        self.assertEqual(jobs.enqueue_record("startups", 1, "updated"), (job, True))
+
+    def test_retry_yields_to_newer_notification(self):
+        jobs.enqueue_record("startups", 1, "updated")
+        job = jobs.claim("w")
+        newer, merged = jobs.enqueue_record("startups", 1, "updated")
+        self.assertFalse(merged)
+        jobs._finish(job, {"ok": False, "error": "fetch_failed"})
+        job.refresh_from_db()
+        self.assertEqual(job.statut, jobs.ECHEC)
+        self.assertEqual(SyncJob.objects.get(statut=jobs.EN_ATTENTE), newer)
+
+    def test_expired_reservation_is_taken_over(self):
+        job = jobs.enqueue("investors")
+        self.assertEqual(jobs.claim("w1"), job)
+        self.assertIsNone(jobs.claim("w2"))
+        SyncJob.objects.filter(pk=job.pk).update(visible_le=timezone.now() - timedelta(seconds=1))
+        taken = jobs.claim("w2")
+        self.assertEqual((taken.pk, taken.worker, taken.tentatives), (job.pk, "w2", 2))
+        jobs._finish(job, {"ok": True})
+        job.refresh_from_db()
+        self.assertEqual((job.statut, job.worker), (jobs.EN_COURS, "w2"))
+
+    def test_expired_reservation_without_attempts_fails(self):
+        job = jobs.enqueue("investors")
+        SyncJob.objects.filter(pk=job.pk).update(max_tentatives=1)
+        jobs.claim("w1")
+        SyncJob.objects.filter(pk=job.pk).update(visible_le=timezone.now() - timedelta(seconds=1))
+        self.assertIsNone(jobs.claim("w2"))
+        job.refresh_from_db()
+        self.assertEqual(job.statut, jobs.ECHEC)
+
+
+class SyncAllCommandTests(StandinTestCase):
+    counts = {"users": 5, "startups": 5, "investors": 5, "partners": 5, "news": 5, "events": 5}
+
+    def call(self):
+        out = io.StringIO()
+        with override_settings(JEB_API_BASE=self.server.base_url, JEB_HTTP_CACHE_DIR=None):
+            call_command("sync_all", stdout=out)
+        return json.loads(out.getvalue().splitlines()[0])
+
+    def test_runs_through_the_queue(self):
+        results = self.call()
+        self.assertTrue(all(result["ok"] for result in results.values()), results)
+        self.assertEqual(results["investors"]["created"], 5)
+        self.assertEqual(set(SyncJob.objects.values_list("statut", flat=True)), {jobs.TERMINE})
+
+    def test_skips_entities_already_queued(self):
+        pending = jobs.enqueue("investors")
+        results = self.call()
+        self.assertEqual(results["investors"], {"ok": True, "skipped": "déjà en file"})
+        self.assertEqual(INVESTORS.get_model().objects.count(), 0)
+        self.assertEqual(results["users"]["created"], 5)
+        pending.refresh_from_db()
+        self.assertEqual(pending.statut, jobs.EN_ATTENTE)
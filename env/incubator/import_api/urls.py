@@ -0,0 +1,13 @@
+from django.urls import path
+from rest_framework.routers import DefaultRouter
+from .views import ImportAPIViewSet, JEBWebhookView, MissingRecordViewSet, SyncJobViewSet, SyncRunViewSet
+
+router = DefaultRouter()
+router.register(r'import-api', ImportAPIViewSet)
+router.register(r'sync-runs', SyncRunViewSet)
+router.register(r'missing-records', MissingRecordViewSet)
+router.register(r'sync-jobs', SyncJobViewSet)
+
+urlpatterns = router.urls + [
+    path('webhooks/jeb/', JEBWebhookView.as_view(), name='jeb-webhook'),
+]
@@ -0,0 +1,99 @@
+from django.core.exceptions import ValidationError
+from rest_framework import permissions, status, viewsets
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from . import payloads
+from .models import ImportAPI, MissingRecord, SyncJob, SyncRun
+from .serializers import (ImportAPISerializer, MissingRecordSerializer, SyncJobSerializer, SyncRunSerializer,
+                          WebhookEventSerializer)
+from .webhooks import SIGNATURE_HEADER, ingest, verify_signature
+
+class ImportAPIViewSet(viewsets.ModelViewSet):
+    queryset = ImportAPI.objects.all()
+    serializer_class = ImportAPISerializer
+
+    def get_serializer(self, *args, **kwargs):
+        # liste: payloads archivés chargés par paquets plutôt qu'une requête par trace
+        if kwargs.get('many') and args:
+            args = (payloads.attach(args[0]),) + args[1:]
+        return super().get_serializer(*args, **kwargs)
+
+class SyncRunViewSet(viewsets.ReadOnlyModelViewSet):
+    """Journal des syncs (lecture seule); filtres ?entite= et ?lot=."""
+    queryset = SyncRun.objects.all()
+    serializer_class = SyncRunSerializer
+    permission_classes = [permissions.IsAdminUser]
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        entite = self.request.query_params.get('entite')
+        lot = self.request.query_params.get('lot')
+        if entite:
+            qs = qs.filter(entite=entite)
+        if lot:
+            try:
+                qs = qs.filter(lot=lot)
+            except ValidationError:
+                qs = qs.none()
+        return qs
+
+class MissingRecordViewSet(viewsets.ReadOnlyModelViewSet):
+    """Lignes locales absentes de la source distante (lecture seule); filtres ?cible_type= et ?statut=."""
+    queryset = MissingRecord.objects.all()
+    serializer_class = MissingRecordSerializer
+    permission_classes = [permissions.IsAdminUser]
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        cible_type = self.request.query_params.get('cible_type')
+        statut = self.request.query_params.get('statut')
+        if cible_type:
+            qs = qs.filter(cible_type=cible_type)
+        if statut:
+            qs = qs.filter(statut=statut)
+        return qs
+
+class SyncJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """File des tâches de sync (lecture seule); filtres ?type=, ?statut= et ?lot=."""
+    queryset = SyncJob.objects.all()
+    serializer_class = SyncJobSerializer
+    # paramètres de webhook et traces d'erreur: staff seulement, comme les autres vues d'exploitation
+    permission_classes = [permissions.IsAdminUser]
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        job_type = self.request.query_params.get('type')
+        statut = self.request.query_params.get('statut')
+        lot = self.request.query_params.get('lot')
+        if job_type:
+            qs = qs.filter(type=job_type)
+        if statut:
+            qs = qs.filter(statut=statut)
+        if lot:
+            try:
+                qs = qs.filter(lot=lot)
+            except ValidationError:
+                qs = qs.none()
+        return qs
+
+class JEBWebhookView(APIView):
+    """Notifications de changement JEB (created / updated / deleted) -> syncs ciblées en file.
+
+    Corps: une notification, une liste, ou {"events": [...]}; authentifié
+    par l'en-tête X-JEB-Signature (HMAC-SHA256 du corps, JEB_WEBHOOK_SECRET).
+    Répond 202 avec le décompte des tâches mises en file ou fusionnées.
+    """
+    # authentification par signature seulement (pas de session, donc pas de CSRF)
+    authentication_classes = []
+    permission_classes = []
+
+    def post(self, request):
+        # corps brut lu avant request.data pour la vérification de signature
+        if not verify_signature(request.body, request.headers.get(SIGNATURE_HEADER)):
+            return Response({'detail': 'Signature invalide.'}, status=status.HTTP_403_FORBIDDEN)
+        data = request.data
+        if isinstance(data, dict) and 'events' in data:
+            data = data['events']
+        serializer = WebhookEventSerializer(data=data if isinstance(data, list) else [data], many=True)
+        serializer.is_valid(raise_exception=True)
+        return Response(ingest(serializer.validated_data), status=status.HTTP_202_ACCEPTED)
@@ -0,0 +1,62 @@
+import hashlib
+import hmac
+import logging
+from typing import Optional
+
+from django.conf import settings
+
+from . import jobs
+from .specs import SPECS
+
+logger = logging.getLogger(__name__)
+
+EVENTS = ("created", "updated", "deleted")
+SIGNATURE_HEADER = "X-JEB-Signature"
+
+
+def resolve_entity(name: str) -> Optional[str]:
+    """Label de la spec désignée par `name` (label "startups" ou cible_type "startup"), None si inconnue."""
+    for spec in SPECS:
+        if name in (spec.label, spec.cible_type):
+            return spec.label
+    return None
+
+
+def verify_signature(body: bytes, signature: Optional[str]) -> bool:
+    """Vérifie l'en-tête X-JEB-Signature: "sha256=<hex>", HMAC-SHA256 du corps brut avec JEB_WEBHOOK_SECRET.
+
+    Sans secret configuré, toute notification est refusée.
+    """
+    secret = getattr(settings, "JEB_WEBHOOK_SECRET", None)
+    if not secret or not signature:
+        return False
+    algo, _, digest = signature.strip().partition("=")
+    if algo.lower() != "sha256" or not digest:
+        return False
+    expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, digest.lower())
+
+
+def ingest(events: list) -> dict:
+    """Met en file la sync ciblée de chaque notification validée (cf. jobs.enqueue_record).
+
+    Les notifications d'un même appel pour le même id sont fusionnées comme
+    une rafale: seule la dernière compte.
+    """
+    latest, counts = {}, {}
+    for event in events:
+        key = (event["entity"], str(event["id"]))
+        latest[key] = event
+        counts[key] = counts.get(key, 0) + 1
+    report = {"received": len(events), "queued": 0, "coalesced": len(events) - len(latest), "dropped": 0}
+    for (label, remote_id), event in latest.items():
+        job, merged = jobs.enqueue_record(label, remote_id, event["event"], event.get("payload"),
+                                          counts[(label, remote_id)])
+        if job is None:
+            report["dropped"] += 1
+            logger.warning("Notification %s %s %s non mise en file", event["event"], label, remote_id)
+        elif merged:
+            report["coalesced"] += 1
+        else:
+            report["queued"] += 1
+    return report
@@ -1,5 +1,5 @@
 #!/usr/bin/env bash
-# Script de lancement de la synchro complète pour usage via cron.
+# Script de mise en file de la synchro complète (exécutée par les workers jeb_worker).
 # Rendez-le exécutable : chmod +x scripts/sync_all.sh
 # Option : placer un fichier .env à la racine contenant JEB_API_TOKEN=xxxxx
 
@@ -59,12 +59,10 @@ echo "[$STAMP] ==== Debut sync_all ==== " >> "$LOG_DIR/sync_all.log"
   fi
 )
 
-# Run sync under flock to avoid concurrent executions
-flock -n /tmp/sync_all.lock -c "$PY $MANAGE sync_all >> \"$LOG_DIR/sync_all.log\" 2>&1" || (
-  echo "[$STAMP] Another sync_all is active or flock failed" >> "$LOG_DIR/sync_all.log" && exit 0
-)
-if [ $? -ne 0 ]; then
-  echo "[$STAMP] ERREUR sync_all" >> "$LOG_DIR/sync_all.log"
+# Mise en file des syncs pour les workers (manage.py jeb_worker): la file
+# ignore une entité déjà en attente ou en cours, plus besoin de flock
+if ! "$PY" "$MANAGE" jeb_enqueue >> "$LOG_DIR/sync_all.log" 2>&1; then
+  echo "[$STAMP] ERREUR jeb_enqueue" >> "$LOG_DIR/sync_all.log"
   exit 1
 fi
 STAMP_END="$(date '+%Y-%m-%dT%H:%M:%S')"